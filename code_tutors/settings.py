@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from django.contrib.messages import constants as messages
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,8 +50,10 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tutorials.roles.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'tutorials.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'code_tutors.urls'
@@ -76,11 +80,151 @@ WSGI_APPLICATION = 'code_tutors.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database profile, chosen with the DATABASE_PROFILE environment variable: 'sqlite' (the default) for development,
+# or 'postgres' for running several worker processes, configured by the POSTGRES_* environment variables
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'sqlite')
+
+# Seconds a worker keeps its database connection open for its next requests, instead of connecting on every request
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', '60'))
+
+if DATABASE_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+        }
+    }
+elif DATABASE_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'code_tutors'),
+            'USER': os.environ.get('POSTGRES_USER', 'code_tutors'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    if os.environ.get('POSTGRES_POOL', '1') == '1':
+        # Each worker process borrows connections from a psycopg pool, which replaces persistent connections
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.environ.get('POSTGRES_POOL_MAX_SIZE', '10')),
+                'timeout': 10,
+            },
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = DATABASE_CONN_MAX_AGE
+else:
+    raise ImproperlyConfigured(f"Unknown DATABASE_PROFILE '{DATABASE_PROFILE}', expected 'sqlite' or 'postgres'.")
+
+# PRAGMAs run on every new SQLite connection. WAL lets readers carry on while a write is in progress, NORMAL
+# synchronous only syncs at checkpoints, and writers wait up to busy_timeout milliseconds for a lock before failing.
+# A negative cache_size is in KiB, mmap_size is in bytes. Set to {} to keep SQLite's defaults
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    # The user search relies on the trigram lookups of django.contrib.postgres
+    INSTALLED_APPS.append('django.contrib.postgres')
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Cache backend, chosen with the CACHE_BACKEND environment variable: 'locmem' keeps the cache inside each process,
+# 'database' and 'redis' share it between worker processes, so an invalidation in one worker reaches all of them.
+# Defaults to 'locmem' for the sqlite profile and 'database' for the postgres one, which runs several workers.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'database' if DATABASE_PROFILE == 'postgres' else 'locmem')
+
+if CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'code-tutors',
+        }
     }
+elif CACHE_BACKEND == 'database':
+    # The table is created with `python3 manage.py createcachetable`
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'code_tutors_cache',
+        }
+    }
+elif CACHE_BACKEND == 'redis':
+    # Needs the redis package
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown CACHE_BACKEND '{CACHE_BACKEND}', expected 'locmem', 'database' or 'redis'.")
+
+# Seconds a built calendar month stays cached, writes to lessons invalidate it sooner
+CALENDAR_CACHE_TIMEOUT = 60 * 60
+
+# Most seconds the current term stays cached, term writes and term boundaries drop it sooner
+CURRENT_TERM_CACHE_TIMEOUT = 60 * 60
+
+# Seconds before the in-process tutor availability index is rebuilt to pick up writes from other processes
+AVAILABILITY_INDEX_TTL = 5 * 60
+
+# Days between an invoicing run and the due date of the invoices it creates
+INVOICE_DUE_DAYS = 30
+
+# Most users a student or tutor search returns, and the trigram similarity a misspelt search needs to match
+USER_SEARCH_LIMIT = 200
+USER_SEARCH_SIMILARITY = 0.3
+
+# Avatars are served from a local cache of Gravatar images when AVATAR_LOCAL_CACHE is set, so page loads do not
+# depend on Gravatar. An image is downloaded, waiting up to AVATAR_FETCH_TIMEOUT seconds, the first time it is shown
+AVATAR_LOCAL_CACHE = os.environ.get('AVATAR_LOCAL_CACHE', '') == '1'
+AVATAR_CACHE_DIR = BASE_DIR / 'avatars'
+AVATAR_FETCH_TIMEOUT = 3
+
+# Request profiling, off by default. When enabled, a sample of the requests is profiled and the latest
+# profiles are kept in memory for the profiling page, as well as logged to a rotating file
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '') == '1'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0.1'))
+PROFILING_BUFFER_SIZE = 500
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'profile': {
+            'format': '{message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'profiling': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': BASE_DIR / 'profiling.log',
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': 5,
+            'formatter': 'profile',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'tutorials.profiling': {
+            'handlers': ['profiling'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 
@@ -132,12 +276,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # User model for authentication and login purposes
 AUTH_USER_MODEL = 'tutorials.User'
 
+# Loads the profiles of the logged in user along with the user, so role checks never query
+AUTHENTICATION_BACKENDS = ['tutorials.roles.RoleBackend']
+
 # Login URL for redirecting users from login protected views
 LOGIN_URL = 'log_in'
 
 # URL where @login_prohibited redirects to
 REDIRECT_URL_WHEN_LOGGED_IN = 'dashboard'
 
+# Price per lesson of lessons created by bulk request assignment
+DEFAULT_PRICE_PER_LESSON = 30
+
 # Convert Django ERROR messages to Bootstrap DANGER messages
 MESSAGE_TAGS = {
     messages.ERROR: 'danger',
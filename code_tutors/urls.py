@@ -68,6 +68,7 @@ urlpatterns = [
     path('dashboard/requests/', views.RequestView.as_view(), name='requests'),
     path('dashboard/request/', views.MakeRequestView.as_view(), name='lesson_request'),
     path('dashboard/request/<int:request_id>/assign/', views.RequestView.as_view(), name='request_assign'),
+    path('dashboard/requests/assign/', views.AssignmentRunView.as_view(), name='assignment_run'),
 
     path('availability/', views.AvailabilityView.as_view(), name='availability'),
     path('availability/add/', views.AddEditAvailabilityView.as_view(), name='availability_add'),
@@ -75,7 +76,13 @@ urlpatterns = [
 
     path('invoices/', views.InvoiceListView.as_view(), name='invoice_list'),
     path('invoices/create/', views.CreateInvoiceView.as_view(), name='create_invoice'),
+    path('invoices/run/', views.InvoicingRunView.as_view(), name='invoicing_run'),
+    path('invoices/reconciliation/', views.InvoiceReconciliationView.as_view(), name='invoice_reconciliation'),
     path('invoices/<int:invoice_id>/', views.InvoiceDetailView.as_view(), name='invoice_detail'),
+
+    path('dashboard/profiling/', views.ProfilingView.as_view(), name='profiling'),
+
+    path('avatars/<str:digest>/<int:size>/', views.avatar, name='avatar'),
 ]
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
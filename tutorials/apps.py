@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TutorialsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tutorials'
+
+    def ready(self):
+        """Connects the signal receivers of the app."""
+        from tutorials import signals
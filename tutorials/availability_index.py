@@ -0,0 +1,125 @@
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from copy import copy
+from time import monotonic
+
+from django.conf import settings
+
+from tutorials.models import TutorAvailability
+
+
+"""
+This file contains an in-process index of
+Tutor availability, grouped by tutor and weekday
+"""
+
+class DayAvailability:
+    """The available slots of one tutor on one weekday, sorted by start time."""
+
+    def __init__(self, slots):
+        self.slots = sorted(slots, key=lambda slot: (slot.start_time, slot.end_time))
+        self.starts = [slot.start_time for slot in self.slots]
+
+        # For each prefix of the sorted slots, the slot reaching furthest into the day
+        self.furthest_slots = []
+        furthest = None
+        for slot in self.slots:
+            if furthest is None or slot.end_time > furthest.end_time:
+                furthest = slot
+            self.furthest_slots.append(furthest)
+
+    def covering_slot(self, start_time, end_time):
+        """Returns a slot covering start_time to end_time, or None, in logarithmic time."""
+        index = bisect_right(self.starts, start_time) - 1
+        if index >= 0 and self.furthest_slots[index].end_time >= end_time:
+            return self.furthest_slots[index]
+        return None
+
+
+class AvailabilityIndex:
+    """Index of every available tutor slot, answering availability questions without querying the database.
+
+    Writes to TutorAvailability mark the tutor as stale through signals, and only that tutor's slots are
+    reloaded on the next lookup. The whole index is also rebuilt every AVAILABILITY_INDEX_TTL seconds so
+    that writes made by other processes are eventually picked up.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._days = {}
+        self._tutors_by_day = defaultdict(set)
+        self._stale_tutors = set()
+        self._loaded_at = None
+
+    def invalidate(self, tutor_id):
+        """Marks the slots of a tutor as changed, so they are reloaded on the next lookup."""
+        with self._lock:
+            self._stale_tutors.add(tutor_id)
+
+    def clear(self):
+        """Drops the whole index, so it is rebuilt on the next lookup."""
+        with self._lock:
+            self._loaded_at = None
+
+    def covering_slot(self, tutor_id, day, start_time, end_time):
+        """Returns an available slot of the tutor covering start_time to end_time on the given weekday, or None."""
+        with self._lock:
+            self._refresh()
+            day_availability = self._days.get((tutor_id, day))
+            return day_availability.covering_slot(start_time, end_time) if day_availability else None
+
+    def is_available(self, tutor_id, day, start_time, end_time):
+        """Checks whether the tutor is free from start_time to end_time on the given weekday."""
+        return self.covering_slot(tutor_id, day, start_time, end_time) is not None
+
+    def available_tutors(self, day, start_time, end_time, tutor_ids=None):
+        """Returns the ids of the tutors free from start_time to end_time on the given weekday."""
+        with self._lock:
+            self._refresh()
+            candidates = self._tutors_by_day[day]
+            if tutor_ids is not None:
+                candidates = candidates & set(tutor_ids)
+            return sorted(
+                tutor_id for tutor_id in candidates
+                if self._days[(tutor_id, day)].covering_slot(start_time, end_time)
+            )
+
+    def slots(self, tutor_ids=None):
+        """Returns copies of the available slots ordered by tutor, day and time, optionally only for some tutors."""
+        with self._lock:
+            self._refresh()
+            keys = sorted(
+                key for key in self._days
+                if tutor_ids is None or key[0] in tutor_ids
+            )
+            return [copy(slot) for key in keys for slot in self._days[key].slots]
+
+    def _refresh(self):
+        """Rebuilds the index if it expired, otherwise reloads the tutors whose slots changed."""
+        if self._loaded_at is None or monotonic() - self._loaded_at > settings.AVAILABILITY_INDEX_TTL:
+            self._days = {}
+            self._tutors_by_day = defaultdict(set)
+            self._stale_tutors = set()
+            self._load(TutorAvailability.objects.all())
+            self._loaded_at = monotonic()
+        elif self._stale_tutors:
+            stale_tutors = self._stale_tutors
+            self._stale_tutors = set()
+            for tutor_id, day in [key for key in self._days if key[0] in stale_tutors]:
+                del self._days[(tutor_id, day)]
+                self._tutors_by_day[day].discard(tutor_id)
+            self._load(TutorAvailability.objects.filter(tutor_id__in=stale_tutors))
+
+    def _load(self, availabilities):
+        """Adds the available slots of the given queryset to the index with a single query."""
+        grouped_slots = defaultdict(list)
+        for slot in availabilities.filter(status=TutorAvailability.Availability.AVAILABLE).select_related('tutor__user'):
+            grouped_slots[(slot.tutor_id, slot.day)].append(slot)
+
+        for (tutor_id, day), slots in grouped_slots.items():
+            self._days[(tutor_id, day)] = DayAvailability(slots)
+            self._tutors_by_day[day].add(tutor_id)
+
+
+availability_index = AvailabilityIndex()
@@ -0,0 +1,62 @@
+import os
+import re
+from functools import lru_cache
+from tempfile import NamedTemporaryFile
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.urls import reverse
+from libgravatar import Gravatar
+
+
+"""
+This file contains helpers to build
+Avatar URLs, memoized per email and size, and a local cache of avatar images
+"""
+
+GRAVATAR_DEFAULT_IMAGE = 'mp'
+GRAVATAR_HASH_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+# The sizes of User.gravatar and User.mini_gravatar, the only ones the local avatar cache serves
+AVATAR_SIZES = (60, 120)
+
+
+@lru_cache(maxsize=4096)
+def email_hash(email):
+    """Returns the Gravatar hash of an email, computed once per email."""
+    return Gravatar(email).email_hash
+
+
+@lru_cache(maxsize=4096)
+def gravatar_url(email, size):
+    """Returns the Gravatar URL of an email at the given size, built once per email and size."""
+    return Gravatar(email).get_image(size=size, default=GRAVATAR_DEFAULT_IMAGE)
+
+
+def avatar_url(email, size):
+    """Returns the URL of the avatar of an email, served from the local avatar cache when AVATAR_LOCAL_CACHE is set."""
+    if settings.AVATAR_LOCAL_CACHE and size in AVATAR_SIZES:
+        return reverse('avatar', args=[email_hash(email), size])
+    return gravatar_url(email, size)
+
+
+def avatar_cache_path(digest, size):
+    """Returns the path of a locally cached avatar image."""
+    return settings.AVATAR_CACHE_DIR / f'{digest}-{size}.jpg'
+
+
+def fetch_avatar(digest, size):
+    """Downloads an avatar from Gravatar into the local avatar cache, returning its path.
+
+    The image is written to a temporary file first, so concurrent requests never serve a partial image.
+    """
+    url = f'https://www.gravatar.com/avatar/{digest}?size={size}&default={GRAVATAR_DEFAULT_IMAGE}'
+    with urlopen(url, timeout=settings.AVATAR_FETCH_TIMEOUT) as response:
+        image = response.read()
+
+    path = avatar_cache_path(digest, size)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile(dir=path.parent, suffix='.part', delete=False) as partial:
+        partial.write(image)
+    os.replace(partial.name, path)
+    return path
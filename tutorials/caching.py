@@ -0,0 +1,102 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from time import time_ns
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+
+"""
+This file contains helpers to cache
+Calendar month schedules, and the current term
+"""
+
+CALENDAR_GENERATION_KEY = 'calendar:generation'
+CURRENT_TERM_KEY = 'term:current'
+
+
+def _calendar_version_key(kind, entity_id):
+    """Returns the cache key holding the version of an entity's calendars."""
+    return f'calendar:version:{kind}:{entity_id}'
+
+
+def _calendar_versions(kind, entity_id):
+    """Returns the global and entity versions, creating any that are missing or evicted."""
+    version_key = _calendar_version_key(kind, entity_id)
+    versions = cache.get_many([CALENDAR_GENERATION_KEY, version_key])
+    generation = versions.get(CALENDAR_GENERATION_KEY)
+    version = versions.get(version_key)
+
+    # A new token (rather than a counter restarting at 0) guarantees evicted versions never resurrect old entries
+    if generation is None:
+        generation = time_ns()
+        cache.add(CALENDAR_GENERATION_KEY, generation, None)
+    if version is None:
+        version = time_ns()
+        cache.add(version_key, version, None)
+    return generation, version
+
+
+def calendar_cache_key(kind, entity_id, year, month):
+    """Returns the cache key of the month schedule of a tutor or student."""
+    generation, version = _calendar_versions(kind, entity_id)
+    return f'calendar:{kind}:{entity_id}:{generation}.{version}:{year}:{month}'
+
+
+def get_month_schedule(kind, entity_id, year, month, build_schedule):
+    """Returns the cached month schedule of a tutor or student, building it on a cache miss."""
+    key = calendar_cache_key(kind, entity_id, year, month)
+    schedule = cache.get(key)
+    if schedule is None:
+        schedule = build_schedule()
+        cache.set(key, schedule, settings.CALENDAR_CACHE_TIMEOUT)
+    return schedule
+
+
+def invalidate_calendar(kind, entity_id, year=None, month=None):
+    """Drops one cached month of a tutor or student, or all of their months when no month is given."""
+    if year and month:
+        cache.delete(calendar_cache_key(kind, entity_id, year, month))
+    else:
+        cache.set(_calendar_version_key(kind, entity_id), time_ns(), None)
+
+
+def invalidate_lesson_calendars(tutor_id, student_id, year=None, month=None):
+    """Drops the cached calendars of both the tutor and the student of a lesson."""
+    invalidate_calendar('tutor', tutor_id, year, month)
+    invalidate_calendar('student', student_id, year, month)
+
+
+def invalidate_all_calendars():
+    """Drops every cached calendar, used after bulk updates spanning many lessons."""
+    cache.set(CALENDAR_GENERATION_KEY, time_ns(), None)
+
+
+def get_current_term():
+    """Returns the term running today, or None, cached until the current term ends or the next one starts."""
+    cached = cache.get(CURRENT_TERM_KEY)
+    if cached is not None:
+        # Wrapped in a tuple, so that no current term is cached as well
+        return cached[0]
+
+    # Imported here, as the models import this module to invalidate calendars
+    from tutorials.models import Term
+
+    # The running and upcoming terms, in one query, give both the current term and the next boundary
+    today = timezone.now().date()
+    terms = list(Term.objects.filter(end_date__gte=today).order_by('start_date', 'pk'))
+    term = next((term for term in terms if term.start_date <= today), None)
+    boundaries = [term.end_date + timedelta(days=1)] if term else []
+    boundaries += [term.start_date for term in terms if term.start_date > today][:1]
+
+    timeout = settings.CURRENT_TERM_CACHE_TIMEOUT
+    if boundaries:
+        boundary = datetime.combine(min(boundaries), time.min, tzinfo=dt_timezone.utc)
+        timeout = max(1, min(int((boundary - timezone.now()).total_seconds()), timeout))
+    cache.set(CURRENT_TERM_KEY, (term,), timeout)
+    return term
+
+
+def invalidate_current_term():
+    """Drops the cached current term, used whenever terms are written."""
+    cache.delete(CURRENT_TERM_KEY)
@@ -27,7 +27,7 @@ class InvoiceForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         """Set values for certain fields."""
         super().__init__(*args, **kwargs)
-        self.fields['student'].queryset = Student.objects.select_related('user').all()
+        self.fields['student'].queryset = Student.objects.load('list')
         self.fields['student'].label_from_instance = lambda obj: f"{obj.user.username} ({obj.user.full_name()})"
         self.fields['subject'].queryset = Subject.objects.all()
         self.fields['subject'].label_from_instance = lambda obj: f"{obj.name}"
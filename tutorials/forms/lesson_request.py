@@ -1,6 +1,6 @@
 from django import forms
 
-from tutorials.models import LessonRequest, Lesson
+from tutorials.models import LessonRequest, Lesson, Student, Tutor
 
 
 class LessonRequestForm(forms.ModelForm):
@@ -41,6 +41,9 @@ class AssignTutorForm(forms.ModelForm):
     def __init__(self, *args, existing_request=None, **kwargs):
         """Set initial values and labels for certain fields."""
         super().__init__(*args, **kwargs)
+        # Choice labels show the user's name, so load users along with the choices
+        self.fields['student'].queryset = Student.objects.load('list')
+        self.fields['tutor'].queryset = Tutor.objects.load('list')
         if existing_request:
             self.fields['student'].initial = existing_request.student
             self.fields['student'].disabled = True
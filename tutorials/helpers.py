@@ -1,8 +1,14 @@
+from collections import defaultdict
+
 from django.conf import settings
+from django.db import transaction
 from django.shortcuts import redirect
 from django.utils.timezone import now
 
+from tutorials.availability_index import availability_index
+from tutorials.caching import invalidate_calendar, invalidate_lesson_calendars
 from tutorials.models import Tutor, Lesson, LessonStatus, Status, LessonStatus, TutorAvailability
+from tutorials.recurrence import occurrence_dates
 from datetime import timedelta, datetime
 import datetime
 from tutorials.models.choices import Days
@@ -30,14 +36,10 @@ class TutorAvailabilityManager:
         return current_tutor_availability
 
     def get_all_tutor_availability(self, subject_name=None):
+        tutors_with_subject = None
         if subject_name:
-            tutors_with_subject = Tutor.objects.filter(subjects__name=subject_name)
-            all_tutors_availability = TutorAvailability.objects.filter(
-                status='Available',
-                tutor__in=tutors_with_subject
-            )
-        else:
-            all_tutors_availability = TutorAvailability.objects.filter(status='Available')
+            tutors_with_subject = set(Tutor.objects.filter(subjects__name=subject_name).values_list('pk', flat=True))
+        all_tutors_availability = availability_index.slots(tutors_with_subject)
 
         grouped_availability = {}
 
@@ -102,27 +104,20 @@ class TutorAvailabilityManager:
         start_datetime = datetime.datetime.strptime(str(lesson_start_time), "%H:%M:%S")
         end_time = (start_datetime + duration).time()
 
+        with transaction.atomic():
+            day_slots = list(TutorAvailability.objects.filter(tutor=tutor, day=day.weekday()))
 
-        existing_availabilities = TutorAvailability.objects.filter(
-            tutor=tutor,
-            day=day.weekday(),
-            status='Available'
-        ).order_by('start_time')
-
-        TutorAvailability.objects.filter(
-            tutor=tutor,
-            day=day.weekday(),
-            start_time=start_datetime.time(),
-            end_time=end_time
-        ).update(status='Available')
-
-        all_availabilities = TutorAvailability.objects.filter(
-            tutor=tutor,
-            day=day.weekday(),
-            status='Available'
-        ).order_by('start_time')
+            restored_slots = [
+                slot for slot in day_slots
+                if slot.start_time == start_datetime.time() and slot.end_time == end_time
+            ]
+            for slot in restored_slots:
+                slot.status = 'Available'
 
-        self.merge_overlapping_availabilities(all_availabilities)
+            self.merge_overlapping_availabilities(
+                [slot for slot in day_slots if slot.status == 'Available'],
+                changed_slots=restored_slots
+            )
 
     def is_tutor_available(self, start_time, date, tutor, duration):
 
@@ -138,40 +133,71 @@ class TutorAvailabilityManager:
 
         except Exception as e:
             return None
-        return TutorAvailability.objects.filter(tutor=tutor,
-                                                day=date,
-                                                start_time__lte=start_datetime.time(),
-                                                end_time__gte=end_time.time(), status='Available')
+        return availability_index.is_available(tutor.pk, date, start_datetime.time(), end_time.time())
 
-    def merge_overlapping_availabilities(self, availabilities):
-        merged_availabilities = []
-        current_slot = None
+    def merge_overlapping_availabilities(self, availabilities, changed_slots=()):
+        """Coalesces overlapping slots per tutor, day and status, then saves them with one bulk update and one bulk delete.
 
+        changed_slots are slots already modified in memory by the caller, saved along with the merged ones.
+        """
+        grouped_slots = defaultdict(list)
         for availability in availabilities:
-            if current_slot is None:
-                current_slot = availability
-            elif availability.start_time <= current_slot.end_time:
-                current_slot.end_time = max(current_slot.end_time, availability.end_time)
-                current_slot.save()
-                availability.delete()
-            else:
-                merged_availabilities.append(current_slot)
-                current_slot = availability
-
-        if current_slot:
-            merged_availabilities.append(current_slot)
+            grouped_slots[(availability.tutor_id, availability.day, availability.status)].append(availability)
+
+        updated_slots = {slot.pk: slot for slot in changed_slots}
+        absorbed_pks = set()
+
+        for slots in grouped_slots.values():
+            slots.sort(key=lambda slot: (slot.start_time, slot.end_time))
+            current_slot = slots[0]
+            for slot in slots[1:]:
+                if slot.start_time <= current_slot.end_time:
+                    if slot.end_time > current_slot.end_time:
+                        current_slot.end_time = slot.end_time
+                        updated_slots[current_slot.pk] = current_slot
+                    absorbed_pks.add(slot.pk)
+                else:
+                    current_slot = slot
+
+        for pk in absorbed_pks:
+            updated_slots.pop(pk, None)
+
+        with transaction.atomic():
+            if updated_slots:
+                TutorAvailability.objects.bulk_update(updated_slots.values(), ['status', 'start_time', 'end_time'])
+            if absorbed_pks:
+                TutorAvailability.objects.filter(pk__in=absorbed_pks).delete()
+
+        # Bulk updates bypass the model signals
+        for tutor_id in {slot.tutor_id for slot in updated_slots.values()}:
+            invalidate_calendar('tutor', tutor_id)
+            availability_index.invalidate(tutor_id)
 
     def update_new_tutor_availability(self, new_start_time, new_day, duration, new_tutor):
         start_datetime = datetime.datetime.strptime(new_start_time, "%H:%M")
         end_time = (start_datetime + duration).time()
 
-        availability = TutorAvailability.objects.filter(
-            tutor=Tutor.objects.get(pk=new_tutor),
+        new_tutor_id = int(getattr(new_tutor, 'pk', new_tutor))
+
+        slot = availability_index.covering_slot(
+            new_tutor_id,
+            new_day.weekday(),
+            start_datetime.time(),
+            end_time
+        )
+        covering = dict(
+            tutor_id=new_tutor_id,
             day=new_day.weekday(),
             start_time__lte=start_datetime.time(),
             end_time__gte=end_time,
             status='Available'
-        ).first()
+        )
+        availability = TutorAvailability.objects.filter(pk=slot.pk, **covering).first() if slot else None
+
+        if not availability:
+            # The index may be stale if another process changed the tutor's slots
+            availability = TutorAvailability.objects.filter(**covering).first()
+            availability_index.invalidate(new_tutor_id)
 
         if not availability:
             raise ValueError("No matching availability found.")
@@ -180,7 +206,7 @@ class TutorAvailabilityManager:
         leftover_slots = []
         if availability.start_time < start_datetime.time():
             leftover_slots.append(TutorAvailability(
-                tutor=availability.tutor,
+                tutor_id=availability.tutor_id,
                 day=availability.day,
                 start_time=availability.start_time,
                 end_time=start_datetime.time(),
@@ -188,7 +214,7 @@ class TutorAvailabilityManager:
             ))
         if availability.end_time > end_time:
             leftover_slots.append(TutorAvailability(
-                tutor=availability.tutor,
+                tutor_id=availability.tutor_id,
                 day=availability.day,
                 start_time=end_time,
                 end_time=availability.end_time,
@@ -202,27 +228,22 @@ class TutorAvailabilityManager:
         availability.save()
 
     def update_lesson_statuses(self, old_lesson_date, next_lesson_date, time, frequency, end_date, lesson_id):
-        current_date = next_lesson_date
-
-        LessonStatus.objects.filter(
-            lesson_id=Lesson.objects.get(pk=lesson_id),
-            date__gte=old_lesson_date
-        ).delete()
-
-        while current_date < end_date:
-            LessonStatus.objects.create(
-                lesson_id=Lesson.objects.get(pk=lesson_id),
-                date=current_date,
-                time=time,
-                status=Status.SCHEDULED
-            )
-            if frequency == 'O':
-                return
-            elif frequency == 'W':
-                current_date += datetime.timedelta(weeks=1)
-            elif frequency == 'F':
-                current_date += datetime.timedelta(weeks=2)
-            elif frequency == 'M':
-                current_date += datetime.timedelta(weeks=4)
-            else:
-                raise ValueError("Frequency should be 'W' (week) or 'M' (month).")
\ No newline at end of file
+        lesson = Lesson.objects.get(pk=lesson_id)
+
+        with transaction.atomic():
+            LessonStatus.objects.filter(
+                lesson_id=lesson,
+                date__gte=old_lesson_date
+            ).delete()
+
+            # The rescheduled lessons run until the day before the end date
+            LessonStatus.objects.bulk_create([
+                LessonStatus(
+                    lesson_id=lesson,
+                    date=lesson_date,
+                    time=time,
+                    status=Status.SCHEDULED
+                )
+                for lesson_date in occurrence_dates(next_lesson_date, end_date - datetime.timedelta(days=1), frequency)
+            ])
+        invalidate_lesson_calendars(lesson.tutor_id, lesson.student_id)
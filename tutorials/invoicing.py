@@ -0,0 +1,94 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+
+from tutorials.models import Invoice, InvoiceLessonLink, LessonStatus, Status
+
+
+"""
+This file contains the invoicing run to
+Bill every student for their completed lessons in bulk
+"""
+
+def billable_lessons(until=None):
+    """Returns the completed lessons, up to and including the given date, that are not on any invoice yet."""
+    lessons = LessonStatus.objects.filter(status=Status.COMPLETED, invoiced=False).exclude(
+        Exists(InvoiceLessonLink.objects.filter(lesson=OuterRef('pk')))
+    )
+    if until is not None:
+        lessons = lessons.filter(date__lte=until)
+    return lessons
+
+
+class InvoicingRun:
+    """Creates one invoice per student for all of their billable lessons.
+
+    Students are streamed in chunks of chunk_size ordered by id, so memory stays flat however many there are.
+    Each chunk costs a fixed number of queries: one to find the next students, one to load their lessons and
+    one bulk insert each for the invoices and their lesson links, all in one transaction.
+    """
+
+    def __init__(self, until=None, due_date=None, chunk_size=500):
+        self.until = until or date.today()
+        self.due_date = due_date or date.today() + timedelta(days=settings.INVOICE_DUE_DAYS)
+        self.chunk_size = chunk_size
+
+    def pending(self):
+        """Returns the number of students to bill and of lessons to invoice."""
+        return billable_lessons(self.until).aggregate(
+            students=Count('lesson_id__student', distinct=True),
+            lessons=Count('pk'),
+        )
+
+    def student_chunks(self):
+        """Yields the ids of the students with billable lessons, chunk by chunk."""
+        students = billable_lessons(self.until).values_list('lesson_id__student_id', flat=True).distinct()
+        last_student_id = None
+        while True:
+            chunk = students.order_by('lesson_id__student_id')
+            if last_student_id is not None:
+                chunk = chunk.filter(lesson_id__student_id__gt=last_student_id)
+            chunk = list(chunk[:self.chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < self.chunk_size:
+                return
+            last_student_id = chunk[-1]
+
+    def run(self):
+        """Bills every student with billable lessons and returns the totals of the run."""
+        totals = {'invoices': 0, 'lessons': 0, 'amount': 0}
+        for student_ids in self.student_chunks():
+            invoices, links = self.bill(student_ids)
+            totals['invoices'] += len(invoices)
+            totals['lessons'] += len(links)
+            totals['amount'] += sum(invoice.amount for invoice in invoices)
+        return totals
+
+    def bill(self, student_ids):
+        """Creates the invoices of a chunk of students and links their lessons, returning both."""
+        lessons_by_student = defaultdict(list)
+        for lesson_status_id, student_id, price in billable_lessons(self.until).filter(
+            lesson_id__student_id__in=student_ids
+        ).values_list('pk', 'lesson_id__student_id', 'lesson_id__price_per_lesson'):
+            lessons_by_student[student_id].append((lesson_status_id, price))
+
+        with transaction.atomic():
+            invoices = Invoice.objects.bulk_create([
+                Invoice(
+                    student_id=student_id,
+                    due_date=self.due_date,
+                    amount=sum(price for lesson_status_id, price in lessons),
+                )
+                for student_id, lessons in lessons_by_student.items()
+            ])
+            links = InvoiceLessonLink.objects.bulk_create([
+                InvoiceLessonLink(invoice=invoice, lesson_id=lesson_status_id)
+                for invoice in invoices
+                for lesson_status_id, price in lessons_by_student[invoice.student_id]
+            ])
+        return invoices, links
@@ -0,0 +1,34 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tutorials.matching import LessonRequestMatcher
+from tutorials.models import LessonRequest, Status
+
+
+class Command(BaseCommand):
+    """Batch command to assign tutors to every pending lesson request."""
+
+    help = 'Assigns tutors to all pending lesson requests and creates their lessons'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--price', type=Decimal, default=Decimal(settings.DEFAULT_PRICE_PER_LESSON),
+                            help='Price per lesson of the created lessons')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Show the matches without creating any lesson')
+
+    def handle(self, *args, **options):
+        pending = LessonRequest.objects.filter(status=Status.PENDING, lesson_assigned__isnull=True)
+        pending_count = pending.count()
+        matcher = LessonRequestMatcher(options['price'])
+
+        if options['dry_run']:
+            matches = matcher.match(pending)
+            for lesson_request, tutor_id in matches:
+                self.stdout.write(f"Request #{lesson_request.id} ({lesson_request.subject}) -> tutor #{tutor_id}")
+            self.stdout.write(f"{len(matches)} of {pending_count} pending requests can be assigned.")
+            return
+
+        confirmed = matcher.assign(pending)
+        self.stdout.write(f"Assigned {len(confirmed)} of {pending_count} pending requests.")
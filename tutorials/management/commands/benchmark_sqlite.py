@@ -0,0 +1,137 @@
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from tutorials.management.commands.load_test import percentile
+from tutorials.models import LessonStatus
+from tutorials.sqlite import SQLITE_DEFAULT_PRAGMAS, apply_pragmas
+
+
+class Command(BaseCommand):
+    """Benchmark command running concurrent readers and writers against a copy of the SQLite database.
+
+    The same workload runs twice on the copy: first with SQLite's default journal, then with SQLITE_PRAGMAS.
+    Readers load a tutor's calendar month, as the calendar page does, while writers save lesson feedback one row per
+    transaction, as per-row saves do. The database itself is never written to.
+    """
+
+    help = 'Compares concurrent reads and writes on a copy of the SQLite database with default and tuned pragmas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4, help='Number of threads loading calendar months')
+        parser.add_argument('--writers', type=int, default=2, help='Number of threads saving lesson feedback')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each round')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('The benchmark needs the sqlite database profile.')
+        if options['readers'] < 0 or options['writers'] < 0 or options['readers'] + options['writers'] == 0:
+            raise CommandError('--readers and --writers must not be negative, and at least one must be positive.')
+        if options['seconds'] <= 0:
+            raise CommandError('--seconds must be positive.')
+
+        past = LessonStatus.objects.filter(date__lt=date.today()).order_by('-date')
+        occurrences = list(past.values_list('pk', flat=True)[:1000])
+        if not occurrences:
+            raise CommandError('There are no past lessons to read and write, seed the database first.')
+        reads = self.calendar_queries(past.values_list('date', flat=True).first())
+
+        with TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'benchmark.sqlite3')
+            self.copy_database(path)
+            rounds = [
+                ('default', self.run_round(path, SQLITE_DEFAULT_PRAGMAS, reads, occurrences, options)),
+                ('tuned', self.run_round(path, settings.SQLITE_PRAGMAS, reads, occurrences, options)),
+            ]
+        self.report(rounds, options['seconds'])
+
+    def calendar_queries(self, day):
+        """Returns the SQL and parameters loading the calendar month of the given day of up to 50 tutors teaching in it."""
+        start = day.replace(day=1)
+        end = (start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+        tutor_ids = LessonStatus.objects.filter(date__range=(start, end)).values_list(
+            'lesson_id__tutor_id', flat=True
+        ).distinct().order_by('lesson_id__tutor_id')[:50]
+        queries = []
+        for tutor_id in tutor_ids:
+            sql, params = LessonStatus.objects.filter(
+                lesson_id__tutor_id=tutor_id, date__range=(start, end)
+            ).load('calendar').order_by('date', 'time').query.sql_with_params()
+            # Django writes placeholders as %s and converts them to SQLite's ? in its cursor, bypassed here
+            queries.append((sql.replace('%s', '?'), params))
+        return queries
+
+    def copy_database(self, path):
+        """Copies the configured database, including an in-memory one, to the given file."""
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM INTO %s', [path])
+
+    def run_round(self, path, pragmas, reads, occurrences, options):
+        """Runs the readers and writers with the given pragmas, returning the kind, seconds and success of each query."""
+        # The journal mode is a property of the file, switched before the workers open their connections
+        database = sqlite3.connect(path)
+        try:
+            apply_pragmas(database, pragmas)
+        finally:
+            database.close()
+
+        results = []
+        deadline = perf_counter() + options['seconds']
+        threads = [
+            Thread(target=self.run_worker, args=(path, pragmas, index, 'read', reads, occurrences, deadline, results))
+            for index in range(options['readers'])
+        ] + [
+            Thread(target=self.run_worker, args=(path, pragmas, index, 'write', reads, occurrences, deadline, results))
+            for index in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def run_worker(self, path, pragmas, index, kind, reads, occurrences, deadline, results):
+        """Sends queries of one kind until the deadline, each in its own transaction."""
+        database = sqlite3.connect(path, timeout=5, isolation_level=None)
+        rng = Random(index)
+        table = LessonStatus._meta.db_table
+        try:
+            apply_pragmas(database, pragmas)
+            while perf_counter() < deadline:
+                started = perf_counter()
+                try:
+                    if kind == 'read':
+                        database.execute(*rng.choice(reads)).fetchall()
+                    else:
+                        database.execute(
+                            f'UPDATE {table} SET feedback = ? WHERE id = ?',
+                            (f'Benchmark feedback {rng.random()}', rng.choice(occurrences))
+                        )
+                    ok = True
+                except sqlite3.OperationalError:
+                    ok = False
+                results.append((kind, perf_counter() - started, ok))
+        finally:
+            database.close()
+
+    def report(self, rounds, seconds):
+        """Writes the throughput, p95 latency and lock errors of reads and writes in each round."""
+        self.stdout.write(
+            f"{'pragmas':<10}{'reads/s':>10}{'read p95 ms':>13}{'writes/s':>10}{'write p95 ms':>14}{'errors':>8}"
+        )
+        for name, results in rounds:
+            reads = [duration * 1000 for kind, duration, ok in results if kind == 'read' and ok]
+            writes = [duration * 1000 for kind, duration, ok in results if kind == 'write' and ok]
+            errors = sum(1 for kind, duration, ok in results if not ok)
+            self.stdout.write(
+                f"{name:<10}{len(reads) / seconds:>10.1f}{percentile(reads, 0.95) if reads else 0:>13.2f}"
+                f"{len(writes) / seconds:>10.1f}{percentile(writes, 0.95) if writes else 0:>14.2f}{errors:>8}"
+            )
@@ -0,0 +1,57 @@
+from collections import Counter
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Min
+
+from tutorials.caching import invalidate_all_calendars
+from tutorials.models import LessonStatus, Status, Watermark
+
+
+class Command(BaseCommand):
+    """Batch command to settle the status of past lessons."""
+
+    WATERMARK_NAME = 'complete_past_lessons'
+    help = ('Marks scheduled lessons in the past as completed and pending ones as cancelled, '
+            'resuming from the last run')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-days', type=int, default=7,
+                            help='Number of days of lessons updated per transaction')
+        parser.add_argument('--full', action='store_true',
+                            help='Ignore the watermark and sweep every past lesson')
+
+    def handle(self, *args, **options):
+        chunk = timedelta(days=options['chunk_days'])
+        if chunk <= timedelta(0):
+            raise CommandError('--chunk-days must be a positive number of days.')
+
+        today = date.today()
+        start = self.get_start_date(options['full'])
+        settled = Counter()
+
+        while start is not None and start < today:
+            end = min(start + chunk, today)
+            with transaction.atomic():
+                settled.update(LessonStatus.objects.filter(date__gte=start, date__lt=end).settle_past())
+                Watermark.objects.update_or_create(name=self.WATERMARK_NAME, defaults={'value': end})
+            start = end
+
+        if settled.total():
+            invalidate_all_calendars()
+
+        self.stdout.write(
+            f"Marked {settled[Status.COMPLETED]} past lessons as completed "
+            f"and {settled[Status.CANCELLED]} as cancelled up to {today}."
+        )
+
+    def get_start_date(self, full):
+        """Returns the first date to sweep, the watermark of the last run unless a full sweep is asked."""
+        if not full:
+            watermark = Watermark.objects.filter(name=self.WATERMARK_NAME).first()
+            if watermark:
+                return watermark.value
+        return LessonStatus.objects.filter(
+            status__in=LessonStatus.PAST_STATUSES
+        ).aggregate(first=Min('date'))['first']
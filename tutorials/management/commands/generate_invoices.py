@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tutorials.invoicing import InvoicingRun
+
+
+class Command(BaseCommand):
+    """Batch command to invoice every student for their completed lessons."""
+
+    help = 'Creates one invoice per student for all completed lessons not invoiced yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--until', type=date.fromisoformat, default=None,
+                            help='Last lesson date to bill, as YYYY-MM-DD (defaults to today)')
+        parser.add_argument('--due-days', type=int, default=settings.INVOICE_DUE_DAYS,
+                            help='Number of days until the invoices are due')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Number of students invoiced per transaction')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk-size must be a positive number of students.')
+        if options['due_days'] < 0:
+            raise CommandError('--due-days cannot be negative.')
+
+        invoicing_run = InvoicingRun(
+            until=options['until'],
+            due_date=date.today() + timedelta(days=options['due_days']),
+            chunk_size=options['chunk_size'],
+        )
+        totals = invoicing_run.run()
+        self.stdout.write(
+            f"Created {totals['invoices']} invoices for {totals['lessons']} lessons, totalling ${totals['amount']:.2f}."
+        )
@@ -0,0 +1,136 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from random import Random
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from tutorials.models import Admin, LessonStatus, Student, Tutor
+
+
+def percentile(values, fraction):
+    """Returns the value below which the given fraction of the values fall."""
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    """Load test command requesting the main pages from concurrent workers against the configured database.
+
+    Each worker is a thread with its own database connection, logged in as an admin, tutor or student of the seeded
+    data. Tutors also write feedback on past lessons, so reads compete with writes as they do in production.
+    """
+
+    READ_ROUTES = {
+        'admin': ['lessons_list', 'students_list', 'tutors_list', 'invoice_list', 'calendar'],
+        'tutor': ['lessons_list', 'students_list', 'calendar', 'availability'],
+        'student': ['lessons_list', 'tutors_list', 'calendar', 'invoice_list', 'requests'],
+    }
+    WRITE_ROUTE = 'update_feedback'
+    help = 'Requests the main pages from concurrent workers and reports throughput and latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Number of workers sending requests at the same time')
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Number of requests each worker sends')
+        parser.add_argument('--write-ratio', type=float, default=0.1,
+                            help='Share of the requests of tutor workers that write lesson feedback')
+
+    def handle(self, *args, **options):
+        if options['workers'] <= 0 or options['requests'] <= 0:
+            raise CommandError('--workers and --requests must be positive.')
+        if not 0 <= options['write_ratio'] <= 1:
+            raise CommandError('--write-ratio must be between 0 and 1.')
+
+        self.describe_database()
+        workers = self.plan_workers(options['workers'])
+
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            futures = [
+                executor.submit(self.run_worker, index, role, user, occurrences, options['requests'], options['write_ratio'])
+                for index, (role, user, occurrences) in enumerate(workers)
+            ]
+            results = [result for future in futures for result in future.result()]
+        self.report(results, perf_counter() - started)
+
+    def describe_database(self):
+        """Reports the database under test, with the journal mode set by SQLITE_PRAGMAS on SQLite."""
+        settings_dict = connection.settings_dict
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+            self.stdout.write(f"Database: SQLite, journal mode {journal_mode}")
+        else:
+            pool = settings_dict.get('OPTIONS', {}).get('pool')
+            self.stdout.write(
+                f"Database: {connection.display_name}, "
+                f"{'connection pool' if pool else 'CONN_MAX_AGE ' + str(settings_dict['CONN_MAX_AGE'])}"
+            )
+
+    def plan_workers(self, count):
+        """Returns the role, user and past lesson occurrences of every worker, spreading workers across roles."""
+        profiles = {
+            'admin': list(Admin.objects.load('list')[:count]),
+            'tutor': list(Tutor.objects.load('list')[:count]),
+            'student': list(Student.objects.load('list')[:count]),
+        }
+        roles = [role for role, users in profiles.items() if users]
+        if not roles:
+            raise CommandError('There are no users to log in as, seed the database first.')
+
+        workers = []
+        for index in range(count):
+            role = roles[index % len(roles)]
+            users = profiles[role]
+            profile = users[index // len(roles) % len(users)]
+            occurrences = []
+            if role == 'tutor':
+                occurrences = list(LessonStatus.objects.filter(
+                    lesson_id__tutor=profile, date__lt=date.today()
+                ).values_list('pk', flat=True)[:50])
+            workers.append((role, profile.user, occurrences))
+        return workers
+
+    def run_worker(self, index, role, user, occurrences, request_count, write_ratio):
+        """Sends the requests of one worker, returning the route, seconds taken and success of each."""
+        client = Client(SERVER_NAME='localhost')
+        client.raise_request_exception = False
+        rng = Random(index)
+        results = []
+        try:
+            client.force_login(user)
+            for _ in range(request_count):
+                if occurrences and rng.random() < write_ratio:
+                    route = self.WRITE_ROUTE
+                    url = reverse(route, args=[rng.choice(occurrences)])
+                    started = perf_counter()
+                    response = client.post(url, {'feedback': 'Load test feedback'})
+                else:
+                    route = rng.choice(self.READ_ROUTES[role])
+                    started = perf_counter()
+                    response = client.get(reverse(route))
+                results.append((route, perf_counter() - started, response.status_code < 400))
+        finally:
+            connections.close_all()
+        return results
+
+    def report(self, results, seconds):
+        """Writes the throughput, then the latency and errors of each route."""
+        errors = sum(1 for route, duration, ok in results if not ok)
+        self.stdout.write(
+            f"{len(results)} requests in {seconds:.2f}s ({len(results) / seconds:.1f} requests/s), {errors} errors"
+        )
+        self.stdout.write(f"{'route':<20}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for route in sorted({route for route, duration, ok in results}):
+            durations = [duration * 1000 for name, duration, ok in results if name == route]
+            route_errors = sum(1 for name, duration, ok in results if name == route and not ok)
+            self.stdout.write(
+                f"{route:<20}{len(durations):>10}{route_errors:>8}"
+                f"{percentile(durations, 0.5):>10.1f}{percentile(durations, 0.95):>10.1f}{max(durations):>10.1f}"
+            )
@@ -0,0 +1,40 @@
+import csv
+import hashlib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tutorials.models import PaymentBatch
+
+
+class Command(BaseCommand):
+    """Batch command to mark the invoices of a bank export as paid."""
+
+    help = 'Marks the invoices listed in the invoice_id column of a CSV bank export as paid, once per export'
+
+    def add_arguments(self, parser):
+        parser.add_argument('export', help='Path of the CSV export, with an invoice_id column')
+        parser.add_argument('--key', default=None,
+                            help='Idempotency key of the export (defaults to a hash of its contents)')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['export'], 'rb') as export:
+                contents = export.read()
+        except OSError as error:
+            raise CommandError(f"Could not read {options['export']}: {error}")
+
+        rows = csv.DictReader(contents.decode('utf-8-sig').splitlines())
+        if 'invoice_id' not in (rows.fieldnames or []):
+            raise CommandError('The export must have an invoice_id column.')
+        try:
+            invoice_ids = {int(row['invoice_id']) for row in rows if row['invoice_id'].strip()}
+        except ValueError:
+            raise CommandError('Every invoice_id must be a whole number.')
+
+        idempotency_key = options['key'] or hashlib.sha256(contents).hexdigest()
+        batch, settled = PaymentBatch.settle(idempotency_key, invoice_ids)
+
+        if settled:
+            self.stdout.write(f"Marked {batch.invoices_paid} of {len(invoice_ids)} invoices as paid.")
+        else:
+            self.stdout.write(f"This export was already settled on {batch.created_at:%Y-%m-%d %H:%M}, nothing was changed.")
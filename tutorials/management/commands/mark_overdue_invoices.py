@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from tutorials.models import Invoice
+
+
+class Command(BaseCommand):
+    """Batch command to mark unpaid invoices past their due date as overdue."""
+
+    help = 'Marks every unpaid invoice past its due date as overdue'
+
+    def handle(self, *args, **options):
+        overdue = Invoice.objects.mark_overdue()
+        self.stdout.write(f"Marked {overdue} unpaid invoices past their due date as overdue.")
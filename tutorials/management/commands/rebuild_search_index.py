@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tutorials.search import user_search
+
+
+class Command(BaseCommand):
+    """Command to reindex every user, for users written without signals such as bulk imports."""
+
+    help = 'Rebuilds the user search index'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user_search.rebuild()
+        self.stdout.write("Rebuilt the user search index.")
@@ -9,13 +9,21 @@ from tutorials.models.choices import *
 
 import pytz
 from faker import Faker
-from random import randint, random, choice
+from itertools import islice
+from random import randint, random, choice, seed as seed_random
 from datetime import timedelta, date, datetime, time
 
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from tutorials.availability_index import availability_index
+from tutorials.caching import invalidate_all_calendars, invalidate_current_term
+from tutorials.search import user_search
+
 from tutorials.models import (
     User, Admin, Student, Tutor, Lesson, Subject, Term,
     LessonStatus, Invoice, InvoiceLessonLink, LessonRequest,
-    LessonUpdateRequest
+    LessonUpdateRequest, TutorAvailability, Frequency
 )
 
 user_fixtures = [
@@ -42,167 +50,203 @@ subjects = [
     {'name': 'Web Development', 'description': 'Use HTML/CSS with Javascript to create interactive websites.'},
 ]
 
-lessons = []
-lesson_status = []
-
-
 class Command(BaseCommand):
-    """Build automation command to seed the database."""
+    """Build automation command to seed the database.
+
+    Rows are built in memory and written with bulk inserts in batches inside a single transaction, so large datasets
+    for load tests are seeded in minutes. Bulk inserts skip model signals, so the search index and the caches they
+    would have kept in sync are refreshed once at the end.
+    """
 
     USER_COUNT = 150
     LESSON_COUNT = 200
+    BATCH_SIZE = 1000
     DEFAULT_PASSWORD = 'Password123'
     help = 'Seeds the database with sample data'
 
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.faker = Faker('en_GB')
 
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=self.USER_COUNT,
+                            help='Number of users in the seeded database, including existing ones')
+        parser.add_argument('--lessons', type=int, default=self.LESSON_COUNT,
+                            help='Number of lessons in the seeded database, including existing ones')
+        parser.add_argument('--seed', type=int,
+                            help='Seed of the random generators, to seed the same data on every run')
+        parser.add_argument('--batch-size', type=int, default=self.BATCH_SIZE,
+                            help='Number of rows written per insert')
+
     def handle(self, *args, **options):
-        self.create_users()
-        self.users = User.objects.all()
-        self.create_other_models()
-        self.seed_invoices()
-        self.seed_lesson_requests()
-        self.seed_update_requests()
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size must be a positive number of rows.')
+        self.user_count = options['users']
+        self.lesson_count = options['lessons']
+        self.batch_size = options['batch_size']
+        if options['seed'] is not None:
+            seed_random(options['seed'])
+            self.faker.seed_instance(options['seed'])
+
+        with transaction.atomic():
+            self.create_users()
+            self.create_other_models()
+            self.seed_invoices()
+            self.seed_lesson_requests()
+            self.seed_update_requests()
+
+        user_search.rebuild()
+        invalidate_all_calendars()
+        invalidate_current_term()
+        availability_index.clear()
 
     def create_other_models(self):
         self.create_terms()
-        self.terms = Term.objects.all()
-
         self.create_subjects()
-        self.subjects = Subject.objects.all()
-
         self.generate_random_lessons()
-        self.lessons = Lesson.objects.all()
 
     def create_users(self):
-        self.generate_user_fixtures()
-        self.generate_random_users()
-
-    def generate_user_fixtures(self):
-        for data in user_fixtures:
-            self.try_create_user(data)
-
-    def generate_random_users(self):
-        user_count = User.objects.count()
-        while user_count < self.USER_COUNT:
-            print(f"Seeding user {user_count}/{self.USER_COUNT}", end='\r')
-            self.generate_user()
-            user_count = User.objects.count()
-        print("User seeding complete.      ")
+        """Creates the fixture users, then random users up to the requested count."""
+        # Hashing is deliberately slow, so every seeded user shares the hash of the default password
+        self.password = make_password(Command.DEFAULT_PASSWORD)
+        self.usernames = set(User.objects.values_list('username', flat=True))
+        self.emails = set(User.objects.values_list('email', flat=True))
+
+        users = [data for data in user_fixtures if self.claim(data['username'], data['email'])]
+        missing = self.user_count - len(self.usernames)
+        users.extend(self.generate_user() for _ in range(max(missing, 0)))
+
+        created = 0
+        for batch in batched(users, self.batch_size):
+            created += self.write_users(batch)
+            self.stdout.write(f"Seeding user {created}/{len(users)}", ending='\r')
+        self.stdout.write(f"User seeding complete: {created} users created.")
+
+    def claim(self, username, email):
+        """Reserves a username and email for a new user, returning False when either is taken."""
+        if username in self.usernames or email in self.emails:
+            return False
+        self.usernames.add(username)
+        self.emails.add(email)
+        return True
 
     def generate_user(self):
+        """Returns the data of a random user, numbering the username and email when the name is taken."""
         first_name = self.faker.first_name()
         last_name = self.faker.last_name()
+        username = create_username(first_name, last_name)[:24]
         email = create_email(first_name, last_name)
-        username = create_username(first_name, last_name)
-        roles = ['Admin', 'Tutor', 'Student']
-        role = roles[randint(0, 2)]
-        self.try_create_user(
-            {'username': username, 'email': email, 'first_name': first_name, 'last_name': last_name, 'role': role})
-
-    def try_create_user(self, data):
-        try:
-            self.create_user(data)
-        except:
-            pass
-
-    def create_user(self, data):
-        user = User.objects.create_user(
-            username=data['username'],
-            email=data['email'],
-            password=Command.DEFAULT_PASSWORD,
-            first_name=data['first_name'],
-            last_name=data['last_name'],
-        )
+        suffix = 1
+        while not self.claim(username, email):
+            suffix += 1
+            username = f"{create_username(first_name, last_name)[:24]}{suffix}"
+            email = create_email(first_name, last_name).replace('@', f'{suffix}@')
+        return {
+            'username': username, 'email': email, 'first_name': first_name, 'last_name': last_name,
+            'role': choice(['Admin', 'Tutor', 'Student'])
+        }
+
+    def write_users(self, batch):
+        """Inserts a batch of users and their profiles, returning the number of users inserted."""
+        users = User.objects.bulk_create([
+            User(
+                username=data['username'],
+                email=data['email'],
+                password=self.password,
+                first_name=data['first_name'],
+                last_name=data['last_name'],
+            )
+            for data in batch
+        ])
 
-        if data['role'] == 'Admin':
-            Admin.objects.create(user=user)
-        elif data['role'] == 'Tutor':
-            Tutor.objects.create(user=user)
-        else:
-            Student.objects.create(user=user)
+        profiles = {'Admin': Admin, 'Tutor': Tutor, 'Student': Student}
+        for role, profile in profiles.items():
+            profile.objects.bulk_create([
+                profile(user=user) for user, data in zip(users, batch) if data['role'] == role
+            ])
+        return len(users)
 
     def create_terms(self):
-        counter = 1
-        for data in term_dates:
-            try:
-                Term.objects.create(
-                    start_date=data["start_date"],
-                    end_date=data["end_date"],
-                    term_name=counter
-                )
-                counter += 1
-                if counter > 3:
-                    counter = 1
-            except:
-                pass
+        existing = set(Term.objects.values_list('start_date', 'end_date'))
+        Term.objects.bulk_create([
+            Term(start_date=data['start_date'], end_date=data['end_date'], term_name=counter)
+            for counter, data in enumerate(term_dates, start=1)
+            if (date.fromisoformat(data['start_date']), date.fromisoformat(data['end_date'])) not in existing
+        ])
 
     def create_subjects(self):
+        existing = set(Subject.objects.values_list('name', flat=True))
         for data in subjects:
-            try:
-                existing_subject = Subject.objects.filter(name=data["name"]).first()
-                if existing_subject:
-                    print(f"Subject '{data['name']}' already exists.")
-                else:
-                    Subject.objects.create(name=data["name"], description=data["description"])
-                    print(f"Subject '{data['name']}' added.")
-            except:
-                pass
+            if data['name'] in existing:
+                self.stdout.write(f"Subject '{data['name']}' already exists.")
+            else:
+                Subject.objects.create(name=data["name"], description=data["description"])
+                self.stdout.write(f"Subject '{data['name']}' added.")
 
     def generate_random_lessons(self):
-        lesson_count = Lesson.objects.count()
-        while lesson_count < self.LESSON_COUNT:
-            print(f"Seeding lesson {lesson_count}/{self.LESSON_COUNT}", end='\r')
-            self.generate_lesson()
-            lesson_count = Lesson.objects.count()
-        print("Lesson seeding complete.      ")
+        """Creates random lessons up to the requested count, each with a distinct tutor, student and subject."""
+        self.tutor_ids = list(Tutor.objects.values_list('pk', flat=True))
+        self.student_ids = list(Student.objects.values_list('pk', flat=True))
+        self.subjects = list(Subject.objects.all())
+        self.terms = list(Term.objects.all())
+        if not (self.tutor_ids and self.student_ids and self.subjects and self.terms):
+            self.stdout.write("Lesson seeding skipped: lessons need tutors, students, subjects and terms.")
+            return
+
+        self.lesson_keys = set(Lesson.objects.values_list('tutor_id', 'student_id', 'subject_id'))
+        capacity = len(self.tutor_ids) * len(self.student_ids) * len(self.subjects)
+        missing = min(self.lesson_count, capacity) - len(self.lesson_keys)
+        lessons = (self.generate_lesson() for _ in range(max(missing, 0)))
+
+        created = occurrences = 0
+        for batch in batched(lessons, self.batch_size):
+            occurrences += self.write_lessons(batch)
+            created += len(batch)
+            self.stdout.write(f"Seeding lesson {created}/{missing}", ending='\r')
+        self.stdout.write(f"Lesson seeding complete: {created} lessons with {occurrences} occurrences created.")
 
     def generate_lesson(self):
-        tutors = Tutor.objects.all()
-        students = Student.objects.all()
-        all_subjects = Subject.objects.all()
-        terms = Term.objects.all()
-        frequencies = [c[0] for c in Lesson.frequency.field.choices]
-
-        tutor = choice(tutors)
-        student = choice(students)
-        subject = choice(all_subjects)
-        term = choice(terms)
-        frequency = choice(frequencies)
-        duration = timedelta(hours=choice([1, 2]), minutes=choice([00, 15, 30, 45]))
-        start_date = term.start_date
-        price_per_lesson = choice([20, 30, 40, 50])
-
-        if not Lesson.objects.filter(tutor=tutor, student=student, subject=subject).exists():
-            self.create_lesson({
-                'tutor': tutor,
-                'student': student,
-                'subject': subject,
-                'term': term,
-                'frequency': frequency,
-                'duration': duration,
-                'start_date': start_date,
-                'price_per_lesson': price_per_lesson
-            })
-
-    def create_lesson(self, data):
-        try:
-            lesson = Lesson.objects.create(
-                tutor=data["tutor"],
-                student=data["student"],
-                subject=data["subject"],
-                term=data["term"],
-                frequency=data["frequency"],
-                duration=data["duration"],
-                start_date=data["start_date"],
-                price_per_lesson=data["price_per_lesson"]
-            )
-            tutor = data["tutor"]
-            tutor.subjects.add(data["subject"])
-            return lesson
-        except:
-            pass
+        """Returns an unsaved random lesson, for a tutor, student and subject without one yet."""
+        key = (choice(self.tutor_ids), choice(self.student_ids), choice(self.subjects).pk)
+        while key in self.lesson_keys:
+            key = (choice(self.tutor_ids), choice(self.student_ids), choice(self.subjects).pk)
+        self.lesson_keys.add(key)
+
+        tutor_id, student_id, subject_id = key
+        term = choice(self.terms)
+        return Lesson(
+            tutor_id=tutor_id,
+            student_id=student_id,
+            subject_id=subject_id,
+            term=term,
+            frequency=choice(Frequency.values),
+            duration=timedelta(hours=choice([1, 2]), minutes=choice([00, 15, 30, 45])),
+            # Spread the lessons over the weekdays of the term's first week
+            start_date=term.start_date + timedelta(days=randint(0, 6)),
+            price_per_lesson=choice([20, 30, 40, 50]),
+        )
+
+    def write_lessons(self, batch):
+        """Inserts a batch of lessons with their occurrences, booked slots and tutor subjects.
+
+        Returns the number of occurrences inserted.
+        """
+        lessons = Lesson.objects.bulk_create(batch)
+
+        lesson_statuses = []
+        slots = {}
+        for lesson in lessons:
+            occurrences, slot = lesson.build_lesson_statuses()
+            lesson_statuses.extend(occurrences)
+            slots.setdefault((slot.tutor_id, slot.day, slot.start_time, slot.end_time), slot)
+
+        LessonStatus.objects.bulk_create(lesson_statuses, batch_size=self.batch_size)
+        TutorAvailability.objects.bulk_create(slots.values(), ignore_conflicts=True)
+        Tutor.subjects.through.objects.bulk_create([
+            Tutor.subjects.through(tutor_id=tutor_id, subject_id=subject_id)
+            for tutor_id, subject_id in {(lesson.tutor_id, lesson.subject_id) for lesson in lessons}
+        ], ignore_conflicts=True)
+        return len(lesson_statuses)
 
     def seed_invoices(self):
         """Seed the database with sample invoices."""
@@ -239,12 +283,12 @@ class Command(BaseCommand):
                     lesson.invoiced = True
                     lesson.save()
 
-                print(f"Seeding invoice {i+1}/5", end='\r')
+                self.stdout.write(f"Seeding invoice {i+1}/5", ending='\r')
             except Exception as e:
-                print(f"Error creating invoice {i + 1}: {str(e)}")
+                self.stderr.write(f"Error creating invoice {i + 1}: {str(e)}")
                 continue
 
-        print("Invoice seeding complete.")
+        self.stdout.write("Invoice seeding complete.")
 
     def seed_lesson_requests(self):
         """Seed the database with sample lesson requests."""
@@ -282,12 +326,12 @@ class Command(BaseCommand):
                     start_date=term.start_date + timedelta(days=randint(0, 30))
                 )
 
-                print(f"Seeding lesson request {i+1}/10", end='\r')
+                self.stdout.write(f"Seeding lesson request {i+1}/10", ending='\r')
             except Exception as e:
-                print(f"Error creating lesson request {i + 1}: {str(e)}")
+                self.stderr.write(f"Error creating lesson request {i + 1}: {str(e)}")
                 continue
 
-        print("Lesson request seeding complete.")
+        self.stdout.write("Lesson request seeding complete.")
 
     def seed_update_requests(self):
         """Seed the database with sample lesson update requests."""
@@ -323,16 +367,16 @@ class Command(BaseCommand):
                     LessonStatus.objects.filter(lesson_id=lesson, status=Status.SCHEDULED).update(status=Status.PENDING)
 
                 #print(f"Created update request for lesson {lesson.pk}")  # Changed from lesson_id to pk
-                print(f"Seeding update request {index+1}/{len(lessons)}", end='\r')
+                self.stdout.write(f"Seeding update request {index+1}/{len(lessons)}", ending='\r')
             except Exception as e:
-                print(f"Error creating update request: {str(e)}")
+                self.stderr.write(f"Error creating update request: {str(e)}")
                 continue
 
-        print("Update request seeding complete.")
+        self.stdout.write("Update request seeding complete.")
 
 
 def create_username(first_name, last_name):
-    return '@' + first_name.lower() + last_name.lower()
+    return '@' + clean_and_lowercase(first_name) + clean_and_lowercase(last_name)
 
 
 def create_email(first_name, last_name):
@@ -340,4 +384,11 @@ def create_email(first_name, last_name):
 
 
 def clean_and_lowercase(input_string):
-    return ''.join(filter(str.isalpha, input_string)).lower()
\ No newline at end of file
+    return ''.join(filter(str.isalpha, input_string)).lower()
+
+
+def batched(iterable, size):
+    """Yields lists of up to size items from an iterable, without reading it all into memory."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
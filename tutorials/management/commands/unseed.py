@@ -1,4 +1,12 @@
+from time import perf_counter
+
+from django.contrib.admin.models import LogEntry
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from tutorials.availability_index import availability_index
+from tutorials.caching import invalidate_all_calendars, invalidate_current_term
+from tutorials.search import user_search
 from tutorials.models.shared import *
 from tutorials.models.users import *
 from tutorials.models.lessons import *
@@ -9,7 +17,7 @@ from tutorials.models.choices import *
 from tutorials.models import (
     User, Admin, Student, Tutor, Lesson, Subject, Term,
     LessonStatus, Invoice, InvoiceLessonLink, LessonRequest,
-    LessonUpdateRequest
+    LessonUpdateRequest, PaymentBatch, TutorAvailability, TutorReview, Watermark
 )
 
 
@@ -18,8 +26,22 @@ class Command(BaseCommand):
 
     help = 'Unseeds the database by removing all sample data'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--fast', action='store_true',
+                            help='Empty each table with one bulk statement in a single transaction, skipping model signals')
+        parser.add_argument('--vacuum', action='store_true',
+                            help='Reclaim the space freed by a fast unseed (SQLite only)')
+
     def handle(self, *args, **options):
         """Unseed the database."""
+        if options['fast']:
+            self.fast_unseed()
+            if options['vacuum']:
+                self.vacuum()
+            return
+        if options['vacuum']:
+            raise CommandError('--vacuum only applies to a fast unseed.')
+
         print("Starting database unseeding...")
 
         # Delete in order to respect foreign key constraints
@@ -47,6 +69,10 @@ class Command(BaseCommand):
         print("Deleting terms...")
         Term.objects.all().delete()
 
+        # Batch jobs would otherwise resume after the dates of the deleted data and skip those of the next seed
+        print("Deleting batch job watermarks...")
+        Watermark.objects.all().delete()
+
         # Delete users and their profiles
         print("Deleting user profiles...")
         Admin.objects.all().delete()
@@ -56,4 +82,62 @@ class Command(BaseCommand):
         print("Deleting users...")
         User.objects.filter(is_staff=False).delete()
 
-        print("Database unseeding complete.")
\ No newline at end of file
+        print("Database unseeding complete.")
+
+    def fast_unseed(self):
+        """Deletes the sample data table by table with raw DELETE statements, children before their parents.
+
+        Django's delete collector loads every row to cascade and send signals, which takes minutes on large tables.
+        Unconditional deletes instead let SQLite drop whole tables at once. Staff users are kept, as in a regular
+        unseed, and the caches and search index that signals would have updated are refreshed at the end.
+        Batch job watermarks are deleted too, so the jobs sweep the next seed from its first date.
+        """
+        non_staff = f'SELECT id FROM {User._meta.db_table} WHERE NOT is_staff'
+        tables = [
+            (InvoiceLessonLink, ''),
+            (Invoice, ''),
+            (PaymentBatch, ''),
+            (LessonUpdateRequest, ''),
+            (LessonRequest, ''),
+            (LessonStatus, ''),
+            (Lesson, ''),
+            (TutorReview, ''),
+            (TutorAvailability, ''),
+            (Tutor.subjects.through, ''),
+            (Subject, ''),
+            (Term, ''),
+            (Watermark, ''),
+            (Admin, ''),
+            (Tutor, ''),
+            (Student, ''),
+            (User.groups.through, f'WHERE user_id IN ({non_staff})'),
+            (User.user_permissions.through, f'WHERE user_id IN ({non_staff})'),
+            (LogEntry, f'WHERE user_id IN ({non_staff})'),
+            (User, 'WHERE NOT is_staff'),
+        ]
+
+        total_rows = 0
+        started = perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model, where in tables:
+                table = model._meta.db_table
+                table_started = perf_counter()
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(table)} {where}')
+                total_rows += cursor.rowcount
+                self.stdout.write(f"{table}: {cursor.rowcount} rows deleted in {perf_counter() - table_started:.2f}s")
+            user_search.rebuild()
+
+        invalidate_all_calendars()
+        invalidate_current_term()
+        availability_index.clear()
+        self.stdout.write(f"Database unseeding complete: {total_rows} rows deleted in {perf_counter() - started:.2f}s.")
+
+    def vacuum(self):
+        """Rebuilds the SQLite database file so it shrinks back after a large unseed."""
+        if connection.vendor != 'sqlite':
+            self.stdout.write("VACUUM skipped: it only applies to SQLite.")
+            return
+        started = perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM')
+        self.stdout.write(f"VACUUM complete in {perf_counter() - started:.2f}s.")
@@ -0,0 +1,103 @@
+from collections import Counter, defaultdict
+from datetime import datetime, date
+
+from django.db import transaction
+
+from tutorials.availability_index import availability_index
+from tutorials.models import Lesson, LessonRequest, Status, Student, Tutor, TutorAvailability
+
+
+"""
+This file contains the engine to
+Assign tutors to pending lesson requests in bulk
+"""
+
+class LessonRequestMatcher:
+    """Greedily assigns every pending lesson request to a tutor, oldest request first.
+
+    A tutor is a candidate for a request when they teach its subject, have an available slot covering the
+    requested weekday and time, have no booked slot overlapping it and do not already teach that student the
+    subject. Among the candidates the tutor with the fewest lessons wins, to spread requests across tutors.
+    Everything needed is loaded up front in a fixed number of queries, whatever the number of requests.
+    """
+
+    def __init__(self, price_per_lesson):
+        self.price_per_lesson = price_per_lesson
+
+    def match(self, lesson_requests=None):
+        """Returns a list of (lesson request, tutor id) pairs, without writing anything."""
+        if lesson_requests is None:
+            lesson_requests = LessonRequest.objects.filter(status=Status.PENDING, lesson_assigned__isnull=True)
+        lesson_requests = list(lesson_requests.load('matching').order_by('created', 'id'))
+
+        tutors_by_subject = defaultdict(set)
+        for tutor_id, subject_id in Tutor.subjects.through.objects.values_list('tutor_id', 'subject_id'):
+            tutors_by_subject[subject_id].add(tutor_id)
+
+        lessons = list(Lesson.objects.values_list('tutor_id', 'student_id', 'subject_id'))
+        taught = set(lessons)
+        lesson_counts = Counter(tutor_id for tutor_id, student_id, subject_id in lessons)
+
+        booked = defaultdict(list)
+        for tutor_id, day, start_time, end_time in TutorAvailability.objects.filter(
+            status=TutorAvailability.Availability.BOOKED
+        ).values_list('tutor_id', 'day', 'start_time', 'end_time'):
+            booked[(tutor_id, day)].append((start_time, end_time))
+
+        matches = []
+        for lesson_request in lesson_requests:
+            day = lesson_request.start_date.weekday()
+            start_time = lesson_request.time
+            end_datetime = datetime.combine(date.min, start_time) + lesson_request.duration
+            if end_datetime.date() != date.min:
+                # Lessons running past midnight cannot fit in a daily slot
+                continue
+            end_time = end_datetime.time()
+
+            candidates = [
+                tutor_id for tutor_id in availability_index.available_tutors(
+                    day, start_time, end_time, tutor_ids=tutors_by_subject[lesson_request.subject_id]
+                )
+                if (tutor_id, lesson_request.student_id, lesson_request.subject_id) not in taught
+                and not any(start_time < booked_end and booked_start < end_time
+                            for booked_start, booked_end in booked[(tutor_id, day)])
+            ]
+            if not candidates:
+                continue
+
+            tutor_id = min(candidates, key=lambda candidate: (lesson_counts[candidate], candidate))
+            matches.append((lesson_request, tutor_id))
+
+            # Later requests in this run must see this booking
+            taught.add((tutor_id, lesson_request.student_id, lesson_request.subject_id))
+            lesson_counts[tutor_id] += 1
+            booked[(tutor_id, day)].append((start_time, end_time))
+
+        return matches
+
+    def assign(self, lesson_requests=None):
+        """Creates the lessons of every match in a single transaction and returns the confirmed requests."""
+        matches = self.match(lesson_requests)
+
+        with transaction.atomic():
+            for lesson_request, tutor_id in matches:
+                lesson_request.lesson_assigned = Lesson.objects.create(
+                    tutor_id=tutor_id,
+                    student=lesson_request.student,
+                    subject=lesson_request.subject,
+                    term=lesson_request.term,
+                    frequency=lesson_request.frequency,
+                    duration=lesson_request.duration,
+                    set_start_time=lesson_request.time,
+                    start_date=lesson_request.start_date,
+                    price_per_lesson=self.price_per_lesson,
+                )
+                lesson_request.status = Status.CONFIRMED
+
+            confirmed = [lesson_request for lesson_request, tutor_id in matches]
+            LessonRequest.objects.bulk_update(confirmed, ['lesson_assigned', 'status'])
+            Student.objects.filter(
+                pk__in={lesson_request.student_id for lesson_request in confirmed}
+            ).update(has_new_lesson_notification=True)
+
+        return confirmed
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.2 on 2026-10-18 21:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0003_paymentbatch'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['-created_at'], name='invoice_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['status', 'due_date'], name='invoice_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonrequest',
+            index=models.Index(fields=['student', '-created'], name='lessonrequest_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonrequest',
+            index=models.Index(fields=['-created'], name='lessonrequest_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonstatus',
+            index=models.Index(fields=['lesson_id', 'date'], name='lessonstatus_lesson_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonstatus',
+            index=models.Index(fields=['lesson_id', 'status'], name='lessonstatus_lesson_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonstatus',
+            index=models.Index(fields=['status', 'date'], name='lessonstatus_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessonupdaterequest',
+            index=models.Index(condition=models.Q(('is_handled', 'N')), fields=['lesson'], name='updaterequest_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutoravailability',
+            index=models.Index(fields=['tutor', 'day', 'status'], name='availability_tutor_day_idx'),
+        ),
+    ]
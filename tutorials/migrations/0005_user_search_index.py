@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+SEARCH_FIELDS = 'username, first_name, last_name, email'
+
+
+def create_search_index(apps, schema_editor):
+    """Creates the user search index of the database in use and fills it with the existing users."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"CREATE VIRTUAL TABLE tutorials_user_search USING fts5({SEARCH_FIELDS}, prefix='1 2 3')")
+        schema_editor.execute(f"CREATE VIRTUAL TABLE tutorials_user_trigram USING fts5({SEARCH_FIELDS}, tokenize='trigram')")
+        for table in ('tutorials_user_search', 'tutorials_user_trigram'):
+            schema_editor.execute(f"INSERT INTO {table} (rowid, {SEARCH_FIELDS}) SELECT id, {SEARCH_FIELDS} FROM tutorials_user")
+    elif vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+
+        User = apps.get_model('tutorials', 'User')
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.add_index(User, GinIndex(
+            SearchVector('username', 'first_name', 'last_name', 'email', config='simple'), name='user_search_vector_idx'
+        ))
+        for field in ('username', 'first_name', 'last_name', 'email'):
+            schema_editor.add_index(User, GinIndex(fields=[field], opclasses=['gin_trgm_ops'], name=f'user_{field}_trgm_idx'))
+
+
+def drop_search_index(apps, schema_editor):
+    """Drops the user search index of the database in use."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE tutorials_user_search')
+        schema_editor.execute('DROP TABLE tutorials_user_trigram')
+    elif vendor == 'postgresql':
+        for name in ['user_search_vector_idx'] + [f'user_{field}_trgm_idx' for field in ('username', 'first_name', 'last_name', 'email')]:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tutorials', '0004_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,10 +1,64 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
-from datetime import date
+from django.utils import timezone
+from datetime import date, timedelta
 from random import choices
 from tutorials.models.users import Student
 from tutorials.models.lessons import LessonStatus
 from tutorials.models.choices import PaymentStatus
+from tutorials.models.shared import LoadingProfile, LoadingQuerySet
+
+class InvoiceQuerySet(LoadingQuerySet):
+    """Queryset of invoices with totals computed by the database."""
+
+    # Differences below half a cent are rounding, not a wrong amount
+    RECONCILIATION_TOLERANCE = 0.005
+
+    loading_profiles = {
+        'list': LoadingProfile(select=('student__user',)),
+        'detail': LoadingProfile(select=('student__user',), prefetch=('lessons__lesson_id__subject',)),
+    }
+
+    def with_totals(self):
+        """Annotates each invoice with its lesson count, total duration and the amount its lessons add up to."""
+        return self.annotate(
+            lesson_count=Count('lessons'),
+            total_duration=Sum('lessons__lesson_id__duration'),
+            computed_amount=Coalesce(
+                Sum('lessons__lesson_id__price_per_lesson'),
+                Value(0),
+                output_field=DecimalField(max_digits=8, decimal_places=2),
+            ),
+        )
+
+    def mismatched(self):
+        """Returns the invoices whose stored amount differs from the amount their lessons add up to."""
+        return self.with_totals().annotate(
+            amount_difference=F('amount') - F('computed_amount')
+        ).filter(
+            Q(amount_difference__gt=self.RECONCILIATION_TOLERANCE) |
+            Q(amount_difference__lt=-self.RECONCILIATION_TOLERANCE)
+        )
+
+    def mark_as_paid(self):
+        """Marks every unpaid invoice of the queryset and their lessons as paid, returning how many invoices were paid.
+
+        Runs one UPDATE over the lessons linked to the invoices and one over the invoices, in a single transaction.
+        """
+        unpaid_invoices = self.exclude(status=PaymentStatus.PAID)
+        with transaction.atomic():
+            LessonStatus.objects.filter(invoice__in=unpaid_invoices).update(invoiced=True)
+            return unpaid_invoices.update(status=PaymentStatus.PAID, updated_at=timezone.now())
+
+    def mark_overdue(self, today=None):
+        """Marks every unpaid invoice of the queryset past its due date as overdue with one UPDATE, returning how many changed."""
+        today = today or date.today()
+        return self.filter(status=PaymentStatus.UNPAID, due_date__lt=today).update(
+            status=PaymentStatus.OVERDUE, updated_at=timezone.now()
+        )
+
 
 class Invoice(models.Model):
     """Model for an invoice for a student, linking to the respective lessons, and tracking payment status."""
@@ -16,6 +70,15 @@ class Invoice(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     amount = models.DecimalField(max_digits=6, decimal_places=2)
 
+    objects = InvoiceQuerySet.as_manager()
+
+    class Meta:
+        """Indexes the newest first invoice list and the overdue sweep."""
+        indexes = [
+            models.Index(fields=['-created_at'], name='invoice_created_idx'),
+            models.Index(fields=['status', 'due_date'], name='invoice_status_due_idx'),
+        ]
+
     def check_if_overdue(self):
         """Mark invoice as overdue if unpaid and past due date."""
         if self.status == PaymentStatus.UNPAID and self.due_date < date.today():
@@ -24,17 +87,17 @@ class Invoice(models.Model):
                 self.save()
 
     def get_total_hours(self):
-        """Calculate total hours for all associated lessons."""
-        return sum(lesson.lesson_id.duration.total_seconds() / 3600 for lesson in self.lessons.all())
+        """Calculate total hours for all associated lessons, using the with_totals annotation when present."""
+        if hasattr(self, 'total_duration'):
+            total_duration = self.total_duration
+        else:
+            total_duration = self.lessons.aggregate(total=Sum('lesson_id__duration'))['total']
+        return (total_duration or timedelta(0)).total_seconds() / 3600
 
     def mark_as_paid(self):
         """Mark the invoice as paid and update all associated lesson statuses respectively."""
-        self.status = 'PAID'
-        self.save()
-        # Update all associated lessons to mark them as invoiced
-        for lesson_status in self.lessons.all():
-            lesson_status.invoiced = True
-            lesson_status.save()
+        Invoice.objects.filter(pk=self.pk).mark_as_paid()
+        self.status = PaymentStatus.PAID
 
     def clean(self):
         """Shared validation logic for invoices."""
@@ -43,6 +106,34 @@ class Invoice(models.Model):
         if self.due_date < date.today():
             raise ValidationError("Due date cannot be in the past.")
 
+class PaymentBatch(models.Model):
+    """Model for a batch of invoice payments, such as a bank export, so the same batch is never settled twice."""
+    idempotency_key = models.CharField(max_length=128, unique=True)
+    invoices_paid = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.idempotency_key} ({self.invoices_paid} invoices paid)"
+
+    @classmethod
+    def settle(cls, idempotency_key, invoice_ids):
+        """Marks the given invoices as paid unless a batch with the same key was settled before.
+
+        Returns the batch and whether it was settled now. The batch is recorded in the same transaction as
+        the payments, so a concurrent import with the same key rolls back instead of paying twice.
+        """
+        existing_batch = cls.objects.filter(idempotency_key=idempotency_key).first()
+        if existing_batch:
+            return existing_batch, False
+
+        try:
+            with transaction.atomic():
+                invoices_paid = Invoice.objects.filter(pk__in=invoice_ids).mark_as_paid()
+                return cls.objects.create(idempotency_key=idempotency_key, invoices_paid=invoices_paid), True
+        except IntegrityError:
+            return cls.objects.get(idempotency_key=idempotency_key), False
+
+
 class InvoiceLessonLink(models.Model):
     """Model for the relationship between an invoice and the lessons in that invoice."""
     invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE)
@@ -1,15 +1,54 @@
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from libgravatar import Gravatar
 from django.core.exceptions import ValidationError
 from datetime import date, timedelta, datetime, time as pytime
-from random import randint, choice, choices
+from math import ceil
+from random import choice, choices
 from django.conf import settings
 from django.utils import timezone
 from tutorials.models.users import Tutor, TutorAvailability
-from tutorials.models.shared import Subject, Term
+from tutorials.models.shared import LoadingProfile, LoadingQuerySet, Subject, Term
 from tutorials.models.choices import Frequency, Status, Days
+from tutorials.caching import invalidate_lesson_calendars
+from tutorials.recurrence import occurrence_dates
+
+class LessonQuerySet(LoadingQuerySet):
+    """Queryset of lessons."""
+
+    loading_profiles = {
+        'list': LoadingProfile(select=('student__user', 'tutor__user', 'subject', 'term')),
+    }
+
+class LessonRequestQuerySet(LoadingQuerySet):
+    """Queryset of lesson requests."""
+
+    loading_profiles = {
+        'list': LoadingProfile(select=('student__user', 'subject', 'term', 'lesson_assigned')),
+        'matching': LoadingProfile(select=('student__user', 'subject', 'term')),
+    }
+
+class LessonUpdateRequestQuerySet(LoadingQuerySet):
+    """Queryset of lesson update requests."""
+
+    loading_profiles = {
+        'list': LoadingProfile(select=('lesson__student__user', 'lesson__tutor__user', 'lesson__subject')),
+    }
+
+class LessonStatusQuerySet(LoadingQuerySet):
+    """Queryset of lesson occurrences."""
+
+    loading_profiles = {
+        'calendar': LoadingProfile(select=('lesson_id__student__user', 'lesson_id__tutor__user', 'lesson_id__subject')),
+    }
+
+    def settle_past(self):
+        """Gives the lessons of the queryset their status of LessonStatus.PAST_STATUSES, returning the number updated per status."""
+        return {
+            past_status: self.filter(status=status).update(status=past_status)
+            for status, past_status in self.model.PAST_STATUSES.items()
+        }
 
 class BaseLesson(models.Model):
     """Abstract model for lessons."""
@@ -42,6 +81,8 @@ class Lesson(BaseLesson):
     price_per_lesson = models.DecimalField(max_digits=6, decimal_places=2)
     notes = models.CharField(max_length=50, blank=True)
 
+    objects = LessonQuerySet.as_manager()
+
     class Meta:
         unique_together = ('tutor', 'student', 'subject_id')
 
@@ -58,82 +99,81 @@ class Lesson(BaseLesson):
             raise ValidationError({"price_per_lesson": "Price per lesson must be greater than zero."})
 
     def save(self, *args, **kwargs):
-        """Creates associated lesson status and updates tutor availability."""
+        """Creates associated lesson statuses and updates tutor availability."""
         is_new = self.pk is None
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                self.create_lesson_statuses()
+
+    def create_lesson_statuses(self):
+        """Creates the lesson status of every occurrence in the term with a single insert."""
+        lesson_statuses, slot = self.build_lesson_statuses()
+        # bulk_create skips LessonStatus.save, so initial_status applies its date rules up front
+        LessonStatus.objects.bulk_create(lesson_statuses)
+        invalidate_lesson_calendars(self.tutor_id, self.student_id)
+
+        TutorAvailability.objects.get_or_create(
+            tutor=self.tutor,
+            day=slot.day,
+            start_time=slot.start_time,
+            end_time=slot.end_time,
+            defaults={'status': slot.status},
+        )
+
+    def build_lesson_statuses(self):
+        """Returns the unsaved lesson statuses from the start date to the end of the term, and the unsaved tutor slot they book."""
+        times = [
+            pytime(hour=h, minute=m)
+            for h in range(9, 19)
+            for m in (0, 30)
+        ]
+        if self.set_start_time is not None:
+            times = [self.set_start_time]
+        start_time = choice(times)
+        start_datetime = datetime.combine(date.today(), start_time)
+        end_time = (start_datetime + self.duration).time()
 
-        if is_new:
-            term = self.term
-            times = [
-                pytime(hour=h, minute=m)
-                for h in range(9, 19)
-                for m in (0, 30)
-            ]
-            if self.set_start_time is not None:
-                times = [self.set_start_time]
-            start_time = choice(times)
-            start_datetime = datetime.combine(date.today(), start_time)
-            end_datetime = start_datetime + self.duration
-            end_time = end_datetime.time()
-
-            today = date.today()
-
-            start_date = term.start_date
-            end_date = term.end_date
-
-            start_date += timedelta(days=randint(0, 6))
-
-            current_date = start_date
-            while current_date <= end_date:
-
-                if current_date is None:
-                    raise ValidationError("Due date cannot be empty.")
-                
-                if current_date >= today:
-                    # If the date is in the future, ensure feedback is empty and status is 'Scheduled'
-                    status = Status.SCHEDULED
-                else:
-                    # For past or current dates, randomize status and feedback
-                    status = choices([Status.COMPLETED, Status.CANCELLED], weights=[0.8, 0.2], k=1)[0]
-
-                if status == Status.COMPLETED:
-                    feedback = choice(['Good progress', 'Needs improvement', 'Excellent'])
-                elif status == Status.CANCELLED:
-                    feedback = '-'
-                else:
-                    feedback = ''
-                try:
-                    LessonStatus.objects.create(
-                        lesson_id=self,
-                        date=current_date,
-                        time=start_time,
-                        status=status,
-                        feedback=feedback,
-                        invoiced=False,
-                    )
-
-                    # Update date based on frequency
-                    if self.frequency == 'O':  # Daily
-                        break
-                    elif self.frequency == 'W':  # Weekly
-                        current_date += timedelta(weeks=1)
-                    elif self.frequency == 'M':  # Monthly
-                        current_date += timedelta(weeks=4)
-                    elif self.frequency == 'F':  # Biweekly
-                        current_date += timedelta(weeks=2)
-                except Exception as e:
-                    pass
-
-            try:
-                TutorAvailability.objects.create(
-                    tutor=self.tutor,
-                    day=start_date.weekday(),
-                    start_time=start_time,
-                    end_time=end_time,
-                    status=TutorAvailability.Availability.BOOKED,
-                )
-            except Exception as e:
-                pass
+        today = date.today()
+        # Lessons run on the weekday of their start date, the one their tutor's slot was booked for,
+        # from the first such day of the term
+        start_date = self._meta.get_field('start_date').to_python(self.start_date)
+        if start_date < self.term.start_date:
+            start_date += timedelta(weeks=ceil((self.term.start_date - start_date).days / 7))
+
+        lesson_statuses = []
+        for occurrence_date in occurrence_dates(start_date, self.term.end_date, self.frequency):
+            status, feedback = self.initial_status(occurrence_date, today)
+            lesson_statuses.append(LessonStatus(
+                lesson_id=self,
+                date=occurrence_date,
+                time=start_time,
+                status=status,
+                feedback=feedback,
+                invoiced=False,
+            ))
+
+        slot = TutorAvailability(
+            tutor_id=self.tutor_id,
+            day=start_date.weekday(),
+            start_time=start_time,
+            end_time=end_time,
+            status=TutorAvailability.Availability.BOOKED,
+        )
+        return lesson_statuses, slot
+
+    @staticmethod
+    def initial_status(occurrence_date, today):
+        """Returns the status and feedback of a newly generated lesson occurrence."""
+        if occurrence_date >= today:
+            # If the date is in the future, ensure feedback is empty and status is 'Scheduled'
+            return Status.SCHEDULED, ''
+
+        # For past dates, randomize status and feedback
+        status = choices([Status.COMPLETED, Status.CANCELLED], weights=[0.8, 0.2], k=1)[0]
+        if status == Status.COMPLETED:
+            return status, choice(['Good progress', 'Needs improvement', 'Excellent'])
+        return status, ''
 
 class LessonRequest(BaseLesson):
     """Model for a request for scheduling a lesson."""
@@ -146,6 +186,15 @@ class LessonRequest(BaseLesson):
     created = models.DateTimeField(auto_now_add=True)
     lesson_assigned = models.ForeignKey(Lesson, on_delete=models.CASCADE, null=True, blank=True)
 
+    objects = LessonRequestQuerySet.as_manager()
+
+    class Meta:
+        """Indexes the newest first request lists, for all requests and for one student."""
+        indexes = [
+            models.Index(fields=['student', '-created'], name='lessonrequest_student_idx'),
+            models.Index(fields=['-created'], name='lessonrequest_created_idx'),
+        ]
+
     def clean(self):
         """Ensures duration is positive, and the start date is positive and within the term dates."""
         if not self.start_date:
@@ -196,6 +245,14 @@ class LessonUpdateRequest(models.Model):
     made_by = models.CharField(max_length=10, choices=MadeBy.choices, default=MadeBy.TUTOR)
     is_handled = models.CharField(max_length=10, choices=IsHandled.choices, default=IsHandled.NOT_DONE)
 
+    objects = LessonUpdateRequestQuerySet.as_manager()
+
+    class Meta:
+        """Indexes only the requests still to handle, the ones every lesson page looks up."""
+        indexes = [
+            models.Index(fields=['lesson'], condition=models.Q(is_handled='N'), name='updaterequest_pending_idx'),
+        ]
+
 class LessonStatus(models.Model):
     """Model for the status of a specific lesson, including completion, feedback, and invoicing."""
     lesson_id = models.ForeignKey(Lesson, on_delete=models.CASCADE)
@@ -205,6 +262,23 @@ class LessonStatus(models.Model):
     feedback = models.CharField(max_length=255, blank=True)
     invoiced = models.BooleanField(default=False)
 
+    objects = LessonStatusQuerySet.as_manager()
+
+    # The status a lesson takes once its date has passed: a scheduled lesson took place, and a lesson still
+    # waiting on a change request did not. Applied on save and by the complete_past_lessons sweep.
+    PAST_STATUSES = {
+        Status.SCHEDULED: Status.COMPLETED,
+        Status.PENDING: Status.CANCELLED,
+    }
+
+    class Meta:
+        """Indexes the occurrences of a lesson by date and by status, and the sweeps over every lesson by status."""
+        indexes = [
+            models.Index(fields=['lesson_id', 'date'], name='lessonstatus_lesson_date_idx'),
+            models.Index(fields=['lesson_id', 'status'], name='lessonstatus_lesson_status_idx'),
+            models.Index(fields=['status', 'date'], name='lessonstatus_status_date_idx'),
+        ]
+
     def clean(self):
         if self.date is None:
             raise ValidationError("Due date cannot be empty.")
@@ -218,10 +292,7 @@ class LessonStatus(models.Model):
         if self.date > today:
             self.feedback = ""
         elif self.date < today:
-            if self.status == Status.PENDING:
-                self.status = Status.CANCELLED
-            elif self.status == Status.SCHEDULED:
-                self.status = Status.COMPLETED
+            self.status = self.PAST_STATUSES.get(self.status, self.status)
 
         if self.status != Status.COMPLETED:
             self.feedback = ''
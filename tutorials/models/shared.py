@@ -1,6 +1,29 @@
+from collections import namedtuple
+
 from django.db import models
 from django.core.exceptions import ValidationError
 
+LoadingProfile = namedtuple('LoadingProfile', ['select', 'prefetch'], defaults=[(), ()])
+
+
+class LoadingQuerySet(models.QuerySet):
+    """Queryset loading the relations a page renders along with its rows, through named loading profiles.
+
+    Each subclass maps profile names to the relations joined with select_related and those prefetched with
+    prefetch_related, so a page built on a profile runs the same number of queries however many rows it shows.
+    """
+
+    loading_profiles = {}
+
+    def load(self, profile):
+        """Returns the queryset with the relations of the named loading profile loaded along with each row."""
+        try:
+            select, prefetch = self.loading_profiles[profile]
+        except KeyError:
+            raise ValueError(f"{self.model.__name__} has no loading profile named '{profile}'.")
+        return self.select_related(*select).prefetch_related(*prefetch)
+
+
 class Subject(models.Model):
     """Model for a subject that can by taught by tutors or taken by students."""
     name = models.CharField(max_length=20)
@@ -32,3 +55,12 @@ class Term(models.Model):
         """Ensures validation logic before saving."""
         self.clean()
         super().save(*args, **kwargs)
+
+class Watermark(models.Model):
+    """Model for the progress of a recurring batch job, so each run only processes what is new."""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.value})"
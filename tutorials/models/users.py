@@ -1,8 +1,9 @@
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from libgravatar import Gravatar
+from tutorials.avatars import avatar_url
 from tutorials.models.choices import Days
+from tutorials.models.shared import LoadingProfile, LoadingQuerySet
 
 class User(AbstractUser):
     """Model used for user authentication, and team member related information."""
@@ -33,24 +34,33 @@ class User(AbstractUser):
         return f'{self.first_name} {self.last_name}'
 
     def gravatar(self, size=120):
-        """Return a URL to the user's gravatar."""
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='mp')
-        return gravatar_url
+        """Return a URL to the user's gravatar, memoized per email and size."""
+        return avatar_url(self.email, size)
 
     def mini_gravatar(self):
         """Return a URL to a miniature version of the user's gravatar."""
         return self.gravatar(size=60)
     
+class ProfileQuerySet(LoadingQuerySet):
+    """Queryset of admin, student or tutor profiles."""
+
+    loading_profiles = {
+        'list': LoadingProfile(select=('user',)),
+    }
+
 class Admin(models.Model):
     """Model for admin users."""
     user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='admin_profile')
 
+    objects = ProfileQuerySet.as_manager()
+
 class Student(models.Model):
     """Model for student users."""
     user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='student_profile')
     has_new_lesson_notification = models.BooleanField(default=False)
 
+    objects = ProfileQuerySet.as_manager()
+
     def __str__(self):
         return self.user.full_name()
 
@@ -60,6 +70,8 @@ class Tutor(models.Model):
     subjects = models.ManyToManyField('Subject', blank=True)
     experience = models.TextField(blank=True)
 
+    objects = ProfileQuerySet.as_manager()
+
     def __str__(self):
         return self.user.full_name()
 
@@ -76,8 +88,11 @@ class TutorAvailability(models.Model):
     status = models.CharField(max_length=11, choices=Availability.choices)
 
     class Meta:
-        """Ensures unique availability entries for a tutor per day and time slot."""
+        """Ensures unique availability entries for a tutor per day and time slot, and indexes them by status."""
         unique_together = ('tutor', 'day', 'start_time', 'end_time')
+        indexes = [
+            models.Index(fields=['tutor', 'day', 'status'], name='availability_tutor_day_idx'),
+        ]
         
     def __str__(self):
         return f"{self.tutor.user.full_name()} - {self.get_day_display()} - {self.start_time.strftime('%H:%M')} - {self.end_time.strftime('%H:%M')} ({self.get_status_display()})"
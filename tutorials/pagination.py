@@ -0,0 +1,143 @@
+from collections.abc import Sequence
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.core import signing
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+"""
+This file contains a keyset paginator to
+Page through long lists at the same cost however deep the page is
+"""
+
+def _key_value(obj, field):
+    """Returns the value of an ordering field, following relations spelled with __, on a model instance."""
+    return reduce(getattr, field.lstrip('-').split('__'), obj)
+
+
+def _encode_key(value):
+    """Turns a key into a JSON value that filtering on the same field turns back into the exact key."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPaginator:
+    """Pages a queryset on the values of its ordering instead of an OFFSET.
+
+    The queryset is ordered by the given fields and then its primary key, so rows sharing a sort key keep the same order
+    on every page. The next page is the rows after the keys of the last row of the current one, a condition an index on
+    the ordering fields answers with a seek. The cursor naming those keys is signed, so it is opaque to the client.
+    Ordering fields must not be null. The total count is only queried when it is read.
+    """
+
+    cursor_salt = 'tutorials.pagination'
+
+    def __init__(self, queryset, per_page, ordering):
+        tiebreak = '-pk' if ordering[-1].startswith('-') else 'pk'
+        self.ordering = [*ordering, tiebreak]
+        self.queryset = queryset.order_by(*self.ordering)
+        self.per_page = per_page
+
+    @cached_property
+    def count(self):
+        """Returns the total number of rows, with a COUNT query the first time it is read."""
+        return self.queryset.count()
+
+    def get_page(self, cursor=None):
+        """Returns the page a cursor points at, or the first page when the cursor is missing or invalid."""
+        keys, backwards, offset = self.decode(cursor)
+        queryset = self.queryset.reverse() if backwards else self.queryset
+        if keys is not None:
+            queryset = queryset.filter(self.seek(keys, backwards))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            return KeysetPage(rows, self, offset if has_more else 0, has_previous=has_more, has_next=True)
+        if keys is None and not has_more:
+            # The whole list fits on the first page, so it is already counted
+            self.count = len(rows)
+        return KeysetPage(rows, self, offset, has_previous=keys is not None, has_next=has_more)
+
+    def seek(self, keys, backwards=False):
+        """Returns the condition selecting the rows after the given keys, or before them when going backwards.
+
+        The first field is also bounded on its own, so the database can start an index range scan at the keys.
+        """
+        clauses = []
+        for index, field in enumerate(self.ordering):
+            lookup = 'lt' if field.startswith('-') != backwards else 'gt'
+            clause = Q(**{f'{field.lstrip("-")}__{lookup}': keys[index]})
+            for previous_field, previous_key in zip(self.ordering[:index], keys):
+                clause &= Q(**{previous_field.lstrip('-'): previous_key})
+            clauses.append(clause)
+
+        first_lookup = 'lte' if self.ordering[0].startswith('-') != backwards else 'gte'
+        return Q(**{f'{self.ordering[0].lstrip("-")}__{first_lookup}': keys[0]}) & reduce(or_, clauses)
+
+    def encode(self, obj, backwards, offset):
+        """Returns the cursor of the rows after obj, or before it when going backwards."""
+        keys = [_encode_key(_key_value(obj, field)) for field in self.ordering]
+        return signing.dumps([keys, backwards, offset], salt=self.cursor_salt, compress=True)
+
+    def decode(self, cursor):
+        """Returns the keys, direction and offset of a cursor, or those of the first page."""
+        if cursor:
+            try:
+                keys, backwards, offset = signing.loads(cursor, salt=self.cursor_salt)
+                if len(keys) == len(self.ordering):
+                    return keys, bool(backwards), max(int(offset), 0)
+            except (signing.BadSignature, TypeError, ValueError):
+                pass
+        return None, False, 0
+
+
+class KeysetPage(Sequence):
+    """A page of a KeysetPaginator, with cursors to the pages around it."""
+
+    def __init__(self, object_list, paginator, offset, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.offset = offset
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f'<Page from row {self.start_index()}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def start_index(self):
+        """Returns the 1-based position of the first row of the page."""
+        return self.offset + 1 if self.object_list else 0
+
+    @property
+    def next_cursor(self):
+        return self.paginator.encode(self.object_list[-1], False, self.offset + len(self)) if self.has_next() else None
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous() or not self.object_list:
+            return None
+        return self.paginator.encode(self.object_list[0], True, max(self.offset - self.paginator.per_page, 0))
@@ -0,0 +1,187 @@
+import json
+import logging
+import random
+import threading
+import tracemalloc
+from collections import defaultdict, deque
+from datetime import datetime
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.template.base import Template
+
+
+"""
+This file contains a middleware to profile
+1 - Queries and SQL time per request
+2 - Template render time and peak memory per request
+"""
+
+logger = logging.getLogger('tutorials.profiling')
+
+_local = threading.local()
+_template_render = Template.render
+
+
+def _profiled_template_render(self, context):
+    """Renders a template, timing it when the current request is being profiled."""
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None:
+        return _template_render(self, context)
+    return profiler.time_template(self, context)
+
+
+class RequestProfiler:
+    """Collects the query count, SQL time and template render time of one request."""
+
+    def __init__(self):
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper timing every query."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.sql_time += perf_counter() - start
+
+    def time_template(self, template, context):
+        """Renders a template, only timing the outermost one so included templates are not counted twice."""
+        if self._template_depth:
+            return _template_render(template, context)
+
+        self._template_depth += 1
+        start = perf_counter()
+        try:
+            return _template_render(template, context)
+        finally:
+            self._template_depth -= 1
+            self.template_time += perf_counter() - start
+
+
+class ProfileBuffer:
+    """Thread safe ring buffer of the most recent request profiles."""
+
+    def __init__(self, size):
+        self._lock = threading.Lock()
+        self._profiles = deque(maxlen=size)
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+    def recent(self):
+        """Returns the buffered profiles, newest first."""
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def summary(self):
+        """Returns per view totals and averages of the buffered profiles, the views taking the most time first."""
+        views = defaultdict(list)
+        for profile in self.recent():
+            views[profile['view']].append(profile)
+
+        summary = []
+        for view, profiles in views.items():
+            requests = len(profiles)
+            total_ms = sum(profile['duration_ms'] for profile in profiles)
+            summary.append({
+                'view': view,
+                'requests': requests,
+                'total_ms': round(total_ms, 2),
+                'average_ms': round(total_ms / requests, 2),
+                'max_ms': max(profile['duration_ms'] for profile in profiles),
+                'average_queries': round(sum(profile['queries'] for profile in profiles) / requests, 1),
+                'average_sql_ms': round(sum(profile['sql_ms'] for profile in profiles) / requests, 2),
+                'average_template_ms': round(sum(profile['template_ms'] for profile in profiles) / requests, 2),
+                'max_peak_memory_kb': max(profile['peak_memory_kb'] for profile in profiles),
+            })
+        return sorted(summary, key=lambda view_summary: view_summary['total_ms'], reverse=True)
+
+
+profile_buffer = ProfileBuffer(settings.PROFILING_BUFFER_SIZE)
+
+
+class ProfilingMiddleware:
+    """Profiles a sample of requests, logging each profile and keeping the latest ones in memory.
+
+    The middleware removes itself unless PROFILING_ENABLED is set, and then only profiles a
+    PROFILING_SAMPLE_RATE share of the requests. Template time includes any query run while rendering.
+    Peak memory is traced with tracemalloc, so it is only approximate while requests run concurrently.
+    """
+
+    _tracing_lock = threading.Lock()
+    _tracing_requests = 0
+    _started_tracing = False
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        Template.render = _profiled_template_render
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        profiler = RequestProfiler()
+        _local.profiler = profiler
+        self._start_tracing()
+        start = perf_counter()
+        try:
+            with connection.execute_wrapper(profiler):
+                response = self.get_response(request)
+        finally:
+            duration = perf_counter() - start
+            peak_memory = self._stop_tracing()
+            _local.profiler = None
+
+        self.record(request, response, profiler, duration, peak_memory)
+        return response
+
+    def record(self, request, response, profiler, duration, peak_memory):
+        """Logs the profile of a request as a JSON line and adds it to the buffer."""
+        resolver_match = request.resolver_match
+        profile = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'method': request.method,
+            'path': request.path,
+            'view': resolver_match.url_name if resolver_match and resolver_match.url_name else '(unresolved)',
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'queries': profiler.query_count,
+            'sql_ms': round(profiler.sql_time * 1000, 2),
+            'template_ms': round(profiler.template_time * 1000, 2),
+            'peak_memory_kb': round(peak_memory / 1024, 1),
+        }
+        logger.info(json.dumps(profile))
+        profile_buffer.add(profile)
+
+    def _start_tracing(self):
+        """Starts tracing memory allocations, unless another profiled request already did."""
+        with self._tracing_lock:
+            if ProfilingMiddleware._tracing_requests == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                ProfilingMiddleware._started_tracing = True
+            ProfilingMiddleware._tracing_requests += 1
+            tracemalloc.reset_peak()
+
+    def _stop_tracing(self):
+        """Returns the peak traced memory in bytes, stopping tracing once no profiled request needs it."""
+        with self._tracing_lock:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            ProfilingMiddleware._tracing_requests -= 1
+            if ProfilingMiddleware._tracing_requests == 0 and ProfilingMiddleware._started_tracing:
+                tracemalloc.stop()
+                ProfilingMiddleware._started_tracing = False
+            return peak_memory
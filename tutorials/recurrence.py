@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from tutorials.models.choices import Frequency
+
+
+"""
+This file contains functions to expand
+Lesson recurrence rules into dates
+
+A recurrence is an arithmetic progression of dates: occurrence i of a lesson
+starting on start_date falls on start_date + i * step. Windows are answered
+from the progression directly, so no function here walks a term day by day.
+"""
+
+FREQUENCY_STEPS = {
+    Frequency.WEEKLY: timedelta(weeks=1),
+    Frequency.BIWEEKLY: timedelta(weeks=2),
+    Frequency.MONTHLY: timedelta(weeks=4),
+}
+
+
+def frequency_step(frequency):
+    """Returns the time between two occurrences of the given frequency, or None if it only happens once."""
+    if frequency == Frequency.ONCE:
+        return None
+
+    step = FREQUENCY_STEPS.get(frequency)
+    if step is None:
+        raise ValueError(f"Unknown lesson frequency '{frequency}'.")
+    return step
+
+
+def occurrence_range(start_date, end_date, frequency, window_start=None, window_end=None):
+    """Returns the indices of the occurrences between window_start and window_end inclusive, in constant time."""
+    step = frequency_step(frequency)
+    low = start_date if window_start is None else max(start_date, window_start)
+    high = end_date if window_end is None else min(end_date, window_end)
+    if low > high:
+        return range(0)
+    if step is None:
+        return range(1) if low == start_date else range(0)
+
+    # First index on or after low (rounding up) and last index on or before high (rounding down)
+    first = -(-(low - start_date) // step)
+    last = (high - start_date) // step
+    return range(first, last + 1)
+
+
+def occurrence_date(start_date, frequency, index):
+    """Returns the date of the occurrence with the given index."""
+    step = frequency_step(frequency)
+    return start_date if step is None else start_date + step * index
+
+
+def occurrences_between(start_date, end_date, frequency, window_start, window_end):
+    """Returns the dates of the occurrences that fall between window_start and window_end inclusive."""
+    return [
+        occurrence_date(start_date, frequency, index)
+        for index in occurrence_range(start_date, end_date, frequency, window_start, window_end)
+    ]
+
+
+def occurrence_dates(start_date, end_date, frequency):
+    """Returns every date from start_date up to and including end_date on which a lesson of the given frequency takes place."""
+    return occurrences_between(start_date, end_date, frequency, start_date, end_date)
+
+
+def next_occurrence(start_date, end_date, frequency, on_or_after):
+    """Returns the first occurrence on or after the given date, or None once the recurrence has ended."""
+    indices = occurrence_range(start_date, end_date, frequency, window_start=on_or_after)
+    return occurrence_date(start_date, frequency, indices[0]) if indices else None
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+"""
+This file contains the resolution of
+The role of a user, once per login
+"""
+
+ROLE_SESSION_KEY = '_user_role'
+
+# The profile of each role, in the order roles are checked
+PROFILE_ROLES = {
+    'admin_profile': 'admin',
+    'tutor_profile': 'tutor',
+    'student_profile': 'student',
+}
+
+
+def user_role(user):
+    """Returns 'admin', 'tutor' or 'student', or None for an anonymous user or a user without a profile."""
+    if not user.is_authenticated:
+        return None
+    for profile, role in PROFILE_ROLES.items():
+        if hasattr(user, profile):
+            return role
+    return None
+
+
+class RoleBackend(ModelBackend):
+    """Authentication backend loading the admin, tutor and student profiles of a user in the query loading the user.
+
+    A missing reverse one-to-one is cached as missing by select_related, so role checks on request.user never query.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related(*PROFILE_ROLES).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+class RoleMiddleware:
+    """Sets request.role to the role of the logged in user, or None.
+
+    The role is stored in the session when the user logs in, so it is only resolved again for sessions
+    started before the role was stored there.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.role = self.resolve(request)
+        return self.get_response(request)
+
+    def resolve(self, request):
+        """Returns the role stored in the session, storing it first if it is missing."""
+        if not request.user.is_authenticated:
+            return None
+        role = request.session.get(ROLE_SESSION_KEY)
+        if role is None:
+            role = user_role(request.user)
+            if role is not None:
+                request.session[ROLE_SESSION_KEY] = role
+        return role
@@ -0,0 +1,205 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from tutorials.models import User
+
+
+"""
+This file contains the user search index to
+1 - Find users by the prefixes of their names, username and email, or by close misspellings of them
+2 - Keep the index in sync with user writes
+"""
+
+SEARCH_FIELDS = ('username', 'first_name', 'last_name', 'email')
+
+
+def search_terms(text):
+    """Splits a search into lower case words, the same way the index splits user fields."""
+    return re.findall(r'\w+', text.lower())
+
+
+def trigrams(word):
+    """Returns the trigrams of a word padded like pg_trgm, so words sharing a start score higher."""
+    padded = f'  {word} '
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def similarity(term, words):
+    """Returns the trigram similarity between a term and its closest word, between 0 and 1."""
+    term_trigrams = trigrams(term)
+    return max(
+        (len(term_trigrams & trigrams(word)) / len(term_trigrams | trigrams(word)) for word in words),
+        default=0,
+    )
+
+
+class UserSearch:
+    """Fallback search running icontains on every field, for databases without a search index."""
+
+    def search(self, text, limit, users=None):
+        """Returns the ids of up to limit users matching the search, best match first.
+
+        users is an optional queryset of user ids to search among, applied before the limit.
+        Misspellings are only looked for when no user matches the search as typed.
+        """
+        terms = search_terms(text)
+        if not terms:
+            return []
+        return self.prefix_search(terms, limit, users) or self.fuzzy_search(terms, limit, users)
+
+    def prefix_search(self, terms, limit, users=None):
+        """Returns the ids of the users with a field containing each term."""
+        query = Q()
+        for term in terms:
+            query &= Q(*[Q(**{f'{field}__icontains': term}) for field in SEARCH_FIELDS], _connector=Q.OR)
+        return list(self.candidates(users).filter(query).order_by('username').values_list('pk', flat=True)[:limit])
+
+    def fuzzy_search(self, terms, limit, users=None):
+        """Returns the ids of the users with words similar to the terms."""
+        return []
+
+    def candidates(self, users):
+        """Returns the users a search looks among."""
+        return User.objects.all() if users is None else User.objects.filter(pk__in=users)
+
+    def index(self, user):
+        """Adds or refreshes a user in the index."""
+
+    def remove(self, user_id):
+        """Removes a user from the index."""
+
+    def rebuild(self):
+        """Reindexes every user."""
+
+    def filter(self, queryset, text, field='pk'):
+        """Restricts a queryset to the users matching the search, annotated with their search_rank, 0 being the best.
+
+        Only the users of the queryset are searched, so other users never take up the USER_SEARCH_LIMIT matches.
+        """
+        user_ids = self.search(text, settings.USER_SEARCH_LIMIT, queryset.order_by().values(field))
+        if not user_ids:
+            return queryset.none().annotate(search_rank=Value(0))
+        return queryset.filter(**{f'{field}__in': user_ids}).annotate(search_rank=Case(
+            *[When(**{field: user_id}, then=Value(rank)) for rank, user_id in enumerate(user_ids)],
+            output_field=IntegerField(),
+        ))
+
+
+class SQLiteUserSearch(UserSearch):
+    """Searches users through two FTS5 tables kept next to the user table.
+
+    tutorials_user_search indexes the words of each field with a prefix index, so 'jan' finds Jane in a single seek.
+    tutorials_user_trigram indexes their trigrams, so a misspelling still finds the users sharing most of its
+    trigrams. Prefix matches are ranked with bm25 and fuzzy ones by trigram similarity.
+    """
+
+    words_table = 'tutorials_user_search'
+    trigrams_table = 'tutorials_user_trigram'
+
+    def prefix_search(self, terms, limit, users=None):
+        """Returns the ids of the users with a word starting with each term, best ranked first."""
+        users_sql, users_params = self.users_condition(users)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.words_table} WHERE {self.words_table} MATCH %s{users_sql} '
+                f'ORDER BY rank LIMIT %s',
+                [' '.join(f'"{term}"*' for term in terms), *users_params, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def fuzzy_search(self, terms, limit, users=None):
+        """Returns the ids of the users whose words are similar enough to every term, most similar first."""
+        query_trigrams = {term[index:index + 3] for term in terms for index in range(len(term) - 2)}
+        if not query_trigrams:
+            return []
+
+        users_sql, users_params = self.users_condition(users)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, {", ".join(SEARCH_FIELDS)} FROM {self.trigrams_table} '
+                f'WHERE {self.trigrams_table} MATCH %s{users_sql} ORDER BY rank LIMIT %s',
+                [' OR '.join(f'"{trigram}"' for trigram in sorted(query_trigrams)), *users_params, limit * 5]
+            )
+            candidates = cursor.fetchall()
+
+        scored = []
+        for user_id, *fields in candidates:
+            words = search_terms(' '.join(fields))
+            score = min(similarity(term, words) for term in terms)
+            if score >= settings.USER_SEARCH_SIMILARITY:
+                scored.append((score, user_id))
+        return [user_id for score, user_id in sorted(scored, key=lambda match: -match[0])][:limit]
+
+    def users_condition(self, users):
+        """Returns the SQL and parameters restricting the rows of a search table to a queryset of user ids."""
+        if users is None:
+            return '', []
+        sql, params = users.query.sql_with_params()
+        return f' AND rowid IN ({sql})', list(params)
+
+    def index(self, user):
+        values = [user.pk, *[getattr(user, field) for field in SEARCH_FIELDS]]
+        with connection.cursor() as cursor:
+            for table in (self.words_table, self.trigrams_table):
+                cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [user.pk])
+                cursor.execute(f'INSERT INTO {table} (rowid, {", ".join(SEARCH_FIELDS)}) VALUES (%s, %s, %s, %s, %s)', values)
+
+    def remove(self, user_id):
+        with connection.cursor() as cursor:
+            for table in (self.words_table, self.trigrams_table):
+                cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [user_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for table in (self.words_table, self.trigrams_table):
+                cursor.execute(f'DELETE FROM {table}')
+                cursor.execute(
+                    f'INSERT INTO {table} (rowid, {", ".join(SEARCH_FIELDS)}) '
+                    f'SELECT id, {", ".join(SEARCH_FIELDS)} FROM {User._meta.db_table}'
+                )
+
+
+class PostgresUserSearch(UserSearch):
+    """Searches users with a tsvector prefix query, or by pg_trgm similarity for misspellings.
+
+    Both use GIN indexes on the user table itself, so Postgres keeps them in sync on every write.
+    Needs django.contrib.postgres in INSTALLED_APPS for the trigram lookup.
+    """
+
+    def prefix_search(self, terms, limit, users=None):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config='simple')
+        return list(self.candidates(users).annotate(
+            document=search_vector(), rank=SearchRank(search_vector(), query)
+        ).filter(document=query).order_by('-rank').values_list('pk', flat=True)[:limit])
+
+    def fuzzy_search(self, terms, limit, users=None):
+        from django.contrib.postgres.search import TrigramSimilarity
+        from django.db.models.functions import Greatest
+
+        text = ' '.join(terms)
+        return list(self.candidates(users).annotate(
+            similarity=Greatest(*[TrigramSimilarity(field, text) for field in SEARCH_FIELDS])
+        ).filter(
+            Q(*[Q(**{f'{field}__trigram_similar': text}) for field in SEARCH_FIELDS], _connector=Q.OR)
+        ).order_by('-similarity').values_list('pk', flat=True)[:limit])
+
+
+def search_vector():
+    """Returns the tsvector of the user fields, the expression the Postgres search index is built on."""
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector(*SEARCH_FIELDS, config='simple')
+
+
+def get_user_search():
+    """Returns the search backend for the database in use."""
+    backends = {'sqlite': SQLiteUserSearch, 'postgresql': PostgresUserSearch}
+    return backends.get(connection.vendor, UserSearch)()
+
+
+user_search = get_user_search()
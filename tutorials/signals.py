@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from tutorials.availability_index import availability_index
+from tutorials.caching import invalidate_calendar, invalidate_current_term, invalidate_lesson_calendars
+from tutorials.models import Lesson, LessonStatus, Term, TutorAvailability, User
+from tutorials.roles import ROLE_SESSION_KEY, user_role
+from tutorials.search import user_search
+from tutorials.sqlite import apply_pragmas
+
+
+"""
+This file contains signal receivers to keep
+1 - Calendar caches in sync with lesson writes
+2 - The tutor availability index in sync with availability writes
+3 - The user search index in sync with user writes
+4 - New SQLite connections tuned with the configured pragmas
+5 - The session of a user who logs in with their role
+6 - The cached current term in sync with term writes
+"""
+
+@receiver([post_save, post_delete], sender=LessonStatus)
+def invalidate_lesson_status_calendar(sender, instance, **kwargs):
+    """Drops the cached month of the tutor and student whose lesson status changed."""
+    if LessonStatus.lesson_id.is_cached(instance):
+        tutor_id, student_id = instance.lesson_id.tutor_id, instance.lesson_id.student_id
+    else:
+        lesson = Lesson.objects.filter(pk=instance.lesson_id_id).values_list('tutor_id', 'student_id').first()
+        if lesson is None:
+            # The lesson itself is being deleted, which invalidates its calendars on its own
+            return
+        tutor_id, student_id = lesson
+    invalidate_lesson_calendars(tutor_id, student_id, instance.date.year, instance.date.month)
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+def invalidate_lesson_calendar(sender, instance, **kwargs):
+    """Drops every cached month of the tutor and student of a lesson."""
+    invalidate_lesson_calendars(instance.tutor_id, instance.student_id)
+
+
+@receiver([post_save, post_delete], sender=TutorAvailability)
+def invalidate_tutor_availability(sender, instance, **kwargs):
+    """Drops every cached month and the indexed slots of a tutor whose availability changed."""
+    invalidate_calendar('tutor', instance.tutor_id)
+    availability_index.invalidate(instance.tutor_id)
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, **kwargs):
+    """Adds a saved user to the search index, or refreshes their entry."""
+    user_search.index(instance)
+
+
+@receiver(post_delete, sender=User)
+def remove_user_from_index(sender, instance, **kwargs):
+    """Drops a deleted user from the search index."""
+    user_search.remove(instance.pk)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Applies the configured pragmas to a new SQLite connection."""
+    if connection.vendor == 'sqlite':
+        apply_pragmas(connection.connection, settings.SQLITE_PRAGMAS)
+
+
+@receiver(user_logged_in)
+def store_user_role(sender, request, user, **kwargs):
+    """Stores the role of a user who logged in in their session, for RoleMiddleware."""
+    role = user_role(user)
+    if role is not None:
+        request.session[ROLE_SESSION_KEY] = role
+
+
+@receiver([post_save, post_delete], sender=Term)
+def invalidate_term(sender, instance, **kwargs):
+    """Drops the cached current term when a term changes."""
+    invalidate_current_term()
@@ -0,0 +1,23 @@
+"""
+This file contains the tuning of
+SQLite connections
+"""
+
+# The journal mode and synchronous setting of a fresh SQLite database, used as the baseline of benchmarks
+SQLITE_DEFAULT_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+}
+
+
+def apply_pragmas(raw_connection, pragmas):
+    """Runs each PRAGMA on a DB-API SQLite connection, in order, returning the value SQLite reports for each.
+
+    The value is None for pragmas an in-memory database ignores, such as mmap_size.
+    """
+    values = {}
+    for name, value in pragmas.items():
+        raw_connection.execute(f'PRAGMA {name} = {value}')
+        row = raw_connection.execute(f'PRAGMA {name}').fetchone()
+        values[name] = row[0] if row else None
+    return values
@@ -0,0 +1,43 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase
+
+from tutorials.models import LessonStatus
+
+
+def benchmark(**options):
+    out = StringIO()
+    call_command('benchmark_sqlite', stdout=out, **options)
+    return out.getvalue()
+
+
+# The database is copied with VACUUM INTO, which cannot run inside the transaction of a TestCase
+class BenchmarkSQLiteCommandTestCase(TransactionTestCase):
+
+    def setUp(self):
+        call_command('seed', users=30, lessons=20, seed=1, stdout=StringIO(), stderr=StringIO())
+
+    def test_reports_default_and_tuned_rounds(self):
+        lines = benchmark(readers=2, writers=1, seconds=0.2).splitlines()
+        self.assertIn('reads/s', lines[0])
+        self.assertTrue(lines[1].startswith('default'))
+        self.assertTrue(lines[2].startswith('tuned'))
+
+    def test_never_writes_to_the_database(self):
+        benchmark(readers=0, writers=1, seconds=0.2)
+        self.assertFalse(LessonStatus.objects.filter(feedback__startswith='Benchmark').exists())
+
+
+class BenchmarkSQLiteArgumentsTestCase(TestCase):
+
+    def test_needs_past_lessons(self):
+        with self.assertRaises(CommandError):
+            benchmark(seconds=0.1)
+
+    def test_rejects_invalid_options(self):
+        with self.assertRaises(CommandError):
+            benchmark(readers=0, writers=0)
+        with self.assertRaises(CommandError):
+            benchmark(seconds=0)
@@ -0,0 +1,91 @@
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tutorials.models import Lesson, LessonStatus, Status, Student, Subject, Term, Tutor, User, Watermark
+
+
+class CompletePastLessonsCommandTestCase(TestCase):
+
+    def setUp(self):
+        self.tutor = Tutor.objects.create(
+            user=User.objects.create(username="@tutor1", first_name="John", last_name="Doe", email="tutor1@example.com")
+        )
+        self.student = Student.objects.create(
+            user=User.objects.create(username="@student1", first_name="Jane", last_name="Doe", email="student1@example.com")
+        )
+        self.subject = Subject.objects.create(name="Python")
+        self.term = Term.objects.create(start_date=date.today() - timedelta(days=60), end_date=date.today() + timedelta(days=60))
+        self.lesson = Lesson.objects.create(
+            tutor=self.tutor,
+            student=self.student,
+            subject=self.subject,
+            term=self.term,
+            frequency="O",
+            duration=timedelta(hours=1),
+            start_date=self.term.start_date,
+            price_per_lesson=50,
+        )
+        LessonStatus.objects.filter(lesson_id=self.lesson).delete()
+
+        # Bulk creation skips LessonStatus.save, like rows that were future when saved and are now in the past
+        self.past_scheduled, self.past_pending, self.future_scheduled = LessonStatus.objects.bulk_create([
+            LessonStatus(lesson_id=self.lesson, date=date.today() - timedelta(days=20), time=time(10), status=Status.SCHEDULED),
+            LessonStatus(lesson_id=self.lesson, date=date.today() - timedelta(days=3), time=time(10), status=Status.PENDING),
+            LessonStatus(lesson_id=self.lesson, date=date.today() + timedelta(days=3), time=time(10), status=Status.SCHEDULED),
+        ])
+
+    def sweep(self, *args):
+        out = StringIO()
+        call_command('complete_past_lessons', *args, stdout=out)
+        return out.getvalue()
+
+    def test_past_lessons_are_settled(self):
+        output = self.sweep()
+        self.past_scheduled.refresh_from_db()
+        self.past_pending.refresh_from_db()
+        self.future_scheduled.refresh_from_db()
+        self.assertEqual(self.past_scheduled.status, Status.COMPLETED)
+        self.assertEqual(self.past_pending.status, Status.CANCELLED)
+        self.assertEqual(self.future_scheduled.status, Status.SCHEDULED)
+        self.assertIn("Marked 1 past lessons as completed and 1 as cancelled", output)
+
+    def test_sweep_and_save_agree(self):
+        self.sweep()
+        for status in [Status.SCHEDULED, Status.PENDING]:
+            saved = LessonStatus(lesson_id=self.lesson, date=date.today() - timedelta(days=1), time=time(10), status=status)
+            saved.save()
+            swept = LessonStatus.objects.get(pk=self.past_scheduled.pk if status == Status.SCHEDULED else self.past_pending.pk)
+            self.assertEqual(saved.status, swept.status)
+
+    def test_watermark_is_recorded(self):
+        self.sweep('--chunk-days', '5')
+        self.assertEqual(Watermark.objects.get(name='complete_past_lessons').value, date.today())
+
+    def test_second_run_only_scans_after_watermark(self):
+        self.sweep()
+        LessonStatus.objects.filter(pk=self.past_scheduled.pk).update(status=Status.SCHEDULED)
+        output = self.sweep()
+        self.past_scheduled.refresh_from_db()
+        self.assertEqual(self.past_scheduled.status, Status.SCHEDULED)
+        self.assertIn("Marked 0 past lessons as completed and 0 as cancelled", output)
+
+    def test_full_run_ignores_watermark(self):
+        self.sweep()
+        LessonStatus.objects.filter(pk=self.past_scheduled.pk).update(status=Status.SCHEDULED)
+        self.sweep('--full')
+        self.past_scheduled.refresh_from_db()
+        self.assertEqual(self.past_scheduled.status, Status.COMPLETED)
+
+    def test_calendar_does_not_write(self):
+        self.client.force_login(self.student.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('calendar'))
+        self.assertFalse(any(query['sql'].startswith('UPDATE "tutorials_lessonstatus"') for query in queries))
+        self.past_pending.refresh_from_db()
+        self.assertEqual(self.past_pending.status, Status.PENDING)
@@ -0,0 +1,47 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from tutorials.management.commands.load_test import Command
+from tutorials.models import LessonStatus, Tutor
+
+
+# The in-memory test database gives no busy timeout to concurrent writers, so these tests run a single worker
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class LoadTestCommandTestCase(TransactionTestCase):
+
+    def setUp(self):
+        call_command('seed', users=30, lessons=20, seed=1, stdout=StringIO(), stderr=StringIO())
+
+    def test_reports_throughput_and_latency_per_route(self):
+        out = StringIO()
+        call_command('load_test', workers=1, requests=6, stdout=out)
+        self.assertIn("Database: SQLite", out.getvalue())
+        self.assertIn("6 requests in", out.getvalue())
+        self.assertIn(", 0 errors", out.getvalue())
+
+    def test_tutor_workers_write_feedback(self):
+        tutor = Tutor.objects.filter(lesson__isnull=False).first()
+        occurrences = list(LessonStatus.objects.filter(
+            lesson_id__tutor=tutor, date__lt=date.today()
+        ).values_list('pk', flat=True))
+        results = Command().run_worker(0, 'tutor', tutor.user, occurrences, 5, write_ratio=1)
+        self.assertEqual([route for route, duration, ok in results], ['update_feedback'] * 5)
+        self.assertTrue(all(ok for route, duration, ok in results))
+        self.assertTrue(LessonStatus.objects.filter(feedback='Load test feedback').exists())
+
+
+class LoadTestArgumentsTestCase(TestCase):
+
+    def test_needs_users_to_log_in_as(self):
+        with self.assertRaises(CommandError):
+            call_command('load_test', workers=2, requests=2, stdout=StringIO())
+
+    def test_rejects_invalid_options(self):
+        with self.assertRaises(CommandError):
+            call_command('load_test', workers=0, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('load_test', write_ratio=2, stdout=StringIO())
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from tutorials.models import Invoice, PaymentBatch, PaymentStatus, Student, User
+
+
+class MarkInvoicesPaidCommandTestCase(TestCase):
+
+    def setUp(self):
+        student = Student.objects.create(user=User.objects.create(
+            username="@student", first_name="Sam", last_name="Student", email="student@example.com"
+        ))
+        self.invoices = [
+            Invoice.objects.create(student=student, amount=30, due_date=date.today() + timedelta(days=30))
+            for _ in range(3)
+        ]
+
+    def write_export(self, contents):
+        export = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        export.write(contents)
+        export.close()
+        self.addCleanup(os.remove, export.name)
+        return export.name
+
+    def call(self, *args):
+        out = StringIO()
+        call_command('mark_invoices_paid', *args, stdout=out)
+        return out.getvalue()
+
+    def test_marks_listed_invoices_as_paid(self):
+        export = self.write_export(f"invoice_id,amount\n{self.invoices[0].pk},30\n{self.invoices[1].pk},30\n")
+        self.assertIn("Marked 2 of 2 invoices as paid.", self.call(export))
+        statuses = [Invoice.objects.get(pk=invoice.pk).status for invoice in self.invoices]
+        self.assertEqual(statuses, [PaymentStatus.PAID, PaymentStatus.PAID, PaymentStatus.UNPAID])
+
+    def test_repeated_export_is_not_processed_again(self):
+        export = self.write_export(f"invoice_id\n{self.invoices[0].pk}\n")
+        self.call(export)
+        Invoice.objects.filter(pk=self.invoices[0].pk).update(status=PaymentStatus.UNPAID)
+
+        self.assertIn("already settled", self.call(export))
+        self.assertEqual(Invoice.objects.get(pk=self.invoices[0].pk).status, PaymentStatus.UNPAID)
+        self.assertEqual(PaymentBatch.objects.count(), 1)
+
+    def test_explicit_key(self):
+        first_export = self.write_export(f"invoice_id\n{self.invoices[0].pk}\n")
+        second_export = self.write_export(f"invoice_id\n{self.invoices[1].pk}\n")
+        self.call(first_export, '--key', 'bank-2026-10')
+        self.assertIn("already settled", self.call(second_export, '--key', 'bank-2026-10'))
+        self.assertEqual(Invoice.objects.get(pk=self.invoices[1].pk).status, PaymentStatus.UNPAID)
+
+    def test_export_without_invoice_id_column(self):
+        export = self.write_export("reference,amount\nabc,30\n")
+        with self.assertRaises(CommandError):
+            self.call(export)
+
+    def test_missing_export(self):
+        with self.assertRaises(CommandError):
+            self.call('/nonexistent/export.csv')
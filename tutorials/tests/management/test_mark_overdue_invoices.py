@@ -0,0 +1,43 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from tutorials.models import Invoice, PaymentStatus, Student, User
+
+
+class MarkOverdueInvoicesCommandTestCase(TestCase):
+
+    def setUp(self):
+        student = Student.objects.create(user=User.objects.create(
+            username="@student", first_name="Sam", last_name="Student", email="student@example.com"
+        ))
+        today = date.today()
+        self.past_due = Invoice.objects.create(student=student, amount=30, due_date=today - timedelta(days=1))
+        self.due_today = Invoice.objects.create(student=student, amount=30, due_date=today)
+        self.paid = Invoice.objects.create(
+            student=student, amount=30, due_date=today - timedelta(days=10), status=PaymentStatus.PAID
+        )
+
+    def status_of(self, invoice):
+        return Invoice.objects.get(pk=invoice.pk).status
+
+    def test_marks_unpaid_invoices_past_their_due_date(self):
+        out = StringIO()
+        call_command('mark_overdue_invoices', stdout=out)
+        self.assertIn("Marked 1 unpaid invoices past their due date as overdue.", out.getvalue())
+        self.assertEqual(self.status_of(self.past_due), PaymentStatus.OVERDUE)
+        self.assertEqual(self.status_of(self.due_today), PaymentStatus.UNPAID)
+        self.assertEqual(self.status_of(self.paid), PaymentStatus.PAID)
+
+    def test_sweep_is_a_single_update(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(Invoice.objects.mark_overdue(), 1)
+
+    def test_sweep_is_idempotent(self):
+        Invoice.objects.mark_overdue()
+        self.assertEqual(Invoice.objects.mark_overdue(), 0)
+
+    def test_sweep_on_a_later_day(self):
+        self.assertEqual(Invoice.objects.mark_overdue(today=date.today() + timedelta(days=1)), 2)
@@ -0,0 +1,61 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from tutorials.models import Admin, Lesson, LessonStatus, Student, Tutor, TutorAvailability, User
+from tutorials.search import user_search
+
+
+class SeedCommandTestCase(TestCase):
+
+    def seed(self, **options):
+        out = StringIO()
+        call_command('seed', stdout=out, stderr=StringIO(), **options)
+        return out.getvalue()
+
+    def test_seeds_the_requested_scale(self):
+        out = self.seed(users=60, lessons=40, seed=1, batch_size=7)
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(Admin.objects.count() + Tutor.objects.count() + Student.objects.count(), 60)
+        self.assertEqual(Lesson.objects.count(), 40)
+        self.assertIn("User seeding complete: 60 users created.", out)
+        self.assertIn(f"Lesson seeding complete: 40 lessons with {LessonStatus.objects.count()} occurrences created.", out)
+
+    def test_every_lesson_has_its_occurrences_and_booked_slot(self):
+        self.seed(users=30, lessons=20, seed=2)
+        self.assertFalse(Lesson.objects.filter(lessonstatus__isnull=True).exists())
+        for lesson in Lesson.objects.all():
+            self.assertTrue(TutorAvailability.objects.filter(
+                tutor_id=lesson.tutor_id, status=TutorAvailability.Availability.BOOKED
+            ).exists())
+            self.assertTrue(lesson.tutor.subjects.filter(pk=lesson.subject_id).exists())
+
+    def test_users_share_the_default_password(self):
+        self.seed(users=10, lessons=0, seed=3)
+        passwords = set(User.objects.values_list('password', flat=True))
+        self.assertEqual(len(passwords), 1)
+        self.assertTrue(User.objects.get(username='@johndoe').check_password('Password123'))
+
+    def test_same_seed_seeds_the_same_users(self):
+        self.seed(users=20, lessons=0, seed=4)
+        first = sorted(User.objects.values_list('username', flat=True))
+        User.objects.all().delete()
+        self.seed(users=20, lessons=0, seed=4)
+        self.assertEqual(sorted(User.objects.values_list('username', flat=True)), first)
+
+    def test_seeding_again_tops_up_to_the_requested_scale(self):
+        self.seed(users=20, lessons=10, seed=5)
+        out = self.seed(users=25, lessons=10, seed=6)
+        self.assertEqual(User.objects.count(), 25)
+        self.assertEqual(Lesson.objects.count(), 10)
+        self.assertIn("User seeding complete: 5 users created.", out)
+
+    def test_seeded_users_are_searchable(self):
+        self.seed(users=10, lessons=0, seed=7)
+        self.assertIn(User.objects.get(username='@charlie').pk, user_search.search('charlie', 10))
+
+    def test_rejects_an_empty_batch_size(self):
+        with self.assertRaises(CommandError):
+            self.seed(batch_size=0)
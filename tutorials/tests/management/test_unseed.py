@@ -0,0 +1,73 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from tutorials.models import Invoice, Lesson, LessonStatus, Subject, Term, Tutor, TutorAvailability, User, Watermark
+from tutorials.search import user_search
+
+
+class FastUnseedCommandTestCase(TestCase):
+
+    def setUp(self):
+        call_command('seed', users=30, lessons=20, seed=1, stdout=StringIO(), stderr=StringIO())
+        self.staff = User.objects.create_user(
+            username="@staff", first_name="Stan", last_name="Staff", email="staff@example.com", is_staff=True
+        )
+
+    def unseed(self, *args):
+        out = StringIO()
+        call_command('unseed', *args, stdout=out)
+        return out.getvalue()
+
+    def test_deletes_the_sample_data_and_keeps_staff(self):
+        self.unseed('--fast')
+        for model in [Invoice, LessonStatus, Lesson, TutorAvailability, Tutor, Subject, Term]:
+            self.assertFalse(model.objects.exists(), model.__name__)
+        self.assertEqual(list(User.objects.all()), [self.staff])
+
+    def test_deletes_batch_job_watermarks(self):
+        Watermark.objects.create(name='complete_past_lessons', value=date.today())
+        self.unseed('--fast')
+        self.assertFalse(Watermark.objects.exists())
+
+    def test_regular_unseed_deletes_batch_job_watermarks(self):
+        Watermark.objects.create(name='complete_past_lessons', value=date.today())
+        self.unseed()
+        self.assertFalse(Watermark.objects.exists())
+
+    def test_reports_rows_deleted_per_table(self):
+        users = User.objects.filter(is_staff=False).count()
+        occurrences = LessonStatus.objects.count()
+        out = self.unseed('--fast')
+        self.assertIn(f"tutorials_lessonstatus: {occurrences} rows deleted in", out)
+        self.assertIn(f"tutorials_user: {users} rows deleted in", out)
+        self.assertIn("Database unseeding complete:", out)
+
+    def test_never_loads_rows_into_memory(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.unseed('--fast')
+        self.assertFalse([query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')])
+
+    def test_drops_deleted_users_from_the_search_index(self):
+        self.unseed('--fast')
+        self.assertEqual(user_search.search('charlie', 10), [])
+        self.assertEqual(user_search.search('stan', 10), [self.staff.pk])
+
+    def test_vacuum_needs_a_fast_unseed(self):
+        with self.assertRaises(CommandError):
+            self.unseed('--vacuum')
+
+
+class VacuumUnseedCommandTestCase(TransactionTestCase):
+
+    def test_vacuums_after_a_fast_unseed(self):
+        call_command('seed', users=10, lessons=5, seed=2, stdout=StringIO(), stderr=StringIO())
+        out = StringIO()
+        call_command('unseed', '--fast', '--vacuum', stdout=out)
+        self.assertIn("VACUUM complete in", out.getvalue())
+        self.assertFalse(User.objects.exists())
@@ -1,11 +1,13 @@
 # DromeDary > tutorials folder > tests > models folder > test_invoice_model.py
 
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
+from django.db import connection
 from datetime import date, timedelta
 from tutorials.models import (
     Invoice, Student, User, LessonStatus, Tutor,
-    Subject, Term, Lesson, InvoiceLessonLink, PaymentStatus
+    Subject, Term, Lesson, InvoiceLessonLink, PaymentStatus, PaymentBatch
 )
 
 
@@ -194,3 +196,65 @@ class InvoiceModelTest(TestCase):
 
         # Assert that the status has not changed to OVERDUE
         self.assertEqual(self.invoice.status, PaymentStatus.PAID)
+
+    def test_with_totals_annotates_lesson_totals(self):
+        second_status = LessonStatus.objects.create(lesson_id=self.lesson, date=date.today(), time='12:00:00')
+        InvoiceLessonLink.objects.create(invoice=self.invoice, lesson=second_status)
+
+        invoice = Invoice.objects.with_totals().get(pk=self.invoice.pk)
+        self.assertEqual(invoice.lesson_count, 2)
+        self.assertEqual(invoice.total_duration, timedelta(hours=2))
+        self.assertEqual(invoice.computed_amount, 100)
+
+    def test_get_total_hours_uses_annotation(self):
+        invoice = Invoice.objects.with_totals().get(pk=self.invoice.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(invoice.get_total_hours(), 1.0)
+
+    def test_get_total_hours_without_lessons(self):
+        invoice = Invoice.objects.create(student=self.student, amount=0, due_date=date.today())
+        self.assertEqual(invoice.get_total_hours(), 0)
+        self.assertEqual(Invoice.objects.with_totals().get(pk=invoice.pk).get_total_hours(), 0)
+
+    def test_mismatched_flags_wrong_amounts(self):
+        self.assertIn(self.invoice, Invoice.objects.mismatched())
+        self.assertEqual(Invoice.objects.mismatched().get(pk=self.invoice.pk).amount_difference, 50)
+
+        self.invoice.amount = 50
+        self.invoice.save()
+        self.assertNotIn(self.invoice, Invoice.objects.mismatched())
+
+    def test_mark_as_paid_runs_two_statements(self):
+        for day in range(1, 40):
+            InvoiceLessonLink.objects.create(
+                invoice=self.invoice,
+                lesson=LessonStatus.objects.create(lesson_id=self.lesson, date=date.today() - timedelta(days=day), time='10:00:00')
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.invoice.mark_as_paid()
+        statements = [query['sql'] for query in queries if 'SAVEPOINT' not in query['sql']]
+        self.assertEqual(len(statements), 2)
+        self.assertEqual(self.invoice.status, PaymentStatus.PAID)
+        self.assertEqual(LessonStatus.objects.filter(invoice=self.invoice, invoiced=False).count(), 0)
+
+    def test_queryset_mark_as_paid_skips_paid_invoices(self):
+        paid_invoice = Invoice.objects.create(
+            student=self.student, amount=50, status=PaymentStatus.PAID, due_date=date.today()
+        )
+        self.assertEqual(Invoice.objects.filter(pk__in=[self.invoice.pk, paid_invoice.pk]).mark_as_paid(), 1)
+        self.invoice.refresh_from_db()
+        self.lesson_status.refresh_from_db()
+        self.assertEqual(self.invoice.status, PaymentStatus.PAID)
+        self.assertTrue(self.lesson_status.invoiced)
+
+    def test_payment_batch_settles_once(self):
+        batch, settled = PaymentBatch.settle('export-1', [self.invoice.pk])
+        self.assertTrue(settled)
+        self.assertEqual(batch.invoices_paid, 1)
+
+        Invoice.objects.filter(pk=self.invoice.pk).update(status=PaymentStatus.UNPAID)
+        same_batch, settled = PaymentBatch.settle('export-1', [self.invoice.pk])
+        self.assertFalse(settled)
+        self.assertEqual(same_batch, batch)
+        self.assertEqual(Invoice.objects.get(pk=self.invoice.pk).status, PaymentStatus.UNPAID)
@@ -1,5 +1,7 @@
+from django.db import connection
 from django.test import TestCase
-from tutorials.models import Lesson, Tutor, Student, Subject, Term, User
+from django.test.utils import CaptureQueriesContext
+from tutorials.models import Lesson, LessonStatus, Status, Tutor, Student, Subject, Term, User
 from datetime import date, timedelta
 from django.core.exceptions import ValidationError
 
@@ -158,3 +160,50 @@ class LessonModelTestCase(TestCase):
             price_per_lesson=50,
         )
         self.assertEqual(lesson.notes, "")
+
+    def test_lesson_statuses_are_created_for_whole_term(self):
+        statuses = LessonStatus.objects.filter(lesson_id=self.lesson).order_by('date')
+        self.assertEqual(len({status.time for status in statuses}), 1)
+        self.assertLessEqual(statuses.last().date, self.term.end_date)
+        self.assertEqual(statuses.first().date, self.lesson.start_date)
+        self.assertTrue(all(
+            (later.date - earlier.date) == timedelta(weeks=1)
+            for earlier, later in zip(statuses, statuses[1:])
+        ))
+
+    def test_lesson_starting_before_its_term_keeps_its_weekday(self):
+        lesson = Lesson.objects.create(
+            tutor=self.tutor,
+            student=self.student,
+            subject=self.subject,
+            term=self.term,
+            frequency="W",
+            duration=timedelta(hours=1),
+            start_date=date(2024, 8, 21),
+            price_per_lesson=50,
+        )
+        first = LessonStatus.objects.filter(lesson_id=lesson).order_by('date').first()
+        self.assertEqual(first.date, date(2024, 9, 4))
+        self.assertEqual(first.date.weekday(), lesson.start_date.weekday())
+
+    def test_lesson_statuses_are_inserted_in_one_statement(self):
+        with CaptureQueriesContext(connection) as queries:
+            lesson = Lesson.objects.create(
+                tutor=self.tutor,
+                student=self.student,
+                subject=self.subject,
+                term=self.term,
+                frequency="W",
+                duration=timedelta(hours=1),
+                start_date=date(2024, 9, 15),
+                price_per_lesson=50,
+            )
+        status_inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "tutorials_lessonstatus"')]
+        self.assertEqual(len(status_inserts), 1)
+        self.assertGreater(LessonStatus.objects.filter(lesson_id=lesson).count(), 1)
+
+    def test_past_generated_lessons_follow_status_rules(self):
+        for status in LessonStatus.objects.filter(lesson_id=self.lesson, date__lt=date.today()):
+            self.assertIn(status.status, [Status.COMPLETED, Status.CANCELLED])
+            if status.status == Status.CANCELLED:
+                self.assertEqual(status.feedback, '')
@@ -0,0 +1,60 @@
+from datetime import time
+
+from django.test import TestCase
+
+from tutorials.availability_index import availability_index
+from tutorials.models import Tutor, TutorAvailability, User
+
+
+class AvailabilityIndexTestCase(TestCase):
+
+    def setUp(self):
+        availability_index.clear()
+        self.tutor = Tutor.objects.create(
+            user=User.objects.create(username="@tutor1", first_name="John", last_name="Doe", email="tutor1@example.com")
+        )
+        self.other_tutor = Tutor.objects.create(
+            user=User.objects.create(username="@tutor2", first_name="Petra", last_name="Doe", email="tutor2@example.com")
+        )
+        TutorAvailability.objects.create(tutor=self.tutor, day=0, start_time=time(9), end_time=time(13), status='Available')
+        TutorAvailability.objects.create(tutor=self.tutor, day=0, start_time=time(12, 30), end_time=time(15), status='Available')
+        TutorAvailability.objects.create(tutor=self.tutor, day=0, start_time=time(16), end_time=time(17), status='Unavailable')
+        TutorAvailability.objects.create(tutor=self.other_tutor, day=0, start_time=time(14), end_time=time(18), status='Available')
+
+    def test_tutor_is_available_inside_a_slot(self):
+        self.assertTrue(availability_index.is_available(self.tutor.pk, 0, time(10), time(11)))
+        self.assertTrue(availability_index.is_available(self.tutor.pk, 0, time(13), time(15)))
+
+    def test_tutor_is_not_available_outside_slots(self):
+        self.assertFalse(availability_index.is_available(self.tutor.pk, 0, time(8), time(10)))
+        self.assertFalse(availability_index.is_available(self.tutor.pk, 0, time(16), time(16, 30)))
+        self.assertFalse(availability_index.is_available(self.tutor.pk, 1, time(10), time(11)))
+
+    def test_available_tutors(self):
+        self.assertEqual(availability_index.available_tutors(0, time(14), time(15)), sorted([self.tutor.pk, self.other_tutor.pk]))
+        self.assertEqual(availability_index.available_tutors(0, time(16), time(17)), [self.other_tutor.pk])
+        self.assertEqual(availability_index.available_tutors(0, time(14), time(15), tutor_ids=[self.tutor.pk]), [self.tutor.pk])
+
+    def test_lookups_do_not_query_once_built(self):
+        availability_index.is_available(self.tutor.pk, 0, time(10), time(11))
+        with self.assertNumQueries(0):
+            availability_index.is_available(self.tutor.pk, 0, time(10), time(11))
+            availability_index.available_tutors(0, time(14), time(15))
+
+    def test_index_follows_availability_writes(self):
+        self.assertFalse(availability_index.is_available(self.other_tutor.pk, 2, time(10), time(11)))
+        slot = TutorAvailability.objects.create(tutor=self.other_tutor, day=2, start_time=time(9), end_time=time(12), status='Available')
+        self.assertTrue(availability_index.is_available(self.other_tutor.pk, 2, time(10), time(11)))
+        slot.delete()
+        self.assertFalse(availability_index.is_available(self.other_tutor.pk, 2, time(10), time(11)))
+
+    def test_only_changed_tutor_is_reloaded(self):
+        availability_index.available_tutors(0, time(14), time(15))
+        TutorAvailability.objects.filter(tutor=self.other_tutor).update(status='Unavailable')
+        availability_index.invalidate(self.tutor.pk)
+        self.assertEqual(availability_index.available_tutors(0, time(16), time(17)), [self.other_tutor.pk])
+
+    def test_slots_are_copies(self):
+        slot = availability_index.slots()[0]
+        slot.day = 'Monday'
+        self.assertEqual(availability_index.slots()[0].day, 0)
@@ -0,0 +1,89 @@
+from io import BytesIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from urllib.error import URLError
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tutorials.avatars import avatar_cache_path, email_hash, gravatar_url
+from tutorials.models import User
+
+
+class AvatarURLTestCase(TestCase):
+
+    def setUp(self):
+        gravatar_url.cache_clear()
+        email_hash.cache_clear()
+        self.user = User.objects.create_user(
+            '@johndoe', first_name='John', last_name='Doe', email='johndoe@example.org'
+        )
+
+    def test_gravatar_urls_are_built_once_per_email_and_size(self):
+        for _ in range(20):
+            self.user.gravatar()
+            self.user.mini_gravatar()
+        info = gravatar_url.cache_info()
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.hits, 38)
+
+    def test_changing_the_email_changes_the_gravatar(self):
+        old_url = self.user.gravatar()
+        self.user.email = 'janedoe@example.org'
+        self.assertNotEqual(self.user.gravatar(), old_url)
+
+    @override_settings(AVATAR_LOCAL_CACHE=True)
+    def test_local_cache_serves_avatars_from_this_site(self):
+        self.assertEqual(
+            self.user.mini_gravatar(), reverse('avatar', args=['363c1b0cd64dadffb867236a00e62986', 60])
+        )
+        self.assertTrue(self.user.gravatar(size=300).startswith('https://www.gravatar.com/'))
+
+
+class AvatarViewTestCase(TestCase):
+
+    DIGEST = '363c1b0cd64dadffb867236a00e62986'
+
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(AVATAR_LOCAL_CACHE=True, AVATAR_CACHE_DIR=Path(directory.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.url = reverse('avatar', args=[self.DIGEST, 60])
+        user = User.objects.create_user('@johndoe', first_name='John', last_name='Doe', email='johndoe@example.org')
+        self.client.force_login(user)
+
+    @patch('tutorials.avatars.urlopen')
+    def test_downloads_an_avatar_once(self, urlopen):
+        urlopen.return_value = BytesIO(b'image')
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(b''.join(first.streaming_content), b'image')
+        self.assertEqual(b''.join(second.streaming_content), b'image')
+        self.assertEqual(urlopen.call_count, 1)
+        self.assertTrue(avatar_cache_path(self.DIGEST, 60).exists())
+        self.assertIn('max-age', second['Cache-Control'])
+
+    @patch('tutorials.avatars.urlopen', side_effect=URLError('unreachable'))
+    def test_shows_a_placeholder_when_gravatar_is_unreachable(self, urlopen):
+        response = self.client.get(self.url)
+        self.assertRedirects(response, '/static/images/default_avatar.svg', fetch_redirect_response=False)
+        self.assertFalse(avatar_cache_path(self.DIGEST, 60).exists())
+
+    def test_rejects_invalid_hashes_and_sizes(self):
+        self.assertEqual(self.client.get(reverse('avatar', args=['not-a-hash', 60])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('avatar', args=[self.DIGEST, 61])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('avatar', args=[self.DIGEST, 4096])).status_code, 404)
+
+    @patch('tutorials.avatars.urlopen')
+    def test_requires_login(self, urlopen):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, f"{reverse('log_in')}?next={self.url}", fetch_redirect_response=False)
+        urlopen.assert_not_called()
+
+    def test_is_not_found_without_the_local_cache(self):
+        with override_settings(AVATAR_LOCAL_CACHE=False):
+            self.assertEqual(self.client.get(self.url).status_code, 404)
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tutorials.caching import CURRENT_TERM_KEY, get_current_term
+from tutorials.models import Admin, Term, User
+
+
+class CurrentTermTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        today = date.today()
+        self.term = Term.objects.create(start_date=today - timedelta(days=10), end_date=today + timedelta(days=5))
+
+    def test_returns_the_running_term_from_the_cache(self):
+        self.assertEqual(get_current_term(), self.term)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(get_current_term(), self.term)
+        self.assertEqual(len(queries), 0)
+
+    def test_caches_that_no_term_is_running(self):
+        self.term.delete()
+        self.assertIsNone(get_current_term())
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIsNone(get_current_term())
+        self.assertEqual(len(queries), 0)
+
+    @override_settings(CURRENT_TERM_CACHE_TIMEOUT=30 * 24 * 60 * 60)
+    def test_expires_when_the_term_ends(self):
+        with patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            get_current_term()
+        timeout = cache_set.call_args.args[2]
+        self.assertGreater(timeout, 5 * 24 * 60 * 60)
+        self.assertLessEqual(timeout, 6 * 24 * 60 * 60)
+
+    @override_settings(CURRENT_TERM_CACHE_TIMEOUT=30 * 24 * 60 * 60)
+    def test_expires_when_the_next_term_starts(self):
+        Term.objects.create(start_date=date.today() + timedelta(days=2), end_date=date.today() + timedelta(days=40))
+        with patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            get_current_term()
+        timeout = cache_set.call_args.args[2]
+        self.assertGreater(timeout, 24 * 60 * 60)
+        self.assertLessEqual(timeout, 2 * 24 * 60 * 60)
+
+    def test_never_caches_past_the_timeout(self):
+        with patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            get_current_term()
+        self.assertEqual(cache_set.call_args.args[2], 60 * 60)
+
+    def test_term_writes_drop_the_cached_term(self):
+        get_current_term()
+        self.term.end_date = date.today() - timedelta(days=1)
+        self.term.save()
+        self.assertIsNone(cache.get(CURRENT_TERM_KEY))
+        self.assertIsNone(get_current_term())
+
+    def test_dashboard_shows_the_cached_term(self):
+        user = User.objects.create_user('@admin', first_name='Ada', last_name='Admin', email='admin@example.org')
+        Admin.objects.create(user=user)
+        self.client.force_login(user)
+        self.client.get(reverse('dashboard'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['current_term'], self.term)
+        self.assertFalse([query for query in queries.captured_queries if 'tutorials_term' in query['sql']])
+        self.assertContains(response, 'Manage Students')
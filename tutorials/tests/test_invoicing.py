@@ -0,0 +1,116 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from tutorials.invoicing import InvoicingRun, billable_lessons
+from tutorials.models import (
+    Admin, Invoice, InvoiceLessonLink, Lesson, LessonStatus, Status, Student, Subject, Term, Tutor, User
+)
+
+
+class InvoicingRunTestCase(TestCase):
+
+    def setUp(self):
+        self.today = date.today()
+        self.term = Term.objects.create(start_date=self.today - timedelta(weeks=6), end_date=self.today + timedelta(weeks=6))
+        self.subjects = [Subject.objects.create(name="Python"), Subject.objects.create(name="Java")]
+        self.tutor = Tutor.objects.create(user=User.objects.create(
+            username="@tutor", first_name="Tom", last_name="Tutor", email="tutor@example.com"
+        ))
+        self.students = [
+            Student.objects.create(user=User.objects.create(
+                username=f"@student{index}", first_name="Sam", last_name=f"Student{index}", email=f"student{index}@example.com"
+            ))
+            for index in range(3)
+        ]
+
+        # Lessons with a known history: two completed, one cancelled and one scheduled occurrence each
+        self.lessons = []
+        for student, subject, price in [
+            (self.students[0], self.subjects[0], Decimal('30.00')),
+            (self.students[0], self.subjects[1], Decimal('45.00')),
+            (self.students[1], self.subjects[0], Decimal('20.00')),
+        ]:
+            lesson = Lesson.objects.create(
+                tutor=self.tutor, student=student, subject=subject, term=self.term,
+                frequency='W', duration=timedelta(hours=1), start_date=self.term.start_date, price_per_lesson=price,
+            )
+            LessonStatus.objects.filter(lesson_id=lesson).delete()
+            LessonStatus.objects.bulk_create([
+                LessonStatus(lesson_id=lesson, date=self.today - timedelta(weeks=2), time='10:00', status=Status.COMPLETED),
+                LessonStatus(lesson_id=lesson, date=self.today - timedelta(weeks=1), time='10:00', status=Status.COMPLETED),
+                LessonStatus(lesson_id=lesson, date=self.today - timedelta(days=3), time='10:00', status=Status.CANCELLED),
+                LessonStatus(lesson_id=lesson, date=self.today + timedelta(weeks=1), time='10:00', status=Status.SCHEDULED),
+            ])
+            self.lessons.append(lesson)
+
+    def test_only_completed_uninvoiced_lessons_are_billable(self):
+        self.assertEqual(billable_lessons().count(), 6)
+        self.assertFalse(billable_lessons().exclude(status=Status.COMPLETED).exists())
+
+    def test_lessons_already_on_an_invoice_are_not_billable(self):
+        invoice = Invoice.objects.create(student=self.students[0], due_date=self.today + timedelta(days=30), amount=30)
+        invoice.lessons.add(billable_lessons().filter(lesson_id=self.lessons[0]).first())
+        self.assertEqual(billable_lessons().count(), 5)
+
+    def test_run_creates_one_invoice_per_student(self):
+        totals = InvoicingRun().run()
+        self.assertEqual(totals, {'invoices': 2, 'lessons': 6, 'amount': Decimal('190.00')})
+
+        first_invoice = Invoice.objects.get(student=self.students[0])
+        self.assertEqual(first_invoice.amount, Decimal('150.00'))
+        self.assertEqual(first_invoice.lessons.count(), 4)
+        self.assertEqual(first_invoice.due_date, self.today + timedelta(days=30))
+        self.assertEqual(Invoice.objects.get(student=self.students[1]).amount, Decimal('40.00'))
+        self.assertFalse(Invoice.objects.filter(student=self.students[2]).exists())
+
+    def test_second_run_does_not_bill_twice(self):
+        InvoicingRun().run()
+        self.assertEqual(InvoicingRun().run(), {'invoices': 0, 'lessons': 0, 'amount': 0})
+        self.assertEqual(InvoiceLessonLink.objects.count(), 6)
+
+    def test_run_only_bills_lessons_up_to_the_given_date(self):
+        totals = InvoicingRun(until=self.today - timedelta(weeks=2)).run()
+        self.assertEqual(totals['lessons'], 3)
+
+    def test_students_are_streamed_in_chunks(self):
+        invoicing_run = InvoicingRun(chunk_size=1)
+        self.assertEqual(list(invoicing_run.student_chunks()), [[self.students[0].pk], [self.students[1].pk]])
+
+    def test_each_chunk_uses_a_fixed_number_of_queries(self):
+        # Find the chunk, load its lessons, then the transaction around the two bulk inserts
+        with self.assertNumQueries(6):
+            InvoicingRun(chunk_size=10).run()
+
+    def test_pending(self):
+        self.assertEqual(InvoicingRun().pending(), {'students': 2, 'lessons': 6})
+
+    def test_command_reports_totals(self):
+        out = StringIO()
+        call_command('generate_invoices', '--due-days', '14', stdout=out)
+        self.assertIn("Created 2 invoices for 6 lessons, totalling $190.00.", out.getvalue())
+        self.assertEqual(Invoice.objects.first().due_date, self.today + timedelta(days=14))
+
+    def test_invoicing_run_page_is_admin_only(self):
+        self.client.force_login(self.students[0].user)
+        self.assertEqual(self.client.get(reverse('invoicing_run')).status_code, 403)
+        self.assertEqual(self.client.post(reverse('invoicing_run')).status_code, 403)
+        self.assertFalse(Invoice.objects.exists())
+
+    def test_invoicing_run_page_creates_invoices(self):
+        admin = User.objects.create(username="@admin", first_name="Ada", last_name="Admin", email="admin@example.com")
+        Admin.objects.create(user=admin)
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse('invoicing_run'))
+        self.assertTemplateUsed(response, 'invoices/invoicing_run.html')
+        self.assertEqual(response.context['pending'], {'students': 2, 'lessons': 6})
+
+        response = self.client.post(reverse('invoicing_run'), follow=True)
+        self.assertRedirects(response, reverse('invoice_list'))
+        self.assertContains(response, "Created 2 invoices for 6 lessons")
+        self.assertEqual(Invoice.objects.count(), 2)
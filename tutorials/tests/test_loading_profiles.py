@@ -0,0 +1,79 @@
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tutorials.models import (
+    Invoice, Lesson, LessonRequest, LessonStatus, LessonUpdateRequest, Student, Subject, Term, Tutor, User
+)
+from tutorials.tests.test_query_budgets import build_dataset
+
+
+class LoadingProfileTestCase(TestCase):
+    """Checks that list pages built on loading profiles run as many queries for many rows as for a few."""
+
+    LIST_ROUTES = ['lessons_list', 'invoice_list', 'requests', 'update_requests', 'students_list', 'tutors_list']
+
+    def setUp(self):
+        self.data = build_dataset(1)
+
+    def add_students(self, count):
+        """Adds students with two lessons, a pending change, a lesson request and an invoice each."""
+        term = Term.objects.first()
+        subjects = list(Subject.objects.order_by('pk'))
+        tutors = list(Tutor.objects.order_by('pk'))
+        for index in range(count):
+            student = Student.objects.create(user=User.objects.create(
+                username=f'@extrastudent{index}', first_name='Extra', last_name=f'Student{index}',
+                email=f'extrastudent{index}@example.org'
+            ))
+            for offset, subject in enumerate(subjects[:2]):
+                lesson = Lesson.objects.create(
+                    tutor=tutors[offset], student=student, subject=subject, term=term, frequency='W',
+                    duration=timedelta(hours=1), start_date=term.start_date, price_per_lesson=30
+                )
+            LessonUpdateRequest.objects.create(lesson=lesson, update_option='2', made_by='Student')
+            LessonRequest.objects.create(
+                student=student, subject=subjects[2], term=term, time=time(10),
+                start_date=date.today() + timedelta(days=7), frequency='W'
+            )
+            invoice = Invoice.objects.create(student=student, due_date=date.today() + timedelta(days=30), amount=60)
+            invoice.lessons.set(LessonStatus.objects.filter(lesson_id__student=student)[:2])
+
+    def query_counts(self, role):
+        """Returns the number of queries of every list route rendered as the given role."""
+        self.client.force_login(self.data[role])
+        counts = {}
+        for url_name in self.LIST_ROUTES:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(url_name))
+            counts[url_name] = len(queries)
+        return counts
+
+    def test_list_pages_run_the_same_queries_whatever_their_size(self):
+        for role in ['admin', 'tutor', 'student']:
+            with self.subTest(role=role):
+                few_rows = self.query_counts(role)
+                self.add_students(5)
+                self.assertEqual(self.query_counts(role), few_rows)
+                Student.objects.filter(user__username__startswith='@extrastudent').delete()
+                User.objects.filter(username__startswith='@extrastudent').delete()
+
+    def test_profile_loads_its_relations(self):
+        lesson = Lesson.objects.load('list').get(pk=self.data['lesson'].pk)
+        with self.assertNumQueries(0):
+            lesson.student.user.full_name()
+            lesson.tutor.user.full_name()
+            lesson.subject.name
+            lesson.term.start_date
+
+    def test_profile_prefetches_its_relations(self):
+        invoice = Invoice.objects.load('detail').get(pk=self.data['invoice'].pk)
+        with self.assertNumQueries(0):
+            [lesson_status.lesson_id.subject.name for lesson_status in invoice.lessons.all()]
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, "Lesson has no loading profile named 'everything'."):
+            Lesson.objects.load('everything')
@@ -0,0 +1,152 @@
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from tutorials.availability_index import availability_index
+from tutorials.matching import LessonRequestMatcher
+from tutorials.models import Admin, Lesson, LessonRequest, Status, Student, Subject, Term, Tutor, TutorAvailability, User
+
+
+class LessonRequestMatcherTestCase(TestCase):
+
+    def setUp(self):
+        availability_index.clear()
+        self.python = Subject.objects.create(name="Python")
+        self.java = Subject.objects.create(name="Java")
+        self.term = Term.objects.create(start_date=date.today(), end_date=date.today() + timedelta(days=90))
+        self.monday = date.today() + timedelta(days=7 - date.today().weekday())
+
+        self.tutor = self.create_tutor("@tutor1", [self.python])
+        self.other_tutor = self.create_tutor("@tutor2", [self.python, self.java])
+        for tutor in [self.tutor, self.other_tutor]:
+            TutorAvailability.objects.create(tutor=tutor, day=0, start_time=time(9), end_time=time(17), status='Available')
+
+        self.students = [
+            Student.objects.create(user=User.objects.create(
+                username=f"@student{index}", first_name="Jane", last_name=f"Doe{index}", email=f"student{index}@example.com"
+            ))
+            for index in range(3)
+        ]
+
+    def create_tutor(self, username, subjects):
+        tutor = Tutor.objects.create(
+            user=User.objects.create(username=username, first_name="John", last_name=username, email=f"{username[1:]}@example.com")
+        )
+        tutor.subjects.set(subjects)
+        return tutor
+
+    def create_request(self, student, subject, start_time=time(10)):
+        return LessonRequest.objects.create(
+            student=student,
+            subject=subject,
+            term=self.term,
+            time=start_time,
+            duration=timedelta(hours=1),
+            start_date=self.monday,
+            frequency='W',
+        )
+
+    def test_requests_are_spread_across_tutors(self):
+        self.create_request(self.students[0], self.python)
+        self.create_request(self.students[1], self.python)
+        matches = LessonRequestMatcher(30).match()
+        self.assertEqual({tutor_id for lesson_request, tutor_id in matches}, {self.tutor.pk, self.other_tutor.pk})
+
+    def test_tutor_must_teach_subject(self):
+        self.create_request(self.students[0], self.java)
+        matches = LessonRequestMatcher(30).match()
+        self.assertEqual([tutor_id for lesson_request, tutor_id in matches], [self.other_tutor.pk])
+
+    def test_tutor_cannot_be_double_booked(self):
+        self.create_request(self.students[0], self.java)
+        self.create_request(self.students[1], self.java)
+        matches = LessonRequestMatcher(30).match()
+        self.assertEqual(len(matches), 1)
+
+    def test_request_outside_availability_is_not_matched(self):
+        self.create_request(self.students[0], self.python, start_time=time(17))
+        self.assertEqual(LessonRequestMatcher(30).match(), [])
+
+    def test_matching_uses_a_fixed_number_of_queries(self):
+        for student in self.students:
+            self.create_request(student, self.python)
+        availability_index.is_available(self.tutor.pk, 0, time(9), time(10))
+        with self.assertNumQueries(4):
+            LessonRequestMatcher(30).match()
+
+    def test_assign_creates_lessons_and_confirms_requests(self):
+        lesson_request = self.create_request(self.students[0], self.java)
+        confirmed = LessonRequestMatcher(45).assign()
+        self.assertEqual(confirmed, [lesson_request])
+        lesson_request.refresh_from_db()
+        self.assertEqual(lesson_request.status, Status.CONFIRMED)
+        lesson = lesson_request.lesson_assigned
+        self.assertEqual(lesson.tutor, self.other_tutor)
+        self.assertEqual(lesson.price_per_lesson, 45)
+        self.assertEqual(lesson.set_start_time, time(10))
+        self.assertTrue(lesson.lessonstatus_set.exists())
+        self.students[0].refresh_from_db()
+        self.assertTrue(self.students[0].has_new_lesson_notification)
+
+    def test_assigned_lessons_run_on_the_requested_weekday(self):
+        lesson_request = self.create_request(self.students[0], self.java)
+        LessonRequestMatcher(45).assign()
+        lesson_request.refresh_from_db()
+        slot = TutorAvailability.objects.get(tutor=self.other_tutor, status=TutorAvailability.Availability.BOOKED)
+        self.assertEqual(slot.day, lesson_request.start_date.weekday())
+        self.assertEqual((slot.start_time, slot.end_time), (time(10), time(11)))
+        dates = list(lesson_request.lesson_assigned.lessonstatus_set.values_list('date', flat=True))
+        self.assertEqual(min(dates), lesson_request.start_date)
+        self.assertTrue(all(lesson_date.weekday() == slot.day for lesson_date in dates))
+
+    def test_later_runs_see_the_booked_slot(self):
+        self.create_request(self.students[0], self.java)
+        LessonRequestMatcher(45).assign()
+        self.create_request(self.students[1], self.java)
+        self.assertEqual(LessonRequestMatcher(45).match(), [])
+
+    def test_command_assigns_pending_requests(self):
+        self.create_request(self.students[0], self.python)
+        self.create_request(self.students[1], self.java)
+        out = StringIO()
+        call_command('assign_lesson_requests', '--price', '25', stdout=out)
+        self.assertIn("Assigned 2 of 2 pending requests.", out.getvalue())
+        self.assertEqual(Lesson.objects.filter(price_per_lesson=25).count(), 2)
+
+    def test_command_dry_run_does_not_write(self):
+        self.create_request(self.students[0], self.python)
+        out = StringIO()
+        call_command('assign_lesson_requests', '--dry-run', stdout=out)
+        self.assertIn("1 of 1 pending requests can be assigned.", out.getvalue())
+        self.assertFalse(Lesson.objects.exists())
+
+    def test_assignment_run_page_is_admin_only(self):
+        self.create_request(self.students[0], self.python)
+        self.client.force_login(self.students[0].user)
+        self.assertEqual(self.client.get(reverse('assignment_run')).status_code, 403)
+        self.assertEqual(self.client.post(reverse('assignment_run')).status_code, 403)
+        self.assertFalse(Lesson.objects.exists())
+
+    def test_assignment_run_page_assigns_pending_requests(self):
+        admin = User.objects.create(username="@admin", first_name="Ada", last_name="Admin", email="admin@example.com")
+        Admin.objects.create(user=admin)
+        self.client.force_login(admin)
+        lesson_request = self.create_request(self.students[0], self.java)
+        self.create_request(self.students[1], self.java)
+
+        response = self.client.get(reverse('requests'))
+        self.assertContains(response, reverse('assignment_run'))
+
+        response = self.client.get(reverse('assignment_run'))
+        self.assertTemplateUsed(response, 'admin/requests/assignment_run.html')
+        self.assertEqual(response.context['pending_count'], 2)
+        self.assertEqual(response.context['matches'], [(lesson_request, self.other_tutor)])
+
+        response = self.client.post(reverse('assignment_run'), follow=True)
+        self.assertRedirects(response, reverse('requests'))
+        self.assertContains(response, "Assigned 1 of 2 pending requests.")
+        lesson_request.refresh_from_db()
+        self.assertEqual(lesson_request.lesson_assigned.tutor, self.other_tutor)
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from django.test import TestCase
+from django.urls import reverse
+
+from tutorials.models import Admin, Invoice, Student, Subject, User
+from tutorials.pagination import KeysetPaginator
+
+
+class KeysetPaginatorTestCase(TestCase):
+
+    def setUp(self):
+        # Names repeat, so pages have to break ties on the primary key
+        self.subjects = Subject.objects.bulk_create([Subject(name=f"Subject {index // 3:02}") for index in range(25)])
+        self.ordered = list(Subject.objects.order_by('name', 'pk'))
+
+    def walk(self, paginator):
+        """Follows the next cursors from the first page, returning every page."""
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return pages
+
+    def test_pages_cover_every_row_once_in_order(self):
+        pages = self.walk(KeysetPaginator(Subject.objects.all(), 10, ['name']))
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([subject for page in pages for subject in page], self.ordered)
+        self.assertEqual([page.start_index() for page in pages], [1, 11, 21])
+
+    def test_descending_ordering(self):
+        pages = self.walk(KeysetPaginator(Subject.objects.all(), 10, ['-name']))
+        self.assertEqual([subject for page in pages for subject in page], self.ordered[::-1])
+
+    def test_previous_cursor_goes_back_a_page(self):
+        paginator = KeysetPaginator(Subject.objects.all(), 10, ['name'])
+        first, second, third = self.walk(paginator)
+        self.assertFalse(first.has_previous())
+        self.assertIsNone(first.previous_cursor)
+
+        back = paginator.get_page(third.previous_cursor)
+        self.assertEqual(list(back), list(second))
+        self.assertEqual(back.start_index(), 11)
+        self.assertTrue(back.has_next())
+
+        back = paginator.get_page(back.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_every_page_costs_one_query(self):
+        paginator = KeysetPaginator(Subject.objects.all(), 10, ['name'])
+        cursor = paginator.get_page().next_cursor
+        with self.assertNumQueries(1):
+            paginator.get_page(cursor)
+
+    def test_count_is_only_queried_when_read(self):
+        paginator = KeysetPaginator(Subject.objects.all(), 10, ['name'])
+        with self.assertNumQueries(1):
+            paginator.get_page()
+        self.assertEqual(paginator.count, 25)
+
+    def test_short_list_is_counted_from_its_only_page(self):
+        paginator = KeysetPaginator(Subject.objects.filter(name="Subject 00"), 10, ['name'])
+        paginator.get_page()
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 3)
+
+    def test_invalid_cursor_returns_the_first_page(self):
+        paginator = KeysetPaginator(Subject.objects.all(), 10, ['name'])
+        cursor = paginator.get_page().next_cursor
+        other_ordering_cursor = KeysetPaginator(Subject.objects.all(), 10, ['name', 'description']).get_page().next_cursor
+        for invalid_cursor in ['nonsense', cursor[:-2] + 'xx', other_ordering_cursor]:
+            self.assertEqual(list(paginator.get_page(invalid_cursor)), self.ordered[:10])
+
+    def test_cursor_keeps_datetime_keys_exact(self):
+        student = Student.objects.create(user=User.objects.create(
+            username="@student", first_name="Sam", last_name="Student", email="student@example.com"
+        ))
+        for _ in range(5):
+            Invoice.objects.create(student=student, amount=10, due_date=date.today() + timedelta(days=30))
+
+        pages = self.walk(KeysetPaginator(Invoice.objects.all(), 2, ['-created_at']))
+        self.assertEqual(
+            [invoice.pk for page in pages for invoice in page],
+            list(Invoice.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+        )
+
+    def test_subjects_list_pages_with_a_cursor(self):
+        admin = User.objects.create_user(
+            username="@admin", first_name="Ada", last_name="Admin", email="admin@example.com", password="admin123"
+        )
+        Admin.objects.create(user=admin)
+        self.client.login(username="@admin", password="admin123")
+
+        response = self.client.get(reverse('subjects_list'))
+        page = response.context['page_obj']
+        self.assertContains(response, "Total Subjects: 25")
+        self.assertContains(response, f'href="/dashboard/subjects/?{urlencode({"cursor": page.next_cursor})}"')
+
+        response = self.client.get(reverse('subjects_list'), {'cursor': page.next_cursor})
+        self.assertEqual(list(response.context['page_obj']), self.ordered[20:])
+        self.assertNotContains(response, "Total Subjects:")
@@ -0,0 +1,302 @@
+import csv
+import os
+from datetime import date, time, timedelta
+from time import perf_counter
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+
+from tutorials.availability_index import availability_index
+from tutorials.models import (
+    Admin, Invoice, Lesson, LessonRequest, LessonStatus, LessonUpdateRequest, Student, Subject, Term, Tutor,
+    TutorAvailability, User
+)
+
+
+"""
+This file contains a regression suite checking
+The number of queries of every named route against a budget
+"""
+
+# Maximum number of queries a GET of each named route may run, whatever the role and the size of the data.
+# A view whose count grows with the number of rows it shows has an N+1 query and must be fixed, not re-budgeted.
+QUERY_BUDGETS = {
+    'home': 2,
+    'dashboard': 3,
+    'log_in': 2,
+    'log_out': 4,
+    'password': 2,
+    'profile': 4,
+    'sign_up': 2,
+    'students_list': 5,
+    'student_details': 8,
+    'student_edit': 5,
+    'student_delete': 5,
+    'student_calendar': 4,
+    'tutors_list': 5,
+    'tutor_details': 11,
+    'tutor_edit': 5,
+    'tutor_delete': 5,
+    'tutor_calendar': 4,
+    'lessons_list': 5,
+    'lesson_detail': 3,
+    'update_feedback': 7,
+    'request_changes': 6,
+    'cancel_lesson': 9,
+    'subjects_list': 3,
+    'subject_edit': 3,
+    'subject_delete': 3,
+    'new_subject': 2,
+    'update_requests': 3,
+    'update_lesson': 13,
+    'calendar': 2,
+    'requests': 3,
+    'lesson_request': 4,
+    'request_assign': 11,
+    'assignment_run': 9,
+    'availability': 3,
+    'availability_add': 2,
+    'availability_edit': 3,
+    'invoice_list': 3,
+    'create_invoice': 4,
+    'invoicing_run': 3,
+    'invoice_reconciliation': 3,
+    'invoice_detail': 6,
+    'profiling': 2,
+    'avatar': 2,
+}
+
+# Routes written for some roles only, which still fail with a server error for the other roles.
+# Every other route must answer every role with a status below 500, so that a crashing view cannot pass its budget.
+ROUTE_ROLES = {
+    'availability': {'tutor'},
+    'update_lesson': {'admin'},
+}
+
+# Set to a file path to write every measurement as CSV, e.g. QUERY_BUDGET_REPORT=query_budgets.csv
+REPORT_ENV_VARIABLE = 'QUERY_BUDGET_REPORT'
+
+
+def named_routes():
+    """Returns the names of the routes of code_tutors/urls.py, leaving out the Django admin site."""
+    return {
+        pattern.name for pattern in get_resolver().url_patterns
+        if isinstance(pattern, URLPattern) and pattern.name
+    }
+
+
+def build_dataset(scale):
+    """Creates users, lessons, requests, availability and invoices, growing linearly with scale."""
+    today = date.today()
+    term = Term.objects.create(start_date=today - timedelta(weeks=8), end_date=today + timedelta(weeks=8))
+    subjects = [Subject.objects.create(name=name) for name in ['Python', 'Java', 'C++', 'Ruby']]
+
+    admin = User.objects.create_user(
+        '@budgetadmin', first_name='Ada', last_name='Admin', email='budgetadmin@example.org'
+    )
+    Admin.objects.create(user=admin)
+
+    tutors = []
+    for index in range(2 * scale):
+        user = User.objects.create_user(
+            f'@budgettutor{index}', first_name='Tom', last_name=f'Tutor{index}',
+            email=f'budgettutor{index}@example.org'
+        )
+        tutor = Tutor.objects.create(user=user)
+        tutor.subjects.set(subjects)
+        TutorAvailability.objects.bulk_create([
+            TutorAvailability(tutor=tutor, day=day, start_time=time(8), end_time=time(9), status='Available')
+            for day in range(5)
+        ])
+        tutors.append(tutor)
+
+    students = []
+    for index in range(5 * scale):
+        user = User.objects.create_user(
+            f'@budgetstudent{index}', first_name='Sam', last_name=f'Student{index}',
+            email=f'budgetstudent{index}@example.org'
+        )
+        students.append(Student.objects.create(user=user))
+
+    lessons = []
+    for index, student in enumerate(students):
+        for offset, subject in enumerate(subjects[:2]):
+            lessons.append(Lesson.objects.create(
+                tutor=tutors[(index + offset) % len(tutors)],
+                student=student,
+                subject=subject,
+                term=term,
+                frequency='W',
+                duration=timedelta(hours=1),
+                start_date=term.start_date,
+                price_per_lesson=30,
+            ))
+
+    for lesson in lessons[:scale]:
+        LessonUpdateRequest.objects.create(lesson=lesson, update_option='2', details='Move it', made_by='Student')
+
+    LessonRequest.objects.bulk_create([
+        LessonRequest(
+            student=student, subject=subjects[2], term=term, time=time(10),
+            start_date=today + timedelta(days=7), frequency='W'
+        )
+        for student in students
+    ])
+
+    for student in students:
+        invoice = Invoice.objects.create(student=student, due_date=today + timedelta(days=30), amount=120)
+        invoice.lessons.set(LessonStatus.objects.filter(lesson_id__student=student)[:4])
+
+    return {
+        'admin': admin,
+        'tutor': tutors[0].user,
+        'student': students[0].user,
+        'lesson': lessons[0],
+        'lesson_status': LessonStatus.objects.filter(lesson_id=lessons[0]).order_by('date').last(),
+        'subject': subjects[0],
+        'request': LessonRequest.objects.filter(student=students[0]).first(),
+        'availability': TutorAvailability.objects.filter(tutor=tutors[0]).first(),
+        'invoice': Invoice.objects.filter(student=students[0]).first(),
+    }
+
+
+def route_cases(data):
+    """Returns (url name, url kwargs) pairs covering every variant of every named route."""
+    student_id = data['student'].id
+    tutor_id = data['tutor'].id
+    today = date.today()
+    return [
+        ('home', {}),
+        ('dashboard', {}),
+        ('log_in', {}),
+        ('password', {}),
+        ('profile', {}),
+        ('sign_up', {}),
+        ('students_list', {}),
+        ('student_details', {'student_id': student_id}),
+        ('student_edit', {'student_id': student_id}),
+        ('student_delete', {'student_id': student_id}),
+        ('student_calendar', {'student_id': student_id}),
+        ('student_calendar', {'student_id': student_id, 'year': today.year, 'month': today.month}),
+        ('tutors_list', {}),
+        ('tutor_details', {'tutor_id': tutor_id}),
+        ('tutor_edit', {'tutor_id': tutor_id}),
+        ('tutor_delete', {'tutor_id': tutor_id}),
+        ('tutor_calendar', {'tutor_id': tutor_id}),
+        ('tutor_calendar', {'tutor_id': tutor_id, 'year': today.year, 'month': today.month}),
+        ('lessons_list', {}),
+        ('lesson_detail', {'lesson_id': data['lesson'].id}),
+        ('update_feedback', {'lesson_id': data['lesson_status'].id}),
+        ('request_changes', {'lesson_id': data['lesson'].id}),
+        ('cancel_lesson', {'lesson_id': data['lesson_status'].id}),
+        ('subjects_list', {}),
+        ('subject_edit', {'subject_id': data['subject'].id}),
+        ('subject_delete', {'subject_id': data['subject'].id}),
+        ('new_subject', {}),
+        ('update_requests', {}),
+        ('update_lesson', {'lesson_id': data['lesson'].id}),
+        ('calendar', {}),
+        ('calendar', {'year': today.year, 'month': today.month}),
+        ('requests', {}),
+        ('lesson_request', {}),
+        ('request_assign', {'request_id': data['request'].id}),
+        ('assignment_run', {}),
+        ('availability', {}),
+        ('availability_add', {}),
+        ('availability_edit', {'pk': data['availability'].id}),
+        ('invoice_list', {}),
+        ('create_invoice', {}),
+        ('invoicing_run', {}),
+        ('invoice_reconciliation', {}),
+        ('invoice_detail', {'invoice_id': data['invoice'].id}),
+        ('profiling', {}),
+        ('avatar', {'digest': '0' * 32, 'size': 60}),
+        # Last, as it ends the session
+        ('log_out', {}),
+    ]
+
+
+class QueryBudgetTestCase(TestCase):
+    """Renders every named route as an admin, a tutor and a student at two sizes of data and checks its query budget."""
+
+    # A per-row query still fits in a fixed budget on a small dataset, so every route is also measured on a
+    # dataset over three times larger and must not run more queries there. The small dataset already has more than one page of every
+    # list, since a list that fits on its first page skips its total COUNT
+    SCALES = (12, 40)
+    ROLES = ['admin', 'tutor', 'student']
+    measurements = []
+
+    @classmethod
+    def tearDownClass(cls):
+        report_path = os.environ.get(REPORT_ENV_VARIABLE)
+        if report_path:
+            with open(report_path, 'w', newline='') as report:
+                writer = csv.writer(report)
+                writer.writerow(['scale', 'route', 'url', 'role', 'status', 'queries', 'budget', 'seconds'])
+                writer.writerows(cls.measurements)
+        super().tearDownClass()
+
+    def measure(self, scale, user, role, url_name, kwargs):
+        """Requests a route as the given user, records the measurement and returns its status and query count.
+
+        The wall time is only recorded for the report, as it is too noisy on shared machines to fail a test.
+        """
+        self.client.force_login(user)
+        # Routes of ROUTE_ROLES fail for the other roles; their queries still count against the budget
+        self.client.raise_request_exception = False
+        url = reverse(url_name, kwargs=kwargs)
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            response = self.client.get(url)
+            seconds = perf_counter() - start
+        self.measurements.append([
+            scale, url_name, url, role, response.status_code, len(queries), QUERY_BUDGETS[url_name], round(seconds, 4)
+        ])
+        return response.status_code, len(queries)
+
+    def measure_routes(self, scale):
+        """Builds the dataset at the given scale and checks every route as every role against its budget.
+
+        Returns the route name and query count of each (role, route case index).
+        """
+        cache.clear()
+        availability_index.clear()
+        data = build_dataset(scale)
+        query_counts = {}
+        for role in self.ROLES:
+            for index, (url_name, kwargs) in enumerate(route_cases(data)):
+                with self.subTest(scale=scale, role=role, route=url_name, kwargs=kwargs):
+                    status_code, query_count = self.measure(scale, data[role], role, url_name, kwargs)
+                    query_counts[(role, index)] = (url_name, query_count)
+                    if role in ROUTE_ROLES.get(url_name, self.ROLES):
+                        self.assertLess(status_code, 500, f"{url_name} as {role} failed with {status_code}")
+                    self.assertLessEqual(
+                        query_count, QUERY_BUDGETS[url_name],
+                        f"{url_name} as {role} ran {query_count} queries, over its budget of {QUERY_BUDGETS[url_name]}"
+                    )
+        return query_counts
+
+    def test_every_named_route_has_a_budget(self):
+        self.assertEqual(named_routes() - set(QUERY_BUDGETS), set())
+        self.assertEqual({url_name for url_name, kwargs in route_cases(build_dataset(1))}, named_routes())
+        self.assertEqual(set(ROUTE_ROLES) - named_routes(), set())
+
+    def test_routes_stay_within_query_budget(self):
+        query_counts = []
+        for scale in self.SCALES:
+            # Each dataset is rolled back before the next one is built, so the route cases of both line up
+            with transaction.atomic():
+                query_counts.append(self.measure_routes(scale))
+                transaction.set_rollback(True)
+
+        small, large = query_counts
+        for key, (url_name, query_count) in small.items():
+            with self.subTest(role=key[0], route=url_name):
+                self.assertLessEqual(
+                    large[key][1], query_count,
+                    f"{url_name} as {key[0]} ran {query_count} queries at scale {self.SCALES[0]} "
+                    f"and {large[key][1]} at scale {self.SCALES[1]}"
+                )
@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tutorials.models import (
+    Admin, Invoice, Lesson, LessonStatus, LessonUpdateRequest, PaymentStatus, Status, Student, TutorAvailability, User
+)
+
+
+class QueryPlanTestCase(TestCase):
+    """Checks with EXPLAIN QUERY PLAN that the hot access paths seek an index instead of scanning the table."""
+
+    fixtures = [
+        'tutorials/tests/fixtures/default_user.json',
+        'tutorials/tests/fixtures/other_users.json',
+        'tutorials/tests/fixtures/default_tutor.json',
+        'tutorials/tests/fixtures/default_student.json',
+        'tutorials/tests/fixtures/default_lesson.json',
+        'tutorials/tests/fixtures/default_subject.json',
+        'tutorials/tests/fixtures/default_term.json',
+    ]
+
+    def setUp(self):
+        self.admin_user = User.objects.get(username='@johndoe')
+        Admin.objects.create(user=self.admin_user)
+        self.student = Student.objects.get(user__username='@janedoe')
+        self.lesson = Lesson.objects.get(pk=1)
+
+    def query_plan(self, sql):
+        """Returns the detail lines of the SQLite query plan of a statement."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[3] for row in cursor.fetchall()]
+
+    def view_plans(self, url, table):
+        """Returns the query plans of every query the view at url runs against the given table."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        plans = [
+            self.query_plan(query['sql']) for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+        ]
+        self.assertTrue(plans, f'{url} ran no query against {table}')
+        return plans
+
+    def queryset_plan(self, queryset):
+        """Returns the detail lines of the query plan of a queryset."""
+        return [line.split(' ', 3)[3] for line in queryset.explain().splitlines()]
+
+    def assertSeeks(self, plan, table, index):
+        """Asserts the plan looks the table up through the index, never scanning it."""
+        self.assertFalse([line for line in plan if line.startswith(f'SCAN {table}')], plan)
+        self.assertTrue([
+            line for line in plan
+            if line.startswith(f'SEARCH {table} USING') and f'INDEX {index} ' in line
+        ], plan)
+
+    def test_calendar_seeks_lesson_occurrences_by_date(self):
+        self.client.force_login(self.admin_user)
+        for plan in self.view_plans(reverse('tutor_calendar', args=[3]), 'tutorials_lessonstatus'):
+            self.assertSeeks(plan, 'tutorials_lessonstatus', 'lessonstatus_lesson_date_idx')
+
+    def test_update_lesson_seeks_pending_requests_and_occurrences(self):
+        LessonUpdateRequest.objects.create(lesson=self.lesson, update_option='2', made_by='Student')
+        LessonStatus.objects.bulk_create([
+            LessonStatus(lesson_id=self.lesson, date=date.today() + timedelta(weeks=week), time='10:00', status=Status.PENDING)
+            for week in range(1, 4)
+        ])
+        self.client.force_login(self.admin_user)
+        url = reverse('update_lesson', args=[self.lesson.pk])
+
+        for plan in self.view_plans(url, 'tutorials_lessonupdaterequest'):
+            self.assertSeeks(plan, 'tutorials_lessonupdaterequest', 'updaterequest_pending_idx')
+
+        plans = self.view_plans(url, 'tutorials_lessonstatus')
+        self.assertIn('lessonstatus_lesson_status_idx', str(plans))
+        for plan in plans:
+            self.assertFalse([line for line in plan if line.startswith('SCAN tutorials_lessonstatus')], plan)
+
+    def test_lessons_list_seeks_pending_update_requests(self):
+        self.client.force_login(self.admin_user)
+        for plan in self.view_plans(reverse('lessons_list'), 'tutorials_lessonupdaterequest'):
+            self.assertSeeks(plan, 'tutorials_lessonupdaterequest', 'updaterequest_pending_idx')
+
+    def test_student_requests_seek_by_student(self):
+        self.client.force_login(self.student.user)
+        for plan in self.view_plans(reverse('requests'), 'tutorials_lessonrequest'):
+            self.assertSeeks(plan, 'tutorials_lessonrequest', 'lessonrequest_student_idx')
+            self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_all_requests_are_read_in_index_order(self):
+        self.client.force_login(self.admin_user)
+        for plan in self.view_plans(reverse('requests'), 'tutorials_lessonrequest'):
+            self.assertIn('SCAN tutorials_lessonrequest USING INDEX lessonrequest_created_idx', plan)
+            self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_overdue_sweep_seeks_unpaid_invoices_by_due_date(self):
+        unpaid = Invoice.objects.filter(status=PaymentStatus.UNPAID, due_date__lt=date.today())
+        self.assertSeeks(self.queryset_plan(unpaid), 'tutorials_invoice', 'invoice_status_due_idx')
+
+    def test_invoices_are_read_newest_first_from_the_index(self):
+        plan = Invoice.objects.order_by('-created_at')[:10].explain()
+        self.assertIn('SCAN tutorials_invoice USING INDEX invoice_created_idx', plan)
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_completion_sweep_seeks_occurrences_by_status_and_date(self):
+        today = date.today()
+        swept = LessonStatus.objects.filter(
+            date__gte=today - timedelta(days=30), date__lt=today, status__in=[Status.SCHEDULED, Status.PENDING]
+        )
+        self.assertSeeks(self.queryset_plan(swept), 'tutorials_lessonstatus', 'lessonstatus_status_date_idx')
+
+    def test_availability_seeks_tutor_day_and_status(self):
+        day_slots = TutorAvailability.objects.filter(tutor_id=3, day=0, status=TutorAvailability.Availability.BOOKED)
+        self.assertSeeks(self.queryset_plan(day_slots), 'tutorials_tutoravailability', 'availability_tutor_day_idx')
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from tutorials.recurrence import occurrence_dates, occurrence_range, occurrences_between, next_occurrence
+
+
+class OccurrenceDatesTestCase(TestCase):
+
+    def test_weekly_occurrences_include_end_date(self):
+        dates = occurrence_dates(date(2024, 9, 2), date(2024, 9, 30), 'W')
+        self.assertEqual(dates, [date(2024, 9, 2) + timedelta(weeks=week) for week in range(5)])
+
+    def test_fortnightly_and_monthly_steps(self):
+        self.assertEqual(
+            occurrence_dates(date(2024, 9, 2), date(2024, 10, 14), 'F'),
+            [date(2024, 9, 2), date(2024, 9, 16), date(2024, 9, 30), date(2024, 10, 14)]
+        )
+        self.assertEqual(
+            occurrence_dates(date(2024, 9, 2), date(2024, 10, 27), 'M'),
+            [date(2024, 9, 2), date(2024, 9, 30)]
+        )
+
+    def test_once_has_a_single_occurrence(self):
+        self.assertEqual(occurrence_dates(date(2024, 9, 2), date(2024, 12, 31), 'O'), [date(2024, 9, 2)])
+
+    def test_start_after_end_has_no_occurrences(self):
+        self.assertEqual(occurrence_dates(date(2024, 9, 2), date(2024, 9, 1), 'W'), [])
+
+    def test_unknown_frequency_is_rejected(self):
+        with self.assertRaises(ValueError):
+            occurrence_dates(date(2024, 9, 2), date(2024, 9, 30), 'D')
+
+
+class OccurrenceWindowTestCase(TestCase):
+
+    def setUp(self):
+        self.start = date(2024, 9, 2)
+        self.end = date(2025, 1, 15)
+
+    def test_window_matches_full_expansion(self):
+        for frequency in ['W', 'F', 'M', 'O']:
+            every_date = occurrence_dates(self.start, self.end, frequency)
+            window_start, window_end = date(2024, 11, 1), date(2024, 11, 30)
+            self.assertEqual(
+                occurrences_between(self.start, self.end, frequency, window_start, window_end),
+                [day for day in every_date if window_start <= day <= window_end]
+            )
+
+    def test_window_is_computed_without_expanding(self):
+        indices = occurrence_range(self.start, date(2224, 9, 2), 'W', date(2124, 1, 1), date(2124, 1, 31))
+        self.assertEqual(len(indices), 5)
+
+    def test_window_outside_recurrence_is_empty(self):
+        self.assertEqual(occurrences_between(self.start, self.end, 'W', date(2025, 2, 1), date(2025, 2, 28)), [])
+        self.assertEqual(occurrences_between(self.start, self.end, 'O', date(2024, 9, 3), date(2024, 9, 30)), [])
+
+    def test_next_occurrence(self):
+        self.assertEqual(next_occurrence(self.start, self.end, 'F', date(2024, 9, 3)), date(2024, 9, 16))
+        self.assertEqual(next_occurrence(self.start, self.end, 'F', date(2024, 9, 16)), date(2024, 9, 16))
+        self.assertIsNone(next_occurrence(self.start, self.end, 'W', date(2025, 1, 14)))
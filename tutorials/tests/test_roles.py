@@ -0,0 +1,59 @@
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tutorials.models import Admin, Student, Tutor, User
+from tutorials.roles import ROLE_SESSION_KEY, RoleBackend, user_role
+
+
+class RoleTestCase(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user('@admin', first_name='Ada', last_name='Admin', email='admin@example.org')
+        Admin.objects.create(user=self.admin)
+        self.tutor = User.objects.create_user('@tutor', first_name='Tom', last_name='Tutor', email='tutor@example.org')
+        Tutor.objects.create(user=self.tutor)
+        self.student = User.objects.create_user(
+            '@student', first_name='Sam', last_name='Student', email='student@example.org'
+        )
+        Student.objects.create(user=self.student)
+
+    def test_user_role(self):
+        self.assertEqual(user_role(self.admin), 'admin')
+        self.assertEqual(user_role(self.tutor), 'tutor')
+        self.assertEqual(user_role(self.student), 'student')
+        self.assertIsNone(user_role(AnonymousUser()))
+
+    def test_backend_loads_profiles_with_the_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            user = RoleBackend().get_user(self.tutor.pk)
+            role = user_role(user)
+            experience = user.tutor_profile.experience
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(role, 'tutor')
+        self.assertEqual(experience, self.tutor.tutor_profile.experience)
+
+    def test_logging_in_stores_the_role_in_the_session(self):
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.session[ROLE_SESSION_KEY], 'student')
+
+    def test_middleware_sets_the_role_on_the_request(self):
+        for user, role in [(self.admin, 'admin'), (self.tutor, 'tutor'), (self.student, 'student')]:
+            self.client.force_login(user)
+            response = self.client.get(reverse('dashboard'))
+            self.assertEqual(response.wsgi_request.role, role)
+
+    def test_middleware_stores_a_missing_role_in_the_session(self):
+        self.client.force_login(self.tutor)
+        session = self.client.session
+        del session[ROLE_SESSION_KEY]
+        session.save()
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.wsgi_request.role, 'tutor')
+        self.assertEqual(self.client.session[ROLE_SESSION_KEY], 'tutor')
+
+    def test_anonymous_requests_have_no_role(self):
+        response = self.client.get(reverse('home'))
+        self.assertIsNone(response.wsgi_request.role)
@@ -0,0 +1,114 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tutorials.models import Admin, Student, Tutor, User
+from tutorials.search import SQLiteUserSearch, similarity, user_search
+
+
+class UserSearchTestCase(TestCase):
+
+    def setUp(self):
+        self.users = {
+            username: User.objects.create_user(
+                username=f"@{username}", first_name=first_name, last_name=last_name,
+                email=f"{username}@example.org", password="Password123"
+            )
+            for username, first_name, last_name in [
+                ('janedoe', 'Jane', 'Doe'),
+                ('johndoe', 'John', 'Doe'),
+                ('petrapickles', 'Petra', 'Pickles'),
+                ('janinesmith', 'Janine', 'Smith'),
+            ]
+        }
+
+    def search(self, text):
+        return [User.objects.get(pk=user_id).username for user_id in user_search.search(text, 10)]
+
+    def test_backend_follows_the_database(self):
+        self.assertIsInstance(user_search, SQLiteUserSearch)
+
+    def test_prefix_of_any_field(self):
+        self.assertEqual(set(self.search('jan')), {'@janedoe', '@janinesmith'})
+        self.assertEqual(self.search('pick'), ['@petrapickles'])
+
+    def test_every_term_has_to_match(self):
+        self.assertEqual(self.search('jane doe'), ['@janedoe'])
+        self.assertEqual(set(self.search('j doe')), {'@janedoe', '@johndoe'})
+
+    def test_misspelt_search_finds_similar_users(self):
+        self.assertEqual(self.search('pikles'), ['@petrapickles'])
+        self.assertEqual(self.search('smiht'), ['@janinesmith'])
+        self.assertEqual(self.search('xavier'), [])
+
+    def test_misspellings_are_only_searched_without_a_match(self):
+        self.assertEqual(self.search('janin'), ['@janinesmith'])
+        self.assertEqual(self.search('jamine'), ['@janinesmith'])
+
+    def test_no_words_find_nobody(self):
+        self.assertEqual(self.search('  !! '), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        user = self.users['johndoe']
+        user.last_name = 'Brown'
+        user.save()
+        self.assertEqual(self.search('brown'), ['@johndoe'])
+        self.assertEqual(self.search('doe'), ['@janedoe'])
+
+        user.delete()
+        self.assertEqual(self.search('john'), [])
+
+    def test_search_uses_the_full_text_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            user_search.search('jan', 10)
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries.captured_queries[0]['sql']}")
+            plan = [row[3] for row in cursor.fetchall()]
+        self.assertTrue(any('VIRTUAL TABLE INDEX' in line for line in plan), plan)
+
+    def test_similarity(self):
+        self.assertEqual(similarity('pickles', ['pickles']), 1)
+        self.assertGreater(similarity('pikles', ['petra', 'pickles']), 0.3)
+        self.assertEqual(similarity('xyz', []), 0)
+
+    @override_settings(USER_SEARCH_LIMIT=1)
+    def test_students_list_search_is_ranked(self):
+        admin = User.objects.create_user(
+            username="@admin", first_name="Ada", last_name="Admin", email="admin@example.com", password="admin123"
+        )
+        Admin.objects.create(user=admin)
+        for username in ['janedoe', 'janinesmith']:
+            Student.objects.create(user=self.users[username])
+        self.client.login(username="@admin", password="admin123")
+
+        response = self.client.get(reverse('students_list'), {'search': 'janine'})
+        self.assertEqual([student.user for student in response.context['page_obj']], [self.users['janinesmith']])
+
+    @override_settings(USER_SEARCH_LIMIT=2)
+    def test_list_search_only_ranks_the_listed_users(self):
+        admin = User.objects.create_user(
+            username="@admin", first_name="Ada", last_name="Admin", email="admin@example.com", password="admin123"
+        )
+        Admin.objects.create(user=admin)
+        Student.objects.create(user=self.users['janinesmith'])
+        for index in range(5):
+            tutor = User.objects.create_user(
+                username=f"@smith{index}", first_name="Sam", last_name="Smith", email=f"smith{index}@example.org"
+            )
+            Tutor.objects.create(user=tutor)
+        self.client.login(username="@admin", password="admin123")
+
+        for search in ['smith', 'smiht']:
+            response = self.client.get(reverse('students_list'), {'search': search})
+            self.assertEqual([student.user for student in response.context['page_obj']], [self.users['janinesmith']])
+
+    def test_rebuild_command(self):
+        User.objects.bulk_create([User(username="@bulkuser", first_name="Bulk", last_name="User", email="bulk@example.org")])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn("Rebuilt the user search index.", out.getvalue())
+        self.assertEqual(self.search('bulk'), ['@bulkuser'])
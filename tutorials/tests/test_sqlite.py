@@ -0,0 +1,41 @@
+import sqlite3
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+from tutorials.sqlite import apply_pragmas
+
+
+class SQLitePragmasTestCase(TestCase):
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_new_connections_are_tuned(self):
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(self.pragma('cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+
+    def test_switches_database_files_to_wal(self):
+        with TemporaryDirectory() as directory:
+            database = sqlite3.connect(str(Path(directory) / 'tuned.sqlite3'))
+            try:
+                values = apply_pragmas(database, settings.SQLITE_PRAGMAS)
+            finally:
+                database.close()
+        self.assertEqual(values['journal_mode'], 'wal')
+        self.assertEqual(values['synchronous'], 1)
+        self.assertEqual(values['mmap_size'], settings.SQLITE_PRAGMAS['mmap_size'])
+
+    def test_applies_pragmas_in_order(self):
+        database = sqlite3.connect(':memory:')
+        try:
+            values = apply_pragmas(database, {'cache_size': -1024, 'busy_timeout': 250})
+        finally:
+            database.close()
+        self.assertEqual(list(values.items()), [('cache_size', -1024), ('busy_timeout', 250)])
@@ -1,8 +1,12 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from datetime import time, timedelta, date
 from random import choice
-from tutorials.models import User, Admin, Student, Tutor, Lesson, LessonStatus, Subject, Term
+from tutorials.models import User, Admin, Student, Tutor, Lesson, LessonStatus, LessonUpdateRequest, Subject, Term
+from tutorials.views import Calendar, UpdateLessonRequest
 
 class StudentsTestCase(TestCase):
 
@@ -109,3 +113,95 @@ class StudentsTestCase(TestCase):
             formatted_date = status.date.strftime('%b. %d, %Y').replace(' 0', ' ')  # Matching HTML
             self.assertContains(response, formatted_date)
 
+    def test_calendar_ignores_statuses_of_other_lessons(self):
+        other_lesson = Lesson.objects.get(pk=2)
+        LessonStatus.objects.create(
+            lesson_id=other_lesson,
+            date=self.lesson.start_date,
+            time=time(hour=18, minute=45),
+            status="Completed"
+        )
+        self.client.login(username='@janedoe', password='Password123')
+        response = self.client.get(reverse('calendar', kwargs={'year': self.year, 'month': self.month}))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, '6:45 p.m.')
+
+    def test_lessons_frequency_uses_a_single_query(self):
+        for week in range(4):
+            extra_lesson = Lesson.objects.create(
+                tutor=self.tutor,
+                student=Student.objects.get(pk=5 if week % 2 else 10),
+                subject=Subject.objects.create(name=f'Subject {week}'),
+                start_date=date(self.year, self.month, 2),
+                frequency='W',
+                duration=timedelta(minutes=60),
+                price_per_lesson=40.00,
+                term=self.term
+            )
+            LessonStatus.objects.create(
+                lesson_id=extra_lesson,
+                date=date(self.year, self.month, 2 + week * 7),
+                time=time(hour=11, minute=0),
+            )
+        lessons = Lesson.objects.filter(tutor=self.tutor)
+        first_day = date(self.year, self.month, 1)
+        last_day = date(self.year, self.month, 31)
+        with self.assertNumQueries(1):
+            schedule = Calendar().month_schedule(lessons, first_day, last_day)
+            for week_lessons in schedule.values():
+                for lesson in week_lessons:
+                    lesson['student'].user.full_name()
+                    lesson['tutor'].user.full_name()
+                    str(lesson['subject'])
+        self.assertEqual(len(schedule), 6)
+        scheduled = sum(len(week_lessons) for week_lessons in schedule.values())
+        self.assertEqual(
+            scheduled,
+            LessonStatus.objects.filter(lesson_id__tutor=self.tutor, date__range=(first_day, last_day)).count()
+        )
+
+    def test_month_schedule_is_served_from_cache(self):
+        cache.clear()
+        self.client.login(username='@janedoe', password='Password123')
+        url = reverse('calendar', kwargs={'year': self.year, 'month': self.month})
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('"tutorials_lessonstatus"."date" BETWEEN' in query['sql'] for query in queries))
+        self.assertContains(response, self.lesson.subject.name)
+
+    def test_lesson_status_change_invalidates_cached_month(self):
+        cache.clear()
+        self.client.login(username='@janedoe', password='Password123')
+        url = reverse('calendar', kwargs={'year': self.year, 'month': self.month})
+        self.client.get(url)
+        LessonStatus.objects.create(
+            lesson_id=self.lesson,
+            date=date(self.year, self.month, 30),
+            time=time(hour=19, minute=15),
+            status="Completed"
+        )
+        response = self.client.get(url)
+        self.assertContains(response, '7:15 p.m.')
+
+    def test_bulk_status_change_invalidates_entity_calendar(self):
+        cache.clear()
+        future_date = date.today() + timedelta(days=60)
+        LessonStatus.objects.create(
+            lesson_id=self.lesson,
+            date=future_date,
+            time=time(hour=10, minute=0),
+            status="Scheduled"
+        )
+        self.client.login(username='@johndoe', password='Password123')
+        url = reverse('student_calendar', kwargs={'student_id': self.student.pk, 'year': future_date.year, 'month': future_date.month})
+        url += f'?year={future_date.year}&month={future_date.month}'
+        response = self.client.get(url)
+        self.assertNotContains(response, 'Pending')
+
+        update_request = LessonUpdateRequest.objects.create(lesson=self.lesson, update_option='3', made_by='Student')
+        UpdateLessonRequest().change_status(update_request)
+
+        response = self.client.get(url)
+        self.assertContains(response, 'Pending')
@@ -5,6 +5,7 @@ from tutorials.models import (
     Tutor, Term, Lesson, LessonStatus
 )
 from datetime import date, timedelta
+from urllib.parse import urlencode
 from django.contrib.messages import get_messages
 
 
@@ -153,3 +154,64 @@ class InvoiceViewsTest(TestCase):
 
         self.assertTemplateUsed(response, 'invoices/create_invoice.html')
         self.assertEqual(Invoice.objects.count(), 1)
+
+    def test_invoice_list_shows_totals_in_one_query(self):
+        lesson = Lesson.objects.get(pk=1)
+        for day in range(1, 4):
+            status = LessonStatus.objects.create(
+                lesson_id=lesson, date=date.today() - timedelta(days=day), time='10:00', status='Completed'
+            )
+            self.invoice.lessons.add(status)
+
+        response = self.client.get(self.list_url)
+        invoice = response.context['invoices'][0]
+        self.assertEqual(invoice.lesson_count, 3)
+        self.assertEqual(invoice.get_total_hours(), 3 * lesson.duration.total_seconds() / 3600)
+
+    def test_invoice_reconciliation_lists_mismatched_invoices(self):
+        matching_invoice = Invoice.objects.create(student=self.student, amount=0, due_date=date.today())
+        response = self.client.get(reverse('invoice_reconciliation'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'invoices/invoice_reconciliation.html')
+        self.assertIn(self.invoice, response.context['invoices'])
+        self.assertNotIn(matching_invoice, response.context['invoices'])
+
+    def test_invoice_reconciliation_is_admin_only(self):
+        self.client.login(username='@janedoe', password='Password123')
+        response = self.client.get(reverse('invoice_reconciliation'))
+        self.assertEqual(response.status_code, 403)
+
+
+    def test_invoice_list_filters_by_status(self):
+        paid_invoice = Invoice.objects.create(student=self.student, amount=50, status='PAID', due_date=date.today())
+        response = self.client.get(self.list_url, {'status': 'PAID'})
+        self.assertEqual(list(response.context['invoices']), [paid_invoice])
+        self.assertEqual(response.context['status_query'], 'PAID')
+
+    def test_invoice_list_ignores_unknown_status(self):
+        Invoice.objects.create(student=self.student, amount=50, status='PAID', due_date=date.today())
+        response = self.client.get(self.list_url, {'status': 'LOST'})
+        self.assertEqual(len(response.context['invoices']), 2)
+        self.assertEqual(response.context['status_query'], '')
+
+    def test_invoice_list_sorts_by_amount(self):
+        cheaper_invoice = Invoice.objects.create(student=self.student, amount=50, due_date=date.today())
+        response = self.client.get(self.list_url, {'sort': 'amount'})
+        self.assertEqual(list(response.context['invoices']), [cheaper_invoice, self.invoice])
+        response = self.client.get(self.list_url, {'sort': '-amount'})
+        self.assertEqual(list(response.context['invoices']), [self.invoice, cheaper_invoice])
+
+    def test_invoice_list_ignores_unknown_sort(self):
+        response = self.client.get(self.list_url, {'sort': 'student__user__password'})
+        self.assertEqual(response.context['sort_query'], '-created_at')
+
+    def test_invoice_list_pagination_keeps_filters(self):
+        for _ in range(10):
+            Invoice.objects.create(student=self.student, amount=10, due_date=date.today())
+        response = self.client.get(self.list_url, {'status': 'UNPAID', 'sort': 'due_date'})
+        next_cursor = response.context['invoices'].next_cursor
+        self.assertContains(response, f'href="/invoices/?status=UNPAID&amp;sort=due_date&amp;{urlencode({"cursor": next_cursor})}"')
+
+        response = self.client.get(self.list_url, {'status': 'UNPAID', 'sort': 'due_date', 'cursor': next_cursor})
+        self.assertEqual(len(response.context['invoices']), 1)
+        self.assertFalse(response.context['invoices'].has_next())
@@ -0,0 +1,97 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tutorials.models import Admin, Student, User
+from tutorials.profiling import ProfileBuffer, profile_buffer
+
+
+class ProfilingViewTest(TestCase):
+
+    def setUp(self):
+        profile_buffer.clear()
+        self.admin_user = User.objects.create_user(
+            username='@admin',
+            first_name='Name',
+            last_name='Surname',
+            email='admin@example.com',
+            password='admin123'
+        )
+        Admin.objects.create(user=self.admin_user)
+        self.student_user = User.objects.create_user(
+            username='@student',
+            first_name='Student',
+            last_name='Surname',
+            email='student@example.com',
+            password='student123'
+        )
+        Student.objects.create(user=self.student_user)
+        self.url = reverse('profiling')
+
+    def tearDown(self):
+        profile_buffer.clear()
+
+    def test_profiling_url(self):
+        self.assertEqual(self.url, '/dashboard/profiling/')
+
+    def test_profiling_page_is_admin_only(self):
+        self.client.login(username='@student', password='student123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_profiling_page_redirects_when_logged_out(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_requests_are_not_profiled_by_default(self):
+        self.client.login(username='@admin', password='admin123')
+        self.client.get(reverse('lessons_list'))
+        self.assertEqual(profile_buffer.recent(), [])
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0)
+    def test_requests_outside_the_sample_are_not_profiled(self):
+        self.client.login(username='@admin', password='admin123')
+        self.client.get(reverse('lessons_list'))
+        self.assertEqual(profile_buffer.recent(), [])
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_request_is_logged_and_buffered(self):
+        self.client.login(username='@admin', password='admin123')
+        with self.assertLogs('tutorials.profiling', level='INFO') as logs:
+            self.client.get(reverse('lessons_list'))
+
+        profile = profile_buffer.recent()[0]
+        self.assertEqual(json.loads(logs.records[0].getMessage()), profile)
+        self.assertEqual(profile['view'], 'lessons_list')
+        self.assertEqual(profile['status'], 200)
+        self.assertGreater(profile['queries'], 0)
+        self.assertGreater(profile['template_ms'], 0)
+        self.assertGreater(profile['peak_memory_kb'], 0)
+        self.assertLessEqual(profile['sql_ms'], profile['duration_ms'])
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0)
+    def test_profiling_page_summarises_views(self):
+        self.client.login(username='@admin', password='admin123')
+        with self.assertLogs('tutorials.profiling', level='INFO'):
+            self.client.get(reverse('lessons_list'))
+            self.client.get(reverse('lessons_list'))
+            response = self.client.get(self.url)
+
+        self.assertTemplateUsed(response, 'admin/profiling/profiles.html')
+        summary = {view['view']: view for view in response.context['summary']}
+        self.assertEqual(summary['lessons_list']['requests'], 2)
+        self.assertEqual(len(response.context['profiles']), 2)
+
+    def test_buffer_keeps_only_the_latest_profiles(self):
+        buffer = ProfileBuffer(2)
+        for duration in [1.0, 2.0, 3.0]:
+            buffer.add({'view': 'home', 'duration_ms': duration})
+        self.assertEqual([profile['duration_ms'] for profile in buffer.recent()], [3.0, 2.0])
+
+    def test_clear_profiles(self):
+        profile_buffer.add({'view': 'home', 'duration_ms': 1.0})
+        self.client.login(username='@admin', password='admin123')
+        response = self.client.post(self.url, {'clear': ''})
+        self.assertRedirects(response, self.url)
+        self.assertEqual(profile_buffer.recent(), [])
@@ -195,6 +195,22 @@ class LessonRequestsViewTest(TestCase):
         self.assertContains(response, 'Weekly')  # Frequency (convert frequency choice in template)
         self.assertContains(response, 'Pending')  # Status
 
+    def test_admin_sees_the_assign_and_reject_controls(self):
+        self.client.login(username='@johndoe', password='Password123')
+        response = self.client.get(self.url)
+
+        self.assertContains(response, reverse('request_assign', args=[self.lesson_request.pk]))
+        self.assertContains(response, 'name="reject"')
+        self.assertNotContains(response, 'name="cancel"')
+
+    def test_student_sees_the_cancel_control(self):
+        self.client.login(username='@janedoe', password='Password123')
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'name="cancel"')
+        self.assertContains(response, f'name="request_id" value="{self.lesson_request.pk}"')
+        self.assertNotContains(response, reverse('request_assign', args=[self.lesson_request.pk]))
+
     def test_no_lesson_requests(self):
         self.client.login(username='@janedoe', password='Password123')
         LessonRequest.objects.all().delete()  # Clear any existing data
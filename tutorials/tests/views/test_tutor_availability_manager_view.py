@@ -1,8 +1,11 @@
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from tutorials.models import Lesson, LessonUpdateRequest, LessonStatus, Tutor, Student, Subject, Term, User, Admin, Status, TutorAvailability
 from datetime import date, time, timedelta, datetime
+from tutorials.availability_index import availability_index
 from tutorials.views import TutorAvailabilityManager
 from django.utils.timezone import now
 from tutorials.models.choices import Days
@@ -19,6 +22,7 @@ class UpdateLessonViewTest(TestCase):
     ]
 
     def setUp(self):
+        availability_index.clear()
         # Set up a term
 
         self.tutor = Tutor.objects.get(user__username='@petrapickles')
@@ -159,11 +163,71 @@ class UpdateLessonViewTest(TestCase):
         self.assertEqual(updated_availability.start_time.strftime("%H:%M:%S"), "10:00:00")
         self.assertEqual(updated_availability.end_time.strftime("%H:%M:%S"), "11:00:00")
 
+    def test_update_new_tutor_availability_fetches_the_indexed_slot_by_pk(self):
+        slot = availability_index.covering_slot(self.tutor.pk, 0, time(10), time(11))
+        with CaptureQueriesContext(connection) as queries:
+            self.manager.update_new_tutor_availability(
+                new_start_time="10:00",
+                new_day=date(2025, 2, 10),
+                duration=timedelta(hours=1),
+                new_tutor=self.tutor,
+            )
+        selects = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+        self.assertIn(f'"id" = {slot.pk}', selects[0])
+
+    def test_update_new_tutor_availability_with_a_stale_index(self):
+        self.assertTrue(availability_index.is_available(self.tutor.pk, 0, time(10), time(11)))
+        # Another process moves the indexed slots and adds a new one, which this process's signals never see
+        TutorAvailability.objects.filter(tutor=self.tutor, day=0).update(day=1)
+        TutorAvailability.objects.bulk_create([
+            TutorAvailability(tutor=self.tutor, day=0, start_time=time(8), end_time=time(16), status="Available")
+        ])
+
+        self.manager.update_new_tutor_availability(
+            new_start_time="10:00",
+            new_day=date(2025, 2, 10),
+            duration=timedelta(hours=1),
+            new_tutor=self.tutor,
+        )
+
+        booked = TutorAvailability.objects.get(tutor=self.tutor, day=0, status="Unavailable")
+        self.assertEqual((booked.start_time, booked.end_time), (time(10), time(11)))
+
     def test_merge_overlapping_availabilities(self):
         overlapping_slots = TutorAvailability.objects.filter(tutor=self.tutor)
         self.manager.merge_overlapping_availabilities(overlapping_slots)
-        merged_availability = TutorAvailability.objects.filter(tutor=self.tutor)
+        merged_availability = TutorAvailability.objects.filter(tutor=self.tutor, status="Available")
         self.assertEqual(len(merged_availability), 1)  # Slots merged into one
+        self.assertEqual(merged_availability[0].start_time, time(9, 0))
+        self.assertEqual(merged_availability[0].end_time, time(15, 0))
+        # The booked slot of the lesson is never merged into free time
+        self.assertEqual(TutorAvailability.objects.filter(tutor=self.tutor, status="Unavailable").count(), 1)
+
+    def test_merge_keeps_days_apart(self):
+        TutorAvailability.objects.create(tutor=self.tutor, day=1, start_time="14:00", end_time="16:00", status="Available")
+        self.manager.merge_overlapping_availabilities(TutorAvailability.objects.filter(tutor=self.tutor, status="Available"))
+        self.assertEqual(TutorAvailability.objects.filter(tutor=self.tutor, day=0, status="Available").count(), 1)
+        self.assertEqual(TutorAvailability.objects.filter(tutor=self.tutor, day=1, status="Available").count(), 1)
+
+    def test_restore_old_tutor_availability_uses_fixed_number_of_queries(self):
+        for hour in range(15, 22):
+            TutorAvailability.objects.create(
+                tutor=self.tutor, day=0, start_time=time(hour), end_time=time(hour, 30), status="Available"
+            )
+        TutorAvailability.objects.create(
+            tutor=self.tutor, day=0, start_time=time(22), end_time=time(23), status="Unavailable"
+        )
+        # Load, bulk update, bulk delete and their savepoints, whatever the number of slots
+        with self.assertNumQueries(8):
+            self.manager.restore_old_tutor_availability(
+                tutor=self.tutor,
+                day=date(2025, 2, 10),
+                lesson_start_time="22:00:00",
+                duration=timedelta(hours=1),
+            )
+        restored = TutorAvailability.objects.get(tutor=self.tutor, day=0, start_time=time(22))
+        self.assertEqual(restored.status, "Available")
 
     def test_update_lesson_statuses(self):
         old_date = now().date()
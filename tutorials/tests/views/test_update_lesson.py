@@ -3,6 +3,7 @@ from django.urls import reverse
 from django.contrib.messages import get_messages
 from tutorials.models import *
 from tutorials.forms import UpdateLessonForm
+from tutorials.availability_index import availability_index
 from tutorials.views import UpdateLesson
 from django.utils.timezone import now
 from datetime import date, time, timedelta
@@ -11,6 +12,7 @@ class UpdateLessonTests(TestCase):
 
 
     def setUp(self):
+        availability_index.clear()
         self.admin_user = User.objects.create_user(
             username='@johndoe',
             first_name='AdminName',
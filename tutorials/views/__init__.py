@@ -1,3 +1,4 @@
+from tutorials.views.avatar import *
 from tutorials.views.calendar import *
 from tutorials.views.dashboard import *
 from tutorials.views.entity import *
@@ -6,6 +7,7 @@ from tutorials.views.invoice import *
 from tutorials.views.lesson import *
 from tutorials.views.mixin import *
 from tutorials.views.profile import *
+from tutorials.views.profiling import *
 from tutorials.views.request import *
 from tutorials.views.subject import *
 from tutorials.views.tutor_availability import *
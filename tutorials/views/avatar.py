@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404
+from django.shortcuts import redirect
+from django.templatetags.static import static
+from django.views.decorators.cache import cache_control
+
+from tutorials.avatars import AVATAR_SIZES, GRAVATAR_HASH_PATTERN, avatar_cache_path, fetch_avatar
+
+"""
+This file contains a view function to serve
+Locally cached avatars
+"""
+
+@login_required
+@cache_control(private=True, max_age=60 * 60 * 24 * 7)
+def avatar(request, digest, size):
+    """Serve an avatar from the local avatar cache, downloading it from Gravatar the first time it is requested.
+
+    Only logged in users can request avatars, and only at the sizes the site shows, so that the downloads and
+    the files they leave in AVATAR_CACHE_DIR stay bounded.
+    """
+    if not settings.AVATAR_LOCAL_CACHE or not GRAVATAR_HASH_PATTERN.fullmatch(digest) or size not in AVATAR_SIZES:
+        raise Http404
+
+    path = avatar_cache_path(digest, size)
+    if not path.exists():
+        try:
+            path = fetch_avatar(digest, size)
+        except OSError:
+            # Gravatar is unreachable, so show the placeholder and try again on the next request
+            response = redirect(static('images/default_avatar.svg'))
+            response['Cache-Control'] = 'no-cache'
+            return response
+    return FileResponse(open(path, 'rb'), content_type='image/jpeg')
@@ -1,5 +1,6 @@
 from django.shortcuts import render
 
+from tutorials.caching import get_month_schedule
 from tutorials.models import LessonStatus, Lesson
 from django.views import View
 
@@ -24,19 +25,21 @@ class Calendar(View):
         year = int(request.GET.get('year', year))
         month = int(request.GET.get('month', month))
 
-        LessonStatus.objects.filter(date__lt=today, status='Pending').update(status='Completed')
-
         # Filter lessons displayed by user type
-        if hasattr(user, 'tutor_profile'):
+        if request.role == 'tutor':
+            kind = 'tutor'
             lessons = Lesson.objects.filter(tutor__user=user)
-        elif hasattr(user, 'student_profile'):
+        elif request.role == 'student':
+            kind = 'student'
             lessons = Lesson.objects.filter(student__user=user)
+        else:
+            kind = None
+            lessons = Lesson.objects.none()
 
         first_day = datetime(year, month, 1).date()
         last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
 
-        frequency_lessons = self.lessons_frequency(lessons, first_day)
-        schedule = self.weekly_schedule(frequency_lessons, first_day, last_day)
+        schedule = self.cached_month_schedule(kind, user.id, lessons, first_day, last_day)
 
         next_month = (last_day + timedelta(days=1)).replace(day=1)
         prev_month = (first_day - timedelta(days=1)).replace(day=1)
@@ -49,53 +52,56 @@ class Calendar(View):
         }
         return render(request, 'shared/calendar.html', content)
 
-
-    def lessons_frequency(self, lessons, start):
-        """Counts the lesson frequency to present each lesson in a schedule for the user."""
-        freq = []
-        for lesson in lessons:
-            current_date = lesson.start_date
-            end_lesson = lesson.term.end_date
-            lesson_status = LessonStatus.objects.filter(lesson_id=lesson.id)
-            while current_date <= end_lesson:
-                if start <= current_date <= end_lesson:
-                    lesson_status = LessonStatus.objects.filter(date=current_date).first()
-
-                    if lesson_status:
-                        freq.append({
-                            'student': lesson.student,
-                            'tutor': lesson.tutor,
-                            'subject': lesson.subject,
-                            'date': current_date,
-                            'time': lesson_status.time,
-                            'status': lesson_status.status,
-                        })
-
-                # Modify the date based on lesson frequency
-                if lesson.frequency == 'F':
-                    current_date += timedelta(weeks=2)
-                elif lesson.frequency == 'M':
-                    current_date += timedelta(weeks=4)
-                else:
-                    current_date += timedelta(weeks=1)
-        return freq
+    def cached_month_schedule(self, kind, entity_id, lessons, start, end):
+        """Gets the month schedule of a tutor or student from the cache, building it on a miss."""
+        if kind is None:
+            return self.month_schedule(lessons, start, end)
+        return get_month_schedule(
+            kind, entity_id, start.year, start.month,
+            lambda: self.month_schedule(lessons, start, end)
+        )
+
+    def month_schedule(self, lessons, start, end):
+        """Builds the weekly schedule of the given lessons between start and end."""
+        frequency_lessons = self.lessons_frequency(lessons, start, end)
+        return self.weekly_schedule(frequency_lessons, start, end)
+
+    def lessons_frequency(self, lessons, start, end):
+        """Gets every lesson occurrence of the given lessons between start and end in a single query."""
+        lesson_statuses = LessonStatus.objects.filter(
+            lesson_id__in=lessons,
+            date__range=(start, end),
+        ).load('calendar').order_by('date', 'time')
+
+        return [
+            {
+                'student': lesson_status.lesson_id.student,
+                'tutor': lesson_status.lesson_id.tutor,
+                'subject': lesson_status.lesson_id.subject,
+                'date': lesson_status.date,
+                'time': lesson_status.time,
+                'status': lesson_status.status,
+            }
+            for lesson_status in lesson_statuses
+        ]
 
     def weekly_schedule(self, frequency_lessons, start, end):
-        """Gets the weeks for the month."""
+        """Gets the weeks for the month and places each lesson in its week."""
         weekly_lessons = {}
-        current_date = start
-        week_start = current_date - timedelta(days=current_date.weekday())
-        week_end = week_start + timedelta(days=6)
+        week_keys = []
+        week_start = start - timedelta(days=start.weekday())
+        first_week_start = week_start
 
         while week_start <= end:
+            week_end = week_start + timedelta(days=6)
             week_key = f"{week_start.strftime('%b %d')} - {week_end.strftime('%b %d, %Y')}"
             weekly_lessons[week_key] = []
-
-            for lesson in frequency_lessons:
-                if week_start <= lesson['date'] <= week_end:
-                    weekly_lessons[week_key].append(lesson)
-
+            week_keys.append(week_key)
             week_start += timedelta(days=7)
-            week_end += timedelta(days=7)
 
-        return weekly_lessons
\ No newline at end of file
+        for lesson in frequency_lessons:
+            week_index = (lesson['date'] - first_week_start).days // 7
+            if 0 <= week_index < len(week_keys):
+                weekly_lessons[week_keys[week_index]].append(lesson)
+
+        return weekly_lessons
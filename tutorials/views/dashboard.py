@@ -1,9 +1,8 @@
 from django.shortcuts import render
-from django.utils import timezone
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 
-from tutorials.models import Term
+from tutorials.caching import get_current_term
 
 
 """
@@ -18,19 +17,16 @@ def dashboard(request):
     current_user = request.user
 
     # Get current term
-    current_term = Term.objects.filter(
-        start_date__lte=timezone.now().date(),
-        end_date__gte=timezone.now().date()
-    ).first()
+    current_term = get_current_term()
 
     # Current term is to be displayed
     context = {
         'user': current_user,
         'current_term': current_term
     }
-    if hasattr(current_user, 'admin_profile'):
+    if request.role == 'admin':
         return render(request, 'admin/admin_dashboard.html', context)
-    if hasattr(current_user, 'tutor_profile'):
+    if request.role == 'tutor':
         return render(request, 'tutor/tutor_dashboard.html', context)
     else:
         student = current_user.student_profile
@@ -1,17 +1,16 @@
 import datetime
 from datetime import timedelta
-from functools import reduce
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
-from django.db.models import Q
 from django.shortcuts import redirect, get_object_or_404, render
 from django.utils.timezone import now
 from django.views import View
 
 from tutorials.forms import UserForm
 from tutorials.models import Subject, Lesson, Student, TutorAvailability, LessonStatus, Tutor
+from tutorials.pagination import KeysetPaginator
+from tutorials.search import user_search
 from tutorials.views import Calendar
 
 
@@ -67,33 +66,27 @@ class EntityView(LoginRequiredMixin, View):
 
         # For each user type, get a different list. Admins get all objects of students/tutors.
         # Tutors only get the students they teach. Students only get the tutors who teach them.
-        profile_map = {
-            'admin_profile': lambda: self.model.objects.all().order_by('user__username'),
-            'tutor_profile': lambda: self._get_entities_for_tutor(user),
-            'student_profile': lambda: self._get_entities_for_student(user),
+        role_map = {
+            'admin': lambda: self.model.objects.all().order_by('user__username'),
+            'tutor': lambda: self._get_entities_for_tutor(user),
+            'student': lambda: self._get_entities_for_student(user),
         }
 
         entity_list = None
-        for profile, entity_filter in profile_map.items():
-            if hasattr(user, profile):
-                entity_list = entity_filter()
-                break
+        if request.role in role_map:
+            entity_list = role_map[request.role]()
 
+        # Searches go through the user search index and list the best matches first
+        ordering = ['user__username']
         if search:
-            query = reduce(lambda q1, q2: q1 | q2, [
-                Q(user__username__icontains=search),
-                Q(user__first_name__icontains=search),
-                Q(user__last_name__icontains=search),
-                Q(user__email__icontains=search)
-            ])
-            entity_list = entity_list.filter(query)
-
-        entity_list = self.apply_filters(request, entity_list)
-        page_number = request.GET.get('page', 1)
-        paginator = Paginator(entity_list, 20)
-        page_obj = paginator.get_page(page_number)
-
-        template = self.list_admin if hasattr(request.user, 'admin_profile') else self.list_user
+            entity_list = user_search.filter(entity_list, search, field='user_id')
+            ordering = ['search_rank']
+
+        entity_list = self.apply_filters(request, entity_list).load('list')
+        paginator = KeysetPaginator(entity_list, 20, ordering)
+        page_obj = paginator.get_page(request.GET.get('cursor'))
+
+        template = self.list_admin if request.role == 'admin' else self.list_user
         return render(request, template, {
             'page_obj': page_obj,
             'user': user,
@@ -123,14 +116,12 @@ class EntityView(LoginRequiredMixin, View):
         students = None
 
         if isinstance(entity, Student):
-            lessons = Lesson.objects.filter(student=entity).select_related(
-                'tutor', 'subject', 'term'
-            ).order_by('subject__name')
+            lessons = Lesson.objects.filter(student=entity).load('list').order_by('subject__name')
             subjects = lessons.values_list('subject__name', flat=True).distinct()
             tutors = ', '.join(sorted(tutor.user.full_name() for tutor in set(lesson.tutor for lesson in lessons)))
 
         else:
-            lessons = Lesson.objects.filter(tutor=entity).order_by('student__user__username')
+            lessons = Lesson.objects.filter(tutor=entity).load('list').order_by('student__user__username')
             students = ', '.join(
                 sorted(student.user.full_name() for student in set(lesson.student for lesson in lessons)))
             availability = TutorAvailability.objects.filter(tutor=entity).order_by('day')
@@ -182,19 +173,17 @@ class EntityView(LoginRequiredMixin, View):
         today = now().date()
         year = int(request.GET.get('year', today.year))
         month = int(request.GET.get('month', today.month))
-        LessonStatus.objects.filter(date__lt=today, status='Pending').update(status='Completed')
-
         if isinstance(entity, Student):
+            kind = 'student'
             lessons = Lesson.objects.filter(student=entity)
         elif isinstance(entity, Tutor):
+            kind = 'tutor'
             lessons = Lesson.objects.filter(tutor=entity)
 
         first_day = datetime.date(year, month, 1)
         last_day = (first_day + timedelta(days=32)).replace(day=1) - timedelta(days=1)
 
-        calendar = Calendar()
-        frequency_lessons = calendar.lessons_frequency(lessons, first_day)
-        schedule = calendar.weekly_schedule(frequency_lessons, first_day, last_day)
+        schedule = Calendar().cached_month_schedule(kind, entity.pk, lessons, first_day, last_day)
 
         next_month = (last_day + timedelta(days=1)).replace(day=1)
         prev_month = (first_day - timedelta(days=1)).replace(day=1)
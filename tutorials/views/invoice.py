@@ -2,11 +2,14 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
+from django.http import HttpResponseForbidden
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views import View
 
 from tutorials.forms import InvoiceForm
-from tutorials.models import Invoice, LessonStatus, Student
+from tutorials.invoicing import InvoicingRun
+from tutorials.pagination import KeysetPaginator
+from tutorials.models import Invoice, LessonStatus, PaymentStatus, Student
 
 
 """
@@ -14,18 +17,38 @@ This file contains view classes and functions to handle
 1 - Invoices view
 2 - Create Invoices
 3 - Invoice details
+4 - Invoicing runs
+5 - Invoice reconciliation
 """
 
 class InvoiceListView(LoginRequiredMixin, View):
     """Handles list of invoices."""
+    sort_fields = {'created_at', 'due_date', 'amount', 'status'}
+    default_sort = '-created_at'
+
     def get(self, request):
-        invoice_list = Invoice.objects.all().order_by('-created_at')
-        paginator = Paginator(invoice_list, 10)  # Show 10 invoices per page
+        invoice_list = Invoice.objects.with_totals().load('list')
+
+        # Filter and sort in the database, the overdue sweep keeps statuses current
+        status = request.GET.get('status', '')
+        if status in PaymentStatus.values:
+            invoice_list = invoice_list.filter(status=status)
+        else:
+            status = ''
 
-        page = request.GET.get('page')
-        invoices = paginator.get_page(page)
+        sort = request.GET.get('sort', self.default_sort)
+        if sort.lstrip('-') not in self.sort_fields:
+            sort = self.default_sort
 
-        return render(request, 'invoices/invoice_list.html', {'invoices': invoices})
+        paginator = KeysetPaginator(invoice_list, 10, [sort])  # Show 10 invoices per page
+        invoices = paginator.get_page(request.GET.get('cursor'))
+
+        return render(request, 'invoices/invoice_list.html', {
+            'invoices': invoices,
+            'status_query': status,
+            'sort_query': sort,
+            'statuses': PaymentStatus.choices,
+        })
 
 
 class CreateInvoiceView(LoginRequiredMixin, View):
@@ -62,7 +85,10 @@ class CreateInvoiceView(LoginRequiredMixin, View):
 class InvoiceDetailView(LoginRequiredMixin, View):
     """View the invoice details."""
     def get(self, request, invoice_id):
-        invoice = get_object_or_404(Invoice, id=invoice_id)
+        invoice = get_object_or_404(
+            Invoice.objects.with_totals().load('detail'),
+            id=invoice_id
+        )
 
         return render(request, 'invoices/invoice_detail.html', {'invoice': invoice})
 
@@ -78,3 +104,46 @@ class InvoiceDetailView(LoginRequiredMixin, View):
             messages.success(request, f'Invoice #{invoice_id} marked as paid')
             return redirect('invoice_list')
         return redirect('invoice_detail', invoice_id=invoice_id)
+
+
+class InvoicingRunView(LoginRequiredMixin, View):
+    """Allows admin to invoice every student for their completed lessons at once."""
+    def get(self, request):
+        """Display how many students and lessons the run would invoice."""
+        if request.role != 'admin':
+            return HttpResponseForbidden("You do not have permission to view this page.")
+
+        invoicing_run = InvoicingRun()
+        return render(request, 'invoices/invoicing_run.html', {
+            'pending': invoicing_run.pending(),
+            'until': invoicing_run.until,
+            'due_date': invoicing_run.due_date,
+        })
+
+    def post(self, request):
+        """Run the invoicing and report its totals."""
+        if request.role != 'admin':
+            return HttpResponseForbidden("You do not have permission to view this page.")
+
+        totals = InvoicingRun().run()
+        if totals['invoices']:
+            messages.success(
+                request,
+                f"Created {totals['invoices']} invoices for {totals['lessons']} lessons, totalling ${totals['amount']:.2f}."
+            )
+        else:
+            messages.info(request, "No completed lessons left to invoice.")
+        return redirect('invoice_list')
+
+
+class InvoiceReconciliationView(LoginRequiredMixin, View):
+    """Allows admin to find invoices whose amount does not match the lessons they cover."""
+    def get(self, request):
+        if request.role != 'admin':
+            return HttpResponseForbidden("You do not have permission to view this page.")
+
+        mismatched_invoices = Invoice.objects.mismatched().load('list').order_by('-created_at')
+        paginator = Paginator(mismatched_invoices, 20)
+        invoices = paginator.get_page(request.GET.get('page'))
+
+        return render(request, 'invoices/invoice_reconciliation.html', {'invoices': invoices})
@@ -3,12 +3,12 @@ from django.db.models import OuterRef, Exists
 from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
-from django.core.paginator import Paginator
 from django.utils.timezone import now
 from django.views import View
 
 from tutorials.forms import LessonFeedbackForm
 from tutorials.models import LessonStatus, Status, LessonUpdateRequest, Lesson
+from tutorials.pagination import KeysetPaginator
 
 
 """
@@ -26,10 +26,10 @@ class ViewLessons(LoginRequiredMixin, View):
         if lesson_id:
             return self.lesson_detail(request, lesson_id)
 
-        if hasattr(current_user, 'admin_profile'):
+        if request.role == 'admin':
             self.list_of_lessons = Lesson.objects.all()
             self.status = 'admin'
-        elif hasattr(request.user, 'student_profile'):
+        elif request.role == 'student':
             self.list_of_lessons = Lesson.objects.filter(student=current_user.id)
             self.status = 'student'
 
@@ -46,10 +46,8 @@ class ViewLessons(LoginRequiredMixin, View):
             )
         )
 
-        self.list_of_lessons = self.list_of_lessons.order_by('student__user__first_name')
-        paginator = Paginator(self.list_of_lessons, 20)
-        page_number = request.GET.get('page', 1)
-        page_obj = paginator.get_page(page_number)
+        paginator = KeysetPaginator(self.list_of_lessons.load('list'), 20, ['student__user__first_name'])
+        page_obj = paginator.get_page(request.GET.get('cursor'))
 
         lessons_requests = LessonUpdateRequest.objects.filter(lesson__in=self.list_of_lessons, is_handled="N")
         lessons_with_requests = set(lessons_requests.values_list('lesson_id', flat=True))
@@ -60,9 +58,9 @@ class ViewLessons(LoginRequiredMixin, View):
 
     def post(self, request, lesson_id=None):
         """Handle POST requests based on lesson actions."""
-        if hasattr(request.user, 'admin_profile'):
+        if request.role == 'admin':
             self.status = 'admin'
-        elif hasattr(request.user, 'student_profile'):
+        elif request.role == 'student':
             self.status = 'student'
         else:
             self.status = 'tutor'
@@ -116,9 +114,9 @@ class ViewLessons(LoginRequiredMixin, View):
 
     def lesson_detail(self, request, lessonStatus_id):
         """Views the lesson details/each lesson scheduled."""
-        if hasattr(request.user, 'admin_profile'):
+        if request.role == 'admin':
             self.status = 'admin'
-        elif hasattr(request.user, 'student_profile'):
+        elif request.role == 'student':
             self.status = 'student'
         else:
             self.status = 'tutor'
@@ -49,7 +49,7 @@ class ProfileUpdateView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
 
         # Add tutor form with extra fields "experience" and "subjects"
-        if hasattr(self.request.user, 'tutor_profile'):
+        if self.request.role == 'tutor':
             tutor_form = TutorForm(instance=self.request.user.tutor_profile)
         else:
             tutor_form = None
@@ -61,7 +61,7 @@ class ProfileUpdateView(LoginRequiredMixin, TemplateView):
     def post(self, request, *args, **kwargs):
         """Handles form submission."""
         user_form = UserForm(self.request.POST, instance=self.request.user)
-        if hasattr(self.request.user, 'tutor_profile'):
+        if self.request.role == 'tutor':
             tutor_form = TutorForm(self.request.POST, instance=self.request.user.tutor_profile)
         else:
             tutor_form = None  # Don't handle tutor form if no tutor profile
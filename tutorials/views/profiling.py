@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponseForbidden
+from django.shortcuts import redirect, render
+from django.views import View
+
+from tutorials.profiling import profile_buffer
+
+
+"""
+This file contains a view class to handle 
+Request profiles
+"""
+
+class ProfilingView(LoginRequiredMixin, View):
+    """Allows admins to view the latest request profiles, summarised per view."""
+    def get(self, request):
+        """Display the per view summary and the latest profiled requests."""
+        if request.role != 'admin':
+            return HttpResponseForbidden("You do not have permission to view this page.")
+
+        return render(request, 'admin/profiling/profiles.html', {
+            'enabled': settings.PROFILING_ENABLED,
+            'sample_rate': settings.PROFILING_SAMPLE_RATE,
+            'summary': profile_buffer.summary(),
+            'profiles': profile_buffer.recent(),
+        })
+
+    def post(self, request):
+        """Allows admins to clear the buffered profiles."""
+        if request.role != 'admin':
+            return HttpResponseForbidden("You do not have permission to view this page.")
+
+        if 'clear' in request.POST:
+            profile_buffer.clear()
+        return redirect('profiling')
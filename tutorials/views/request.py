@@ -1,10 +1,13 @@
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponseForbidden
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views import View
 
 from tutorials.forms import AssignTutorForm, LessonRequestForm
-from tutorials.models import LessonRequest, Lesson, Status
+from tutorials.matching import LessonRequestMatcher
+from tutorials.models import LessonRequest, Lesson, Status, Tutor
 
 
 """
@@ -23,15 +26,16 @@ class RequestView(LoginRequiredMixin, View):
         if request_id:
             return self.request_assign(request, request_id)
 
-        if hasattr(current_user, 'admin_profile'):
+        if request.role == 'admin':
             self.requests_list = LessonRequest.objects.all().order_by('-created')
             self.status = 'admin'
-        elif hasattr(request.user, 'student_profile'):
+        elif request.role == 'student':
             self.requests_list = LessonRequest.objects.filter(student=current_user.id).order_by('-created')
             self.status = 'student'
         else:
             messages.error(request, "Tutors may not request lessons.")
             return redirect('dashboard')
+        self.requests_list = self.requests_list.load('list')
         return render(request, f'{self.status}/requests/requests.html', {"lesson_requests": self.requests_list})
 
     def post(self, request, *args, **kwargs):
@@ -119,6 +123,37 @@ class RequestView(LoginRequiredMixin, View):
         return redirect('requests')
 
 
+class AssignmentRunView(LoginRequiredMixin, View):
+    """Allows admin to assign tutors to every pending lesson request at once."""
+    def get(self, request):
+        """Display the tutor each pending request would be assigned to."""
+        if request.role != 'admin':
+            return HttpResponseForbidden("You do not have permission to view this page.")
+
+        pending = LessonRequest.objects.filter(status=Status.PENDING, lesson_assigned__isnull=True)
+        matches = LessonRequestMatcher(settings.DEFAULT_PRICE_PER_LESSON).match(pending)
+        tutors = Tutor.objects.select_related('user').in_bulk({tutor_id for lesson_request, tutor_id in matches})
+        return render(request, 'admin/requests/assignment_run.html', {
+            'pending_count': pending.count(),
+            'matches': [(lesson_request, tutors[tutor_id]) for lesson_request, tutor_id in matches],
+            'price_per_lesson': settings.DEFAULT_PRICE_PER_LESSON,
+        })
+
+    def post(self, request):
+        """Assign the pending requests and report how many were assigned."""
+        if request.role != 'admin':
+            return HttpResponseForbidden("You do not have permission to view this page.")
+
+        pending = LessonRequest.objects.filter(status=Status.PENDING, lesson_assigned__isnull=True)
+        pending_count = pending.count()
+        confirmed = LessonRequestMatcher(settings.DEFAULT_PRICE_PER_LESSON).assign(pending)
+        if confirmed:
+            messages.success(request, f"Assigned {len(confirmed)} of {pending_count} pending requests.")
+        else:
+            messages.info(request, "No pending request could be assigned a tutor.")
+        return redirect('requests')
+
+
 class MakeRequestView(LoginRequiredMixin, View):
 
     def get(self, request, *args, **kwargs):
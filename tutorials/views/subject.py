@@ -1,4 +1,3 @@
-from django.core.paginator import Paginator
 from django.http import HttpResponseForbidden, HttpResponseRedirect, HttpResponseNotFound
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
@@ -6,6 +5,7 @@ from django.views import View
 
 from tutorials.forms import SubjectForm
 from tutorials.models import Subject
+from tutorials.pagination import KeysetPaginator
 
 
 """
@@ -23,12 +23,11 @@ class SubjectView(View):
         if subject_id:
             return self.edit_subject(request, subject_id)
 
-        if hasattr(request.user, 'admin_profile'):
+        if request.role == 'admin':
             self.list_of_subjects = Subject.objects.all()
 
-            paginator = Paginator(self.list_of_subjects.order_by('name'), 20)
-            page_number = request.GET.get('page')
-            page_obj = paginator.get_page(page_number)
+            paginator = KeysetPaginator(self.list_of_subjects, 20, ['name'])
+            page_obj = paginator.get_page(request.GET.get('cursor'))
 
             return render(request, 'admin/manage_subjects/subjects_list.html', {'page_obj': page_obj})
         return HttpResponseForbidden("You do not have permission to view this page.")
@@ -7,6 +7,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.views import View
 
+from tutorials.caching import invalidate_calendar, invalidate_lesson_calendars
 from tutorials.forms import UpdateLessonRequestForm, UpdateLessonForm
 from tutorials.helpers import TutorAvailabilityManager
 from tutorials.models import LessonUpdateRequest, Lesson, LessonStatus, Status, Tutor
@@ -27,9 +28,9 @@ class UpdateLessonRequest(LoginRequiredMixin, View):
     def get(self, request, lesson_id=None):
         """Get list of update requests based on user profile."""
         current_user = request.user
-        if hasattr(current_user, 'admin_profile'):
-            list_of_requests = LessonUpdateRequest.objects.all()
-        elif hasattr(current_user, 'student_profile') or hasattr(current_user, 'tutor_profile'):
+        if request.role == 'admin':
+            list_of_requests = LessonUpdateRequest.objects.load('list')
+        elif request.role in ('student', 'tutor'):
             return self.request_change(request, lesson_id)
         else:
             return reverse('log_in')
@@ -74,9 +75,9 @@ class UpdateLessonRequest(LoginRequiredMixin, View):
             if form.is_valid():
                 try:
                     saved_instance = form.save()
-                    if hasattr(request.user, 'tutor_profile'):
+                    if request.role == 'tutor':
                         saved_instance.made_by = 'Tutor'
-                    elif hasattr(request.user, 'student_profile'):
+                    elif request.role == 'student':
                         saved_instance.made_by = 'Student'
 
                     Lesson.objects.filter(id=lesson.id).update(notes=f'Requested by {saved_instance.made_by}: {saved_instance.get_update_option_display()}')
@@ -99,6 +100,7 @@ class UpdateLessonRequest(LoginRequiredMixin, View):
                     status=Status.SCHEDULED,
                     lesson_id=lesson
                 ).update(status=Status.PENDING)
+                invalidate_lesson_calendars(lesson.tutor_id, lesson.student_id)
             except Exception as e:
                 print(f"Error in changing status: {e}")
 
@@ -222,6 +224,8 @@ class UpdateLesson(LoginRequiredMixin, View):
             form.add_error(None, 'Tutor is not available!!!')
             messages.error('Tutor is not available!!!')
         Lesson.objects.filter(pk=lesson_id).update(tutor=new_tutor)
+        invalidate_lesson_calendars(saved_instance.tutor_id, saved_instance.student_id)
+        invalidate_calendar('tutor', new_tutor)
 
         self.availability_manager.restore_old_tutor_availability(
             saved_instance.tutor,